@@ -0,0 +1,93 @@
+"""
+Benchmark the vectorized type coercion against a per-cell conversion loop.
+
+The frame mixes the mapping's `date` (DesignationDate), `long` (BBL),
+ObjectId (Id) and string (PostalCode with missing cells) columns, with a
+small share of values that cannot be converted.
+
+Usage:
+    python benchmarks/bench_coerce_types.py --rows 10000 100000 1000000
+"""
+import argparse
+import os
+import re
+import sys
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(script_dir, '..', 'scripts'))
+
+from type_coercion import coerce_dataframe_types
+from bench_validate_values import timed
+
+TARGET_TYPES = {"Id": "objectId", "PostalCode": "string", "DesignationDate": "date", "BBL": "long"}
+
+def make_typed_frame(rows, error_rate=0.01, seed=0):
+    """Builds a frame with the raw values a worksheet yields for the typed columns."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "Id": [f"{value:024x}" for value in rng.integers(0, 2 ** 62, size=rows)],
+        "PostalCode": rng.integers(10001, 11698, size=rows).astype(float),
+        "DesignationDate": pd.to_datetime(rng.integers(-5000, 20000, size=rows), unit="D").strftime("%Y-%m-%d"),
+        "BBL": rng.integers(1_000_000_000, 5_999_999_999, size=rows).astype(str).astype(object),
+    })
+    bad = rng.random(rows) < error_rate
+    df.loc[rng.random(rows) < 0.05, "PostalCode"] = np.nan
+    df.loc[bad, "Id"] = "not-an-object-id"
+    df.loc[bad, "DesignationDate"] = "unknown"
+    df.loc[bad, "BBL"] = "N/A"
+    return df
+
+def loop_coerce(df):
+    """Per-cell conversion with try/except, the approach the vectorized engine replaces."""
+    object_id = re.compile(r"[0-9a-fA-F]{24}")
+    failures = 0
+    converted = {column: [] for column in TARGET_TYPES}
+    for row in df.itertuples(index=False):
+        if not object_id.fullmatch(row.Id):
+            failures += 1
+        converted["Id"].append(row.Id)
+        converted["PostalCode"].append(None if pd.isna(row.PostalCode) else str(int(row.PostalCode)))
+        try:
+            converted["DesignationDate"].append(datetime.strptime(row.DesignationDate, "%Y-%m-%d"))
+        except ValueError:
+            converted["DesignationDate"].append(None)
+            failures += 1
+        try:
+            converted["BBL"].append(int(row.BBL))
+        except ValueError:
+            converted["BBL"].append(None)
+            failures += 1
+    return pd.DataFrame(converted), failures
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--loop-max-rows", type=int, default=1_000_000,
+                        help="Skip the per-cell baseline above this size.")
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'loop (s)':>10} {'vectorized (s)':>15} {'speedup':>9} {'failed cells':>13}")
+    for rows in args.rows:
+        df = make_typed_frame(rows)
+
+        vectorized_time, (_, errors) = timed(coerce_dataframe_types, df, TARGET_TYPES)
+
+        if rows <= args.loop_max_rows:
+            loop_time, (_, loop_failures) = timed(loop_coerce, df)
+            if loop_failures != len(errors):
+                raise AssertionError(f"Failure counts differ: loop {loop_failures}, vectorized {len(errors)}")
+            loop_column = f"{loop_time:10.3f}"
+            speedup_column = f"{loop_time / vectorized_time:8.1f}x"
+        else:
+            loop_column = f"{'skipped':>10}"
+            speedup_column = f"{'-':>9}"
+
+        print(f"{rows:>10} {loop_column} {vectorized_time:15.3f} {speedup_column} {len(errors):>13}")
+
+
+if __name__ == "__main__":
+    main()
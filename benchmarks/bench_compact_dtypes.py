@@ -0,0 +1,91 @@
+"""
+Benchmark the compact dtypes (categories, Arrow strings, packed ObjectIds)
+against the default object columns.
+
+Each mode runs in its own process on the same synthetic sheet (stored as
+Parquet): load, [compact], validate values, cast and transform. The frame
+size after loading and after the cast, the stage times and the peak RSS
+of the process are compared.
+
+Usage:
+    python benchmarks/bench_compact_dtypes.py --rows 100000 1000000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(script_dir, '..', 'scripts'))
+
+from pipeline_context import load_pipeline_context
+from data_validation import process_excel_data_with_mapping, validate_excel_data_values_table
+from type_coercion import coerce_dataframe_types, compact_dataframe, resolve_target_types
+from run_report import get_peak_rss_bytes
+from synthetic_data import MAPPING_FILE_PATH, generate_synthetic_frame
+
+def run_mode(parquet_path, compact):
+    """Runs the stages in this process and returns the measurements."""
+    context = load_pipeline_context(MAPPING_FILE_PATH)
+    timings = {}
+
+    start = time.perf_counter()
+    df = pd.read_parquet(parquet_path)
+    if compact:
+        df, _ = compact_dataframe(df, context)
+    timings["load"] = time.perf_counter() - start
+    frame_bytes = int(df.memory_usage(deep=True).sum())
+
+    start = time.perf_counter()
+    errors = validate_excel_data_values_table(df, context.validation_rules)
+    timings["validate_values"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    df, _ = coerce_dataframe_types(df[~df.index.isin(errors["row"])], resolve_target_types(context), compact=compact)
+    timings["cast"] = time.perf_counter() - start
+    cast_bytes = int(df.memory_usage(deep=True).sum())
+
+    start = time.perf_counter()
+    documents = process_excel_data_with_mapping(df, context)
+    timings["transform"] = time.perf_counter() - start
+
+    return {"frame_bytes": frame_bytes, "cast_frame_bytes": cast_bytes, "documents": len(documents),
+            "seconds": timings, "peak_rss_bytes": get_peak_rss_bytes()}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--run", help=argparse.SUPPRESS)
+    parser.add_argument("--compact", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        print(json.dumps(run_mode(args.run, args.compact)))
+        return
+
+    print(f"{'rows':>10} {'mode':>8} {'frame MB':>9} {'cast MB':>8} {'peak RSS MB':>12} "
+          f"{'validate (s)':>13} {'cast (s)':>9} {'transform (s)':>14}")
+    with tempfile.TemporaryDirectory() as work_dir:
+        for rows in args.rows:
+            parquet_path = os.path.join(work_dir, f"synthetic_{rows}.parquet")
+            df, _ = generate_synthetic_frame(load_pipeline_context(MAPPING_FILE_PATH).mapping_data, rows)
+            df.to_parquet(parquet_path)
+            del df
+
+            for mode, flags in (("object", []), ("compact", ["--compact"])):
+                output = subprocess.run([sys.executable, __file__, "--run", parquet_path, *flags],
+                                        capture_output=True, text=True, check=True).stdout
+                result = json.loads(output.strip().splitlines()[-1])
+                seconds = result["seconds"]
+                print(f"{rows:>10} {mode:>8} {result['frame_bytes'] / 1e6:9.1f} {result['cast_frame_bytes'] / 1e6:8.1f} "
+                      f"{(result['peak_rss_bytes'] or 0) / 1e6:12.1f} {seconds['validate_values']:13.3f} "
+                      f"{seconds['cast']:9.3f} {seconds['transform']:14.3f}")
+
+
+if __name__ == "__main__":
+    main()
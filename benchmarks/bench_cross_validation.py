@@ -0,0 +1,64 @@
+"""
+Benchmark the cross-field rules on synthetic sheets.
+
+Times the `crossValidation` rules of the mapping, then `--rules` generated
+rules (variations of the mapping rules with other constants, sharing
+sub-expressions like real rule sets do), on frames of `--rows` rows.
+
+Usage:
+    python benchmarks/bench_cross_validation.py --rows 100000 1000000 --rules 200
+"""
+import argparse
+import os
+import sys
+import time
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(script_dir, '..', 'scripts'))
+
+from pipeline_context import load_pipeline_context
+from cross_validation import compile_cross_validation_rules
+from data_validation import validate_excel_data_values_table
+from synthetic_data import MAPPING_FILE_PATH, generate_synthetic_frame
+
+BOROUGH_CODES = ["MN", "BX", "BK", "QN", "SI"]
+
+def generate_rules(count):
+    """`count` rule specs over the synthetic columns."""
+    specs = []
+    for index in range(count):
+        borough_code = BOROUGH_CODES[index % len(BOROUGH_CODES)]
+        templates = [
+            ("notnull(PostalCode) and BoroughCode == '{code}'", "number(PostalCode) > {low}"),
+            ("notnull(Borough)", "Borough == dependency(Borough) or BoroughCode != '{code}'"),
+            ("notnull(DesignationDate)", "date(DesignationDate) > date('19{year:02d}-01-01') or notnull(LPNumber)"),
+            ("BoroughCode in ['{code}']", "len(Title) > {length} and startswith(PostalCode, ['1'])"),
+        ]
+        when, require = templates[index % len(templates)]
+        values = {"code": borough_code, "low": 10000 - index, "year": index % 100, "length": index % 5}
+        specs.append({"name": f"rule{index}", "when": when.format(**values), "require": require.format(**values)})
+    return specs
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--rules", type=int, default=200)
+    args = parser.parse_args()
+
+    context = load_pipeline_context(MAPPING_FILE_PATH)
+    mapping_rules = [rule for rule in context.validation_rules if "check" in rule]
+    start = time.perf_counter()
+    generated_rules = compile_cross_validation_rules(generate_rules(args.rules), context.mapping_data)
+    print(f"Compiled {args.rules} rules in {time.perf_counter() - start:.3f}s")
+
+    print(f"{'rows':>10} {'rules':>6} {'seconds':>9} {'errors':>8}")
+    for rows in args.rows:
+        df, _ = generate_synthetic_frame(context.mapping_data, rows)
+        for rules in (mapping_rules, generated_rules):
+            start = time.perf_counter()
+            errors = validate_excel_data_values_table(df, rules)
+            print(f"{rows:>10} {len(rules):>6} {time.perf_counter() - start:9.3f} {len(errors):>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark the STRtree point-in-polygon enrichment against a linear polygon scan per row.
+
+A grid of square "neighborhoods" covering New York City stands in for
+nycneighborhoods.geojson. The linear scan only runs on a sample of the points
+and its time is extrapolated to the full size.
+
+Usage:
+    python benchmarks/bench_geo_enrichment.py --points 10000 100000 --polygons 200
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+from shapely.geometry import Point, shape
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(script_dir, '..', 'scripts'))
+
+from geo_enrichment import enrich_locations, load_neighborhood_index
+from bench_validate_values import MAPPING_FILE_PATH, timed
+
+BOUNDS = (-74.26, 40.49, -73.70, 40.92)
+BOROUGHS = ["Manhattan", "Bronx", "Brooklyn", "Queens", "Staten Island"]
+
+def write_grid_geojson(path, polygons):
+    """Writes a FeatureCollection of about `polygons` squares covering `BOUNDS`."""
+    side = int(np.ceil(np.sqrt(polygons)))
+    xs = np.linspace(BOUNDS[0], BOUNDS[2], side + 1)
+    ys = np.linspace(BOUNDS[1], BOUNDS[3], side + 1)
+    features = []
+    for i in range(side):
+        for j in range(side):
+            ring = [[xs[i], ys[j]], [xs[i + 1], ys[j]], [xs[i + 1], ys[j + 1]], [xs[i], ys[j + 1]], [xs[i], ys[j]]]
+            features.append({
+                "type": "Feature",
+                "properties": {"neighborhood": f"Neighborhood {i}-{j}", "borough": BOROUGHS[(i + j) % 5]},
+                "geometry": {"type": "Polygon", "coordinates": [ring]},
+            })
+    with open(path, 'w') as file:
+        json.dump({"type": "FeatureCollection", "features": features}, file)
+
+def make_points(points, seed=0):
+    """Random points within the bounds; half of them repeat earlier coordinates (e.g. one park, many monuments)."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "Id": np.arange(points).astype(str),
+        "Latitude": rng.uniform(BOUNDS[1], BOUNDS[3], points).round(6),
+        "Longitude": rng.uniform(BOUNDS[0], BOUNDS[2], points).round(6),
+    })
+    repeated = rng.random(points) < 0.5
+    source = rng.integers(0, max(points // 10, 1), size=points)
+    df.loc[repeated, ["Latitude", "Longitude"]] = df.loc[source[repeated], ["Latitude", "Longitude"]].to_numpy()
+    return df
+
+def linear_scan(df, geojson_path):
+    """The per-row scan over every polygon the notebooks did by hand."""
+    with open(geojson_path, 'r') as file:
+        features = json.load(file)["features"]
+    polygons = [(shape(feature["geometry"]), feature["properties"]) for feature in features]
+    neighborhoods = []
+    for row in df.itertuples(index=False):
+        point = Point(row.Longitude, row.Latitude)
+        neighborhoods.append(next((properties["neighborhood"] for polygon, properties in polygons
+                                   if polygon.intersects(point)), None))
+    return neighborhoods
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--polygons", type=int, default=200)
+    parser.add_argument("--linear-sample", type=int, default=2_000,
+                        help="Number of points the linear scan runs on before extrapolating.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        geojson_path = os.path.join(work_dir, "grid.geojson")
+        write_grid_geojson(geojson_path, args.polygons)
+
+        build_time, _ = timed(load_neighborhood_index, geojson_path, os.path.join(work_dir, "cache"))
+        print(f"Index build ({args.polygons} polygons): {build_time:.3f}s")
+
+        print(f"{'points':>10} {'linear (s, est.)':>17} {'indexed (s)':>12} {'speedup':>9} {'matched':>9}")
+        for points in args.points:
+            df = make_points(points)
+            # A fresh memo per size so lookups do not carry over
+            index = {**load_neighborhood_index(geojson_path, os.path.join(work_dir, "cache")), "memo": {}}
+
+            indexed_time, (enriched, matched) = timed(enrich_locations, df, index, MAPPING_FILE_PATH)
+
+            sample = df.head(args.linear_sample)
+            sample_time, neighborhoods = timed(linear_scan, sample, geojson_path)
+            if neighborhoods != enriched["Neighborhood"].head(args.linear_sample).tolist():
+                raise AssertionError("Neighborhoods differ between the linear scan and the index")
+            linear_time = sample_time * points / len(sample)
+
+            print(f"{points:>10} {linear_time:17.3f} {indexed_time:12.3f} {linear_time / indexed_time:8.1f}x "
+                  f"{matched:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark the Id checks: duplicates in a sheet and membership in a reference id set.
+
+A reference dump of `--references` ids (one per line, like a mongoexport
+`_id` dump) is written and indexed, then `--rows` sheet ids (half of them
+from the reference set, a few repeated) are checked against it.
+
+Usage:
+    python benchmarks/bench_id_index.py --rows 1000000 --references 10000000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(script_dir, '..', 'scripts'))
+
+from id_index import build_reference_id_index, check_object_ids
+from run_report import get_peak_rss_bytes
+
+def random_ids(rng, count):
+    """`count` random ids as 24-digit hex strings (numpy unicode array)."""
+    raw = rng.integers(0, 256, size=(count, 12), dtype=np.uint8)
+    digits = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+    hex_digits = np.empty((count, 24), dtype=np.uint8)
+    hex_digits[:, 0::2] = digits[raw >> 4]
+    hex_digits[:, 1::2] = digits[raw & 0x0F]
+    return hex_digits.view("S24").ravel().astype("U24")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--references", type=int, default=10_000_000)
+    parser.add_argument("--duplicate-rate", type=float, default=0.001)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    references = random_ids(rng, args.references)
+    sheet_ids = np.concatenate([references[:args.rows // 2], random_ids(rng, args.rows - args.rows // 2)])
+    repeated = rng.random(args.rows) < args.duplicate_rate
+    sheet_ids[repeated] = sheet_ids[0]
+    df = pd.DataFrame({"Id": pd.Series(sheet_ids, dtype="string[pyarrow]")})
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        dump_path = os.path.join(work_dir, "ids.txt")
+        with open(dump_path, "w") as file:
+            file.write("\n".join(references))
+        del references
+
+        start = time.perf_counter()
+        index = build_reference_id_index(dump_path, os.path.join(work_dir, "index"))
+        build_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        errors, _ = check_object_ids(df, index)
+        check_seconds = time.perf_counter() - start
+
+    counts = errors["rule"].value_counts().to_dict()
+    print(f"Indexed {len(index)} reference ids in {build_seconds:.2f}s "
+          f"(ids {index.ids.nbytes / 1e6:.0f} MB, Bloom filter {index.bloom.nbytes / 1e6:.0f} MB, memory-mapped)")
+    print(f"Checked {args.rows} ids in {check_seconds:.2f}s: {counts}")
+    print(f"Peak RSS {(get_peak_rss_bytes() or 0) / 1e6:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
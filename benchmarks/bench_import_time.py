@@ -0,0 +1,83 @@
+"""
+Benchmark the startup time of the `cli.py` subcommands with `python -X importtime`.
+
+Each command runs `--repeat` times in a fresh interpreter. The median wall
+time, the import time reported by `-X importtime` and the slowest top-level
+imports are printed, and the script exits with status 1 when a metadata
+command (`--help`, `check`, `columns` on a CSV file) takes longer than
+`--budget-ms` or imports pandas. `columns` on a workbook loads openpyxl and
+`main.py --help` imports the whole pipeline; both are shown for comparison.
+
+Usage:
+    python benchmarks/bench_import_time.py --budget-ms 100
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.join(script_dir, '..')
+HEAVY_MODULES = ("pandas", "numpy", "openpyxl", "pyarrow", "graphql")
+
+# (name, command line, checked against the budget)
+COMMANDS = [
+    ("cli --help", ["scripts/cli.py", "--help"], True),
+    ("cli check", ["scripts/cli.py", "check", "data/test/Location-Import_Test.xlsx"], True),
+    ("cli columns (csv)", ["scripts/cli.py", "columns", "data/test/landmarks_api_Test.csv"], True),
+    ("cli columns (xlsx)", ["scripts/cli.py", "columns", "data/test/Location-Import_Test.xlsx"], False),
+    ("main.py --help", ["scripts/main.py", "--help"], False),
+]
+
+def parse_importtime(stderr):
+    """Returns {module: cumulative microseconds} of the top-level imports in `-X importtime` output."""
+    imports = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name.startswith("  "):
+            imports[name.strip()] = int(cumulative)
+    return imports
+
+def run_command(arguments, repeat):
+    """Runs the command `repeat` times; returns the median wall seconds and the imports of the last run."""
+    timings, imports = [], {}
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, "-X", "importtime", *arguments], cwd=REPO_DIR,
+                                capture_output=True, text=True)
+        timings.append(time.perf_counter() - start)
+        imports = parse_importtime(result.stderr)
+    return statistics.median(timings), imports
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=100.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=3, help="Slowest top-level imports shown per command.")
+    args = parser.parse_args()
+
+    baseline, _ = run_command(["-c", "pass"], args.repeat)
+    print(f"{'interpreter only':20} {baseline * 1000:8.1f} ms")
+
+    failures = []
+    for name, arguments, budgeted in COMMANDS:
+        seconds, imports = run_command(arguments, args.repeat)
+        heavy = sorted(module for module in imports if module.split(".")[0] in HEAVY_MODULES)
+        slowest = sorted(imports.items(), key=lambda item: -item[1])[:args.top]
+        print(f"{name:20} {seconds * 1000:8.1f} ms, imports {sum(imports.values()) / 1000:6.1f} ms: "
+              + ", ".join(f"{module} {us / 1000:.1f} ms" for module, us in slowest))
+        if budgeted and (seconds * 1000 > args.budget_ms or heavy):
+            failures.append(f"{name}: {seconds * 1000:.1f} ms" + (f", imports {', '.join(heavy)}" if heavy else ""))
+
+    if failures:
+        print(f"Over the {args.budget_ms:.0f} ms budget: " + "; ".join(failures))
+        sys.exit(1)
+    print(f"Metadata commands within the {args.budget_ms:.0f} ms budget.")
+
+
+if __name__ == "__main__":
+    main()
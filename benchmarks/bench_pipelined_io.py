@@ -0,0 +1,62 @@
+"""
+Benchmark the streaming import with and without the pipelined (threaded) stages.
+
+A synthetic workbook is written to a temporary directory together with the
+mapping, schema and template, and the streaming pipeline of `main.py` is run
+in both modes. The work/wait table shows which stage limits the pipeline.
+
+Usage:
+    python benchmarks/bench_pipelined_io.py --rows 50000 --chunk-size 5000
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(script_dir, '..', 'scripts'))
+
+import main as pipeline
+from pipelined_io import log_pipeline_timings
+from run_report import RunReport
+from bench_validate_values import make_frame
+
+SOURCE_FILES = {
+    pipeline.MAPPING_FILE_PATH: os.path.join(script_dir, '..', 'mapping', 'attration.json'),
+    pipeline.SCHEMA_FILE_PATH: os.path.join(script_dir, '..', 'schemas', 'Attraction.ql'),
+    pipeline.TEMPLATE_PATH: os.path.join(script_dir, '..', 'templates', 'display-array.template'),
+}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--chunk-size", type=int, default=5_000)
+    parser.add_argument("--queue-size", type=int, default=2)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp()
+    current_dir = os.getcwd()
+    try:
+        for name, source in SOURCE_FILES.items():
+            shutil.copy(source, os.path.join(work_dir, name))
+        make_frame(args.rows).to_excel(os.path.join(work_dir, pipeline.EXCEL_FILE_PATH), index=False)
+        os.chdir(work_dir)
+
+        error_options = {"policy": "quarantine", "rejects_path": pipeline.REJECTS_PATH}
+        for pipelined in (False, True):
+            report = RunReport()
+            started = time.perf_counter()
+            pipeline.run_streaming_pipeline(args.chunk_size, report=report, error_options=error_options,
+                                            pipelined=pipelined, queue_size=args.queue_size)
+            print(f"{'pipelined' if pipelined else 'sequential':>10}: {time.perf_counter() - started:.3f}s "
+                  f"({args.rows} rows, chunks of {args.chunk_size})")
+        log_pipeline_timings(report.pipeline)
+    finally:
+        os.chdir(current_dir)
+        shutil.rmtree(work_dir)
+
+
+if __name__ == "__main__":
+    main()
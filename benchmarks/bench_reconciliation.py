@@ -0,0 +1,75 @@
+"""
+Benchmark the reconciliation of an import sheet with a reference extract.
+
+A synthetic `landmarks_api_*.csv` extract is generated together with a sheet
+where most rows share the reference `Id`, some only the `LPNumber`, some
+only a misspelled title, and the rest are new.
+
+Usage:
+    python benchmarks/bench_reconciliation.py --rows 100000 1000000
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(script_dir, '..', 'scripts'))
+
+from reconciliation import load_reference_extract, reconcile_with_reference, summarize_reconciliation
+from bench_validate_values import timed
+
+VOCABULARY_SIZE = 20_000
+
+def make_reference(rows, seed=0):
+    """A reference extract with unique ObjectIds, LP numbers and three-word titles."""
+    rng = np.random.default_rng(seed)
+    words = pd.Series([f"w{number:05d}" for number in range(VOCABULARY_SIZE)])
+    title_words = rng.integers(0, VOCABULARY_SIZE, size=(rows, 3))
+    titles = words[title_words[:, 0]].to_numpy() + " " + words[title_words[:, 1]].to_numpy() + " " + \
+        words[title_words[:, 2]].to_numpy()
+    return pd.DataFrame({
+        "_id": [f"{number:024x}" for number in range(rows)],
+        "title": titles,
+        "lpNumber": [f"LP-{number:07d}" for number in range(rows)],
+        "aliases": None,
+        "areaName": titles,
+    })
+
+def make_sheet(reference, seed=1):
+    """90% of the rows match by Id, 5% by LPNumber, 3% by a misspelled title and 2% are new."""
+    rng = np.random.default_rng(seed)
+    rows = len(reference)
+    kind = rng.choice(4, size=rows, p=[0.90, 0.05, 0.03, 0.02])
+    df = pd.DataFrame({
+        "Id": reference["_id"].where(kind == 0),
+        "LPNumber": reference["lpNumber"].where(kind == 1),
+        "Title": reference["title"].where(kind != 3, "brand new landmark " + pd.Series(np.arange(rows)).astype(str)),
+    })
+    # Misspell the title of the rows only matched by title
+    df.loc[kind == 2, "Title"] = df.loc[kind == 2, "Title"].str.replace("w", "W", n=1) + "s"
+    return df
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'load csv (s)':>13} {'reconcile (s)':>14}  statuses")
+    for rows in args.rows:
+        reference = make_reference(rows)
+        df = make_sheet(reference)
+        with tempfile.TemporaryDirectory() as work_dir:
+            csv_path = os.path.join(work_dir, "landmarks_api.csv")
+            reference.to_csv(csv_path, index=False)
+            load_time, reference = timed(load_reference_extract, csv_path)
+
+        reconcile_time, reconciliation = timed(reconcile_with_reference, df, reference)
+        print(f"{rows:>10} {load_time:13.3f} {reconcile_time:14.3f}  {summarize_reconciliation(reconciliation)}")
+
+
+if __name__ == "__main__":
+    main()
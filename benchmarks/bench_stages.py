@@ -0,0 +1,189 @@
+"""
+Benchmark each pipeline stage on synthetic sheets and store the results as JSON.
+
+The sheets are generated from the mapping file (see `synthetic_data.py`).
+Stages: load (openpyxl parse, and again from the Excel cache), validate
+values, validate types, cast, transform and serialize. Each stage runs
+`--repeat` times; the best and median times are kept.
+
+Results are written to `benchmarks/results/<commit>.json`. Pass a previous
+result file with `--compare` to list the stages that became slower than
+`--threshold`; the exit code is 1 when there is a regression.
+
+Usage:
+    python benchmarks/bench_stages.py --rows 1000 100000 1000000
+    python benchmarks/bench_stages.py --rows 100000 --compare benchmarks/results/<base>.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(script_dir, '..', 'scripts'))
+
+from pipeline_context import load_pipeline_context
+from file_manager import load_excel_data
+from data_validation import (
+    process_excel_data_with_mapping,
+    validate_excel_data_types_with_df,
+    validate_excel_data_values_table,
+)
+from type_coercion import coerce_dataframe_types, resolve_target_types
+from mongodb_loader import get_document_field_types
+from output_writer import write_documents
+from synthetic_data import DEFAULT_ERROR_RATE, MAPPING_FILE_PATH, generate_synthetic_frame
+
+SCHEMA_FILE_PATH = os.path.join(script_dir, '..', 'schemas', 'Attraction.ql')
+TEMPLATE_PATH = os.path.join(script_dir, '..', 'templates', 'display-array.template')
+RESULTS_DIR = os.path.join(script_dir, 'results')
+DEFAULT_THRESHOLD = 0.1
+
+def get_commit():
+    """Returns the short hash of the checked out commit, or "unknown" outside a git checkout."""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=script_dir, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def measure(func, repeat):
+    """Runs `func` `repeat` times and returns the timings and the last result."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return timings, result
+
+def run_stages(context, rows, work_dir, repeat, load_max_rows, error_rate):
+    """Times the stages on a sheet of `rows` rows; each stage gets the output of the previous one."""
+    df, _ = generate_synthetic_frame(context.mapping_data, rows, error_rate)
+    target_types = resolve_target_types(context)
+    stages = {}
+
+    if rows <= load_max_rows:
+        excel_path = os.path.join(work_dir, f"synthetic_{rows}.xlsx")
+        df.to_excel(excel_path, index=False)
+        os.environ["NAVIGATOR_EXCEL_CACHE"] = "0"
+        stages["load"], df = measure(lambda: load_excel_data(excel_path), repeat)
+        os.environ["NAVIGATOR_EXCEL_CACHE"] = "1"
+        load_excel_data(excel_path)
+        stages["load_cached"], df = measure(lambda: load_excel_data(excel_path), repeat)
+
+    stages["validate_values"], _ = measure(
+        lambda: validate_excel_data_values_table(df, context.validation_rules), repeat)
+    stages["validate_types"], _ = measure(lambda: validate_excel_data_types_with_df(df, context), repeat)
+    stages["cast"], (coerced, _) = measure(lambda: coerce_dataframe_types(df, target_types), repeat)
+    stages["transform"], documents = measure(lambda: process_excel_data_with_mapping(coerced, context), repeat)
+    field_types = get_document_field_types(context)
+    stages["serialize"], _ = measure(
+        lambda: write_documents(documents, os.path.join(work_dir, "output_array.js"),
+                                template_content=context.template_content, field_types=field_types), repeat)
+
+    return [{
+        "stage": stage,
+        "rows": rows,
+        "repeat": repeat,
+        "min_seconds": min(timings),
+        "median_seconds": statistics.median(timings),
+        "rows_per_second": rows / min(timings) if min(timings) else None,
+    } for stage, timings in stages.items()]
+
+def compare_results(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Compares the best times of two result files, stage by stage and size by size.
+
+    Parameters:
+        - results (dict): The current results.
+        - baseline (dict): The results to compare against.
+        - threshold (float): Relative slowdown (0.1 = 10%) above which a stage counts as a regression.
+
+    Returns:
+        - list: One dict per stage and size found in both files, with the `ratio`
+          (current / baseline) and whether it is a `regression`.
+    """
+    baseline_times = {(entry["stage"], entry["rows"]): entry["min_seconds"] for entry in baseline["results"]}
+    comparison = []
+    for entry in results["results"]:
+        base = baseline_times.get((entry["stage"], entry["rows"]))
+        if not base:
+            continue
+        ratio = entry["min_seconds"] / base
+        comparison.append({"stage": entry["stage"], "rows": entry["rows"], "baseline_seconds": base,
+                           "seconds": entry["min_seconds"], "ratio": ratio, "regression": ratio > 1 + threshold})
+    return comparison
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--error-rate", type=float, default=DEFAULT_ERROR_RATE)
+    parser.add_argument("--load-max-rows", type=int, default=100_000,
+                        help="Skip the load stages above this size (writing the workbook takes minutes at 1M rows).")
+    parser.add_argument("--output", help="Result file. Defaults to benchmarks/results/<commit>.json.")
+    parser.add_argument("--compare", help="Previous result file to compare against.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Relative slowdown reported as a regression.")
+    args = parser.parse_args()
+
+    context = load_pipeline_context(MAPPING_FILE_PATH, SCHEMA_FILE_PATH, TEMPLATE_PATH)
+    results = {
+        "commit": get_commit(),
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "error_rate": args.error_rate,
+        "results": [],
+    }
+
+    work_dir = tempfile.mkdtemp()
+    cache_setting = os.environ.get("NAVIGATOR_EXCEL_CACHE")
+    cache_dir = os.environ.get("NAVIGATOR_EXCEL_CACHE_DIR")
+    os.environ["NAVIGATOR_EXCEL_CACHE_DIR"] = os.path.join(work_dir, "cache")
+    try:
+        print(f"{'stage':>16} {'rows':>10} {'best (s)':>10} {'median (s)':>11} {'rows/s':>12}")
+        for rows in args.rows:
+            for entry in run_stages(context, rows, work_dir, args.repeat, args.load_max_rows, args.error_rate):
+                results["results"].append(entry)
+                print(f"{entry['stage']:>16} {rows:>10} {entry['min_seconds']:10.3f} "
+                      f"{entry['median_seconds']:11.3f} {entry['rows_per_second'] or 0:12.0f}")
+    finally:
+        for name, value in (("NAVIGATOR_EXCEL_CACHE", cache_setting), ("NAVIGATOR_EXCEL_CACHE_DIR", cache_dir)):
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+        shutil.rmtree(work_dir)
+
+    output_path = args.output or os.path.join(RESULTS_DIR, f"{results['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with open(output_path, "w") as file:
+        json.dump(results, file, indent=2)
+    print(f"Results saved to {output_path}")
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        comparison = compare_results(results, baseline, args.threshold)
+        print(f"Compared with {baseline.get('commit', args.compare)}:")
+        for entry in comparison:
+            flag = "REGRESSION" if entry["regression"] else ""
+            print(f"{entry['stage']:>16} {entry['rows']:>10} {entry['baseline_seconds']:10.3f} -> "
+                  f"{entry['seconds']:.3f}s ({entry['ratio']:.2f}x) {flag}")
+        if any(entry["regression"] for entry in comparison):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
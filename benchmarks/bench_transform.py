@@ -0,0 +1,68 @@
+"""
+Benchmark the columnar document builder against the original row-wise loop.
+
+Usage:
+    python benchmarks/bench_transform.py --rows 10000 100000 1000000
+"""
+import argparse
+import os
+import sys
+import time
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(script_dir, '..', 'scripts'))
+
+from data_validation import get_mapping_data, process_excel_data_with_mapping
+from bench_validate_values import MAPPING_FILE_PATH, make_frame, timed
+
+def legacy_process_excel_data_with_mapping(df, mapping_data):
+    """The original `iterrows` implementation, kept here as the baseline."""
+    output_array = []
+    for index, row in df.iterrows():
+        document = {}
+        for field, config in mapping_data.items():
+            if config["column"] not in df.columns and not config["isRequired"]:
+                continue
+            if "dependency" in config:
+                dependency_field = config["dependency"]["fieldName"]
+                dependency_mapping = config["dependency"]["mapping"]
+                if row[dependency_field] in dependency_mapping:
+                    document[config["documentField"]] = dependency_mapping[row[dependency_field]]
+                else:
+                    document[config["documentField"]] = None
+            else:
+                document[config["documentField"]] = row[config["column"]]
+        output_array.append(document)
+    return output_array
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--legacy-max-rows", type=int, default=1_000_000,
+                        help="Skip the row-wise baseline above this size.")
+    args = parser.parse_args()
+
+    mapping_data = get_mapping_data(MAPPING_FILE_PATH)
+
+    print(f"{'rows':>10} {'legacy (s)':>12} {'columnar (s)':>13} {'speedup':>9}")
+    for rows in args.rows:
+        df = make_frame(rows)
+        df["Borough"] = None
+
+        columnar_time, documents = timed(process_excel_data_with_mapping, df, mapping_data)
+
+        if rows <= args.legacy_max_rows:
+            legacy_time, legacy_documents = timed(legacy_process_excel_data_with_mapping, df, mapping_data)
+            if len(legacy_documents) != len(documents):
+                raise AssertionError("Document counts differ between legacy and columnar builders")
+            legacy_column = f"{legacy_time:12.3f}"
+            speedup_column = f"{legacy_time / columnar_time:8.1f}x"
+        else:
+            legacy_column = f"{'skipped':>12}"
+            speedup_column = f"{'-':>9}"
+
+        print(f"{rows:>10} {legacy_column} {columnar_time:13.3f} {speedup_column}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark the vectorized value validation against the original row-wise loop.
+
+Usage:
+    python benchmarks/bench_validate_values.py --rows 10000 100000 1000000
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(script_dir, '..', 'scripts'))
+
+from data_validation import (
+    get_mapping_data,
+    compile_validation_rules,
+    validate_excel_data_values_table,
+)
+
+MAPPING_FILE_PATH = os.path.join(script_dir, '..', 'mapping', 'attration.json')
+
+def legacy_validate_excel_data_values_with_df(df, mapping_data):
+    """The original `iterrows` implementation, kept here as the baseline."""
+    errors = []
+
+    for _, row in df.iterrows():
+        for column, mapping_value in mapping_data.items():
+            if column in row:
+                if 'validation' in mapping_value:
+                    validation_rules = mapping_value['validation']
+
+                    allowed_values = validation_rules.get('allowedValues', [])
+                    if allowed_values:
+                        if row[column] not in allowed_values:
+                            errors.append(f"Id {row['Id']} has invalid value {row[column]} in column {column}. Expected one of {allowed_values}.")
+
+                    min_length = validation_rules.get('minLength')
+                    if min_length:
+                        if len(str(row[column])) < min_length:
+                            errors.append(f"Id {row['Id']} has invalid value {row[column]} in column {column}. Length is less than minimum required length of {min_length}.")
+
+                    max_length = validation_rules.get('maxLength')
+                    if max_length:
+                        if len(str(row[column])) > max_length:
+                            errors.append(f"Id {row['Id']} has invalid value {row[column]} in column {column}. Length exceeds maximum allowed length of {max_length}.")
+
+                    pattern = validation_rules.get('pattern')
+                    if pattern:
+                        regex = re.compile(pattern)
+                        if not regex.match(str(row[column])):
+                            errors.append(f"Id {row['Id']} has invalid value {row[column]} in column {column}. Does not match the required pattern {pattern}.")
+
+    return errors
+
+def make_frame(rows, error_rate=0.01, seed=0):
+    """Builds a synthetic Location-Import style frame with a small share of bad values."""
+    rng = np.random.default_rng(seed)
+    boroughs = np.array(["MN", "BX", "BK", "QN", "SI"])
+    ids = [f"{value:024x}" for value in rng.integers(0, 2 ** 62, size=rows)]
+    df = pd.DataFrame({
+        "Id": ids,
+        "BoroughCode": boroughs[rng.integers(0, len(boroughs), size=rows)],
+        "Neighborhood": "Central Park",
+        "City": "New York",
+        "PostalCode": rng.integers(10001, 11698, size=rows).astype(str),
+    })
+    bad = rng.random(rows) < error_rate
+    df.loc[bad, "BoroughCode"] = "XX"
+    df.loc[bad, "PostalCode"] = "100AZ"
+    return df
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--legacy-max-rows", type=int, default=100_000,
+                        help="Skip the row-wise baseline above this size (it takes minutes at 1M rows).")
+    args = parser.parse_args()
+
+    mapping_data = get_mapping_data(MAPPING_FILE_PATH)
+
+    print(f"{'rows':>10} {'legacy (s)':>12} {'vectorized (s)':>15} {'speedup':>9} {'errors':>8}")
+    for rows in args.rows:
+        df = make_frame(rows)
+
+        vectorized_time, table = timed(
+            lambda frame: validate_excel_data_values_table(frame, compile_validation_rules(mapping_data)), df)
+
+        if rows <= args.legacy_max_rows:
+            legacy_time, legacy_errors = timed(legacy_validate_excel_data_values_with_df, df, mapping_data)
+            if len(legacy_errors) != len(table):
+                raise AssertionError(f"Error counts differ: legacy {len(legacy_errors)}, vectorized {len(table)}")
+            legacy_column = f"{legacy_time:12.3f}"
+            speedup_column = f"{legacy_time / vectorized_time:8.1f}x"
+        else:
+            legacy_column = f"{'skipped':>12}"
+            speedup_column = f"{'-':>9}"
+
+        print(f"{rows:>10} {legacy_column} {vectorized_time:15.3f} {speedup_column} {len(table):>8}")
+
+
+if __name__ == "__main__":
+    main()
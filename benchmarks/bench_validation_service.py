@@ -0,0 +1,70 @@
+"""
+Benchmark a validation through the warm service against a fresh process per call.
+
+The cold path starts Python, imports pandas, parses the mapping and the
+workbook and validates, like a script call of the ChatGPT workflow. The
+warm path posts the same request to a `validation_service` running in this
+process: the first request parses the files, the next ones are served from
+its caches.
+
+Usage:
+    python benchmarks/bench_validation_service.py --excel-file data/test/Location-Import-Test-Validation.xlsx
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(script_dir, '..', 'scripts'))
+
+from validation_service import create_server
+
+REPO_DIR = os.path.join(script_dir, '..')
+COLD_SCRIPT = """
+import sys
+sys.path.append("scripts")
+from data_validation import validate_excel_data_values_with_df
+from file_manager import load_excel_data
+validate_excel_data_values_with_df(load_excel_data(sys.argv[1]), "mapping/attration.json")
+"""
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--excel-file", default="data/test/Location-Import-Test-Validation.xlsx")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    excel_file = os.path.abspath(os.path.join(REPO_DIR, args.excel_file))
+
+    cold = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", COLD_SCRIPT, excel_file], cwd=REPO_DIR, check=True)
+        cold.append(time.perf_counter() - start)
+
+    os.chdir(REPO_DIR)
+    server = create_server(port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/validate"
+    warm = []
+    for _ in range(args.repeat + 1):
+        request = urllib.request.Request(url, data=json.dumps({"excel_file": excel_file}).encode(), method="POST",
+                                         headers={"Content-Type": "application/json"})
+        start = time.perf_counter()
+        with urllib.request.urlopen(request) as response:
+            json.load(response)
+        warm.append(time.perf_counter() - start)
+    server.shutdown()
+
+    print(f"fresh process per call: median {statistics.median(cold) * 1000:8.1f} ms")
+    print(f"service, first request: {warm[0] * 1000:8.1f} ms")
+    print(f"service, repeat:        median {statistics.median(warm[1:]) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Synthetic Location-Import sheets generated from a mapping file.
+
+Every mapped column gets values that pass its `validation` block: unique
+24-character hex ObjectIds, allowed values (e.g. borough codes), five-digit
+postal codes, strings within the `length` bounds, dates and longs for the
+typed columns. Columns with a `dependency` (Borough) are derived from their
+source column and the postal codes are drawn from the borough of the row,
+so the rows pass the cross-field rules of the mapping. A share of `error_rate` rows gets
+one invalid value in a validated column.
+
+Usage:
+    python benchmarks/synthetic_data.py --rows 100000 --output synthetic.xlsx
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(script_dir, '..', 'scripts'))
+
+from data_validation import get_mapping_data
+
+MAPPING_FILE_PATH = os.path.join(script_dir, '..', 'mapping', 'attration.json')
+
+DEFAULT_ERROR_RATE = 0.01
+# Share of missing cells in the optional columns without validation rules
+DEFAULT_NULL_RATE = 0.05
+POSTAL_CODE_RANGE = (10001, 11698)
+BOROUGH_POSTAL_CODE_RANGES = {
+    "MN": (10001, 10283),
+    "BX": (10451, 10476),
+    "BK": (11201, 11257),
+    "QN": (11354, 11437),
+    "SI": (10301, 10315),
+}
+WORDS = np.array(["Bronze", "Granite", "Harbor", "Memorial", "Garden", "Statue", "Fountain", "Plaza", "Hall",
+                  "Tower", "Bridge", "Chapel", "Terrace", "Pavilion", "Gate", "Column"])
+
+def _object_ids(rng, rows):
+    """Unique ObjectId strings: a 4-byte timestamp, a random 5-byte value and a 3-byte counter."""
+    timestamps = rng.integers(1_500_000_000, 1_700_000_000, size=rows)
+    randoms = rng.integers(0, 2 ** 40, size=rows)
+    counters = np.arange(rows) % (2 ** 24)
+    return pd.Series([f"{t:08x}{r:010x}{c:06x}" for t, r, c in zip(timestamps, randoms, counters)], dtype=object)
+
+def _words(rng, rows, min_length=1, max_length=None):
+    """Strings of words from `WORDS`, padded or cut to stay within the length bounds."""
+    first = WORDS[rng.integers(0, len(WORDS), size=rows)]
+    second = WORDS[rng.integers(0, len(WORDS), size=rows)]
+    values = pd.Series(np.char.add(np.char.add(first, " "), second), dtype=object)
+    values = values.str.pad(min_length, side="right", fillchar="x")
+    if max_length:
+        values = values.str.slice(0, max_length)
+    return values
+
+def _column_values(rng, config, rows):
+    """Valid values for one mapped column, following its validation block and type."""
+    validation = config.get("validation", {})
+    length = validation.get("length", {})
+    min_length = validation.get("minLength", length.get("min", 1))
+    max_length = validation.get("maxLength", length.get("max"))
+    pattern = validation.get("pattern", "")
+
+    if validation.get("allowedValues"):
+        allowed = np.array(validation["allowedValues"], dtype=object)
+        return pd.Series(allowed[rng.integers(0, len(allowed), size=rows)], dtype=object)
+    if pattern == "^[a-fA-F0-9]{24}$" or config.get("type") == "objectId":
+        return _object_ids(rng, rows)
+    if pattern == "^\\d{5}$":
+        return pd.Series(rng.integers(*POSTAL_CODE_RANGE, size=rows).astype(str), dtype=object)
+    if config.get("type") == "date":
+        return pd.Series(pd.to_datetime(rng.integers(-5000, 20000, size=rows), unit="D"))
+    if config.get("type") in ("long", "int"):
+        return pd.Series(rng.integers(1_000_000_000, 5_999_999_999, size=rows))
+    if config.get("type") in ("float", "double"):
+        return pd.Series(rng.uniform(0, 1000, size=rows))
+    if max_length and max_length <= 6:
+        prefixes = np.array(["M", "X", "B", "Q", "R"])
+        values = pd.Series(np.char.add(prefixes[rng.integers(0, len(prefixes), size=rows)],
+                                       rng.integers(0, 1000, size=rows).astype(str)), dtype=object)
+        return values.str.pad(min_length, side="right", fillchar="0").str.slice(0, max_length)
+    values = _words(rng, rows, min_length, max_length)
+    if not validation and not config.get("isRequired"):
+        values[rng.random(rows) < DEFAULT_NULL_RATE] = None
+    return values
+
+def _postal_codes(rng, borough_codes):
+    """Postal codes within the range of each row's borough code."""
+    codes = pd.Series(rng.integers(*POSTAL_CODE_RANGE, size=len(borough_codes)), index=borough_codes.index)
+    for borough_code, (low, high) in BOROUGH_POSTAL_CODE_RANGES.items():
+        selected = (borough_codes == borough_code).to_numpy()
+        codes[selected] = rng.integers(low, high, size=int(selected.sum()))
+    return codes.astype(str).astype(object)
+
+def _invalid_value(config):
+    """A value that breaks the first validation rule of a column."""
+    validation = config["validation"]
+    length = validation.get("length", {})
+    if validation.get("allowedValues"):
+        return "XX"
+    if validation.get("pattern"):
+        return "not-valid"
+    max_length = validation.get("maxLength", length.get("max"))
+    if max_length:
+        return "x" * (max_length + 1)
+    return "x" * max(validation.get("minLength", length.get("min", 1)) - 1, 0)
+
+def generate_synthetic_frame(mapping_data, rows, error_rate=DEFAULT_ERROR_RATE, seed=0):
+    """
+    Generates a sheet of `rows` rows with the columns of the mapping.
+
+    Parameters:
+        - mapping_data (dict): The mapping data.
+        - rows (int): Number of rows.
+        - error_rate (float): Share of rows (0-1) with one invalid value in a validated column.
+        - seed (int): Seed of the random generator; the same seed gives the same frame.
+
+    Returns:
+        - tuple: The DataFrame and a boolean Series marking the rows with an injected error.
+    """
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for config in mapping_data.values():
+        if "dependency" not in config:
+            columns[config["column"]] = _column_values(rng, config, rows)
+    for config in mapping_data.values():
+        if "dependency" in config:
+            dependency = config["dependency"]
+            columns[config["column"]] = columns[dependency["fieldName"]].map(dependency["mapping"])
+    if "PostalCode" in columns and "BoroughCode" in columns:
+        columns["PostalCode"] = _postal_codes(rng, columns["BoroughCode"])
+    if "DesignationDate" in columns and "LPNumber" in columns:
+        # Designated landmarks have an LP number
+        columns["DesignationDate"] = columns["DesignationDate"].where(columns["LPNumber"].notna())
+    df = pd.DataFrame({config["column"]: columns[config["column"]] for config in mapping_data.values()})
+
+    validated = [config for config in mapping_data.values()
+                 if config.get("validation") and "dependency" not in config]
+    injected = pd.Series(rng.random(rows) < error_rate)
+    if validated and injected.any():
+        targets = rng.integers(0, len(validated), size=int(injected.sum()))
+        rows_with_errors = np.flatnonzero(injected)
+        for position, config in enumerate(validated):
+            selected = rows_with_errors[targets == position]
+            df[config["column"]] = df[config["column"]].astype(object)
+            df.loc[selected, config["column"]] = _invalid_value(config)
+    return df, injected
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000)
+    parser.add_argument("--error-rate", type=float, default=DEFAULT_ERROR_RATE)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--mapping", default=MAPPING_FILE_PATH)
+    parser.add_argument("--output", default="synthetic.xlsx", help="An .xlsx or .csv file.")
+    args = parser.parse_args()
+
+    df, injected = generate_synthetic_frame(get_mapping_data(args.mapping), args.rows, args.error_rate, args.seed)
+    if args.output.endswith(".csv"):
+        df.to_csv(args.output, index=False)
+    else:
+        df.to_excel(args.output, index=False)
+    print(f"Wrote {len(df)} rows ({int(injected.sum())} with an injected error) to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+import argparse
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from file_manager import check_excel_file_path, load_excel_data
+from mongodb_loader import get_document_field_types
+from output_writer import write_documents
+from pipeline_context import load_pipeline_context
+from type_coercion import coerce_dataframe_types, resolve_target_types
+from error_policy import apply_error_policy
+from data_validation import (
+    format_validation_errors,
+    validate_excel_data_types_with_df,
+    validate_excel_data_values_table,
+    process_excel_data_with_mapping,
+)
+
+logger = logging.getLogger(__name__)
+
+JOB_DEFAULTS = {
+    "sheet": None,
+    "mapping_file": "mapping/attration.json",
+    "schema_file": "schemas/Attraction.ql",
+    "template_file": "templates/display-array.template",
+    "error_policy": "quarantine",
+    "max_error_rate": None,
+    "rejects_file": None,
+    "output_format": "js",
+    "compression": None,
+    "use_orjson": False,
+    "timestamp": False,
+}
+
+def load_batch_manifest(manifest_path):
+    """
+    Loads a batch manifest.
+
+    The manifest is a JSON object with a `jobs` list and optional `defaults`
+    applied to every job. Each job needs an `excel_file` and an `output_file`
+    and may set `name`, `sheet`, `mapping_file`, `schema_file`, `template_file`,
+    `error_policy`, `max_error_rate` and `rejects_file` (see `error_policy.apply_error_policy`),
+    and `output_format`, `compression`, `use_orjson` and `timestamp` (see `output_writer.write_documents`).
+    Relative paths are resolved against the manifest's directory.
+
+    Parameters:
+        - manifest_path (str): Path to the manifest JSON file.
+
+    Returns:
+        - list: List of job dictionaries.
+    """
+    with open(manifest_path, 'r') as file:
+        manifest = json.load(file)
+
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    defaults = {**JOB_DEFAULTS, **manifest.get("defaults", {})}
+    jobs = []
+    for index, entry in enumerate(manifest["jobs"]):
+        job = {**defaults, **entry}
+        for key in ("excel_file", "output_file", "mapping_file", "schema_file", "template_file", "rejects_file"):
+            if job.get(key) and not os.path.isabs(job[key]):
+                job[key] = os.path.join(base_dir, job[key])
+        job.setdefault("name", f"{os.path.basename(job['excel_file'])}:{job['sheet'] or 'first sheet'}")
+        jobs.append(job)
+    return jobs
+
+def _load_job_context(job):
+    return load_pipeline_context(job["mapping_file"], job["schema_file"], job["template_file"])
+
+def _preload_contexts(jobs):
+    """Worker initializer: parses every distinct mapping/schema/template once per process."""
+    for job in jobs:
+        _load_job_context(job)
+
+def run_import_job(job):
+    """
+    Runs one import job: load -> validate values -> drop invalid rows -> validate types -> cast -> transform -> save.
+
+    Rows failing value validation are handled by the job's error policy (quarantine by default)
+    instead of prompting, since jobs run unattended.
+
+    Parameters:
+        - job (dict): A job from `load_batch_manifest`.
+
+    Returns:
+        - dict: The job report with `name`, `status`, `rows_in`, `rows_out`,
+          `value_errors`, `rows_rejected`, `type_errors`, `coercion_errors`, `output_file`
+          (the path actually written, with its compression extension and timestamp),
+          `elapsed_seconds` and `error`.
+    """
+    started = time.perf_counter()
+    report = {
+        "name": job["name"],
+        "excel_file": job["excel_file"],
+        "sheet": job["sheet"],
+        "output_file": job["output_file"],
+        "status": "ok",
+        "rows_in": 0,
+        "rows_out": 0,
+        "value_errors": 0,
+        "rows_rejected": 0,
+        "type_errors": [],
+        "coercion_errors": 0,
+        "error": None,
+        "pid": os.getpid(),
+    }
+    try:
+        check_excel_file_path(job["excel_file"])
+        context = _load_job_context(job)
+
+        df = load_excel_data(job["excel_file"], job["sheet"])
+        report["rows_in"] = len(df)
+
+        rules = context.validation_rules
+        errors = validate_excel_data_values_table(df, rules)
+        report["value_errors"] = len(errors)
+        df, policy_summary = apply_error_policy(df, errors, job["error_policy"], job["max_error_rate"],
+                                                job["rejects_file"], format_validation_errors(errors, rules))
+        report["rows_rejected"] = policy_summary["rejected_rows"]
+
+        report["type_errors"] = validate_excel_data_types_with_df(df, context)
+        df, coercion_errors = coerce_dataframe_types(df, resolve_target_types(context))
+        report["coercion_errors"] = len(coercion_errors)
+        documents = process_excel_data_with_mapping(df, context)
+
+        output_dir = os.path.dirname(job["output_file"])
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        output = write_documents(documents, job["output_file"], job["output_format"],
+                                 template_content=context.template_content, compression=job["compression"],
+                                 use_orjson=job["use_orjson"], field_types=get_document_field_types(context),
+                                 timestamp=job["timestamp"])
+        report["output_file"] = output["path"]
+        report["rows_out"] = output["documents"]
+    except Exception as e:
+        report["status"] = "failed"
+        report["error"] = f"{type(e).__name__}: {e}"
+
+    report["elapsed_seconds"] = time.perf_counter() - started
+    return report
+
+def summarize_batch(reports, wall_seconds):
+    """Aggregates the job reports into a batch summary."""
+    job_seconds = sum(report["elapsed_seconds"] for report in reports)
+    return {
+        "jobs": len(reports),
+        "succeeded": sum(report["status"] == "ok" for report in reports),
+        "failed": sum(report["status"] != "ok" for report in reports),
+        "rows_in": sum(report["rows_in"] for report in reports),
+        "rows_out": sum(report["rows_out"] for report in reports),
+        "value_errors": sum(report["value_errors"] for report in reports),
+        "rows_rejected": sum(report["rows_rejected"] for report in reports),
+        "wall_seconds": wall_seconds,
+        "job_seconds": job_seconds,
+        "parallel_speedup": job_seconds / wall_seconds if wall_seconds else 0.0,
+    }
+
+def run_batch(jobs, max_workers=None):
+    """
+    Runs the import jobs across a process pool.
+
+    The mappings, schemas and templates used by the jobs are parsed once in
+    each worker (and once in the parent, which forked workers inherit) and then
+    only read.
+
+    Parameters:
+        - jobs (list): Jobs from `load_batch_manifest`.
+        - max_workers (int): Number of worker processes. Defaults to the CPU count.
+          With 1 the jobs run in the current process.
+
+    Returns:
+        - tuple: (list of job reports in manifest order, batch summary dictionary)
+    """
+    started = time.perf_counter()
+    _preload_contexts(jobs)
+
+    if max_workers == 1:
+        reports = [run_import_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_preload_contexts,
+                                 initargs=(jobs,)) as executor:
+            reports = list(executor.map(run_import_job, jobs))
+
+    return reports, summarize_batch(reports, time.perf_counter() - started)
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Run several import jobs from a manifest in parallel.")
+    parser.add_argument("manifest", help="Path to the batch manifest JSON file.")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes (default: CPU count).")
+    parser.add_argument("--report", help="Write the job reports and summary to this JSON file.")
+    args = parser.parse_args()
+
+    reports, summary = run_batch(load_batch_manifest(args.manifest), max_workers=args.workers)
+    for report in reports:
+        logger.info(f"{report['name']}: {report['status']} ({report['rows_out']}/{report['rows_in']} rows, "
+                    f"{report['elapsed_seconds']:.2f}s){' - ' + report['error'] if report['error'] else ''}")
+    logger.info(f"Summary: {summary}")
+
+    if args.report:
+        with open(args.report, 'w') as file:
+            json.dump({"summary": summary, "jobs": reports}, file, indent=4, default=str)
@@ -0,0 +1,202 @@
+import argparse
+import json
+import os
+import sys
+
+# Only `file_manager` is imported here: `check` and `columns` read the files
+# without pandas, the other subcommands import the validation modules (or
+# urllib for --service) when they run (see benchmarks/bench_import_time.py)
+from file_manager import (
+    check_file_presence,
+    extract_source_columns_from_mapping,
+    get_expected_files,
+    load_schema_file,
+    load_template_file,
+    probe_excel_header,
+    validate_mapping_file,
+)
+
+DEFAULT_MAPPING_FILE = "mapping/attration.json"
+DEFAULT_SCHEMA_FILE = "schemas/Attraction.ql"
+DEFAULT_TEMPLATE_FILE = "templates/display-array.template"
+
+def check_files(excel_file=None, mapping_file=DEFAULT_MAPPING_FILE, schema_file=DEFAULT_SCHEMA_FILE,
+                template_file=DEFAULT_TEMPLATE_FILE, hint_file=None):
+    """
+    Checks that the workflow files exist and can be read, without reading the data rows.
+
+    Parameters:
+        - excel_file (str): Excel or CSV file, only checked for presence and extension when given.
+        - mapping_file (str): Mapping file, parsed as JSON.
+        - schema_file (str): GraphQL schema, checked like `validate_schema_file`.
+        - template_file (str): Template file, parsed as JSON with a `template` string.
+        - hint_file (str): Workflow hint file whose REQUIRED_FILE and OPTIONAL_FILE entries are checked too.
+
+    Returns:
+        - dict: `errors` (list of messages, empty if every check passed) and `missing_optional` files.
+    """
+    errors = []
+    required, optional = [mapping_file, schema_file, template_file], []
+    if excel_file:
+        required.append(excel_file)
+    if hint_file:
+        expected_files = get_expected_files(hint_file)
+        required += expected_files["required"]
+        optional += expected_files["optional"]
+    missing_required, missing_optional = check_file_presence(required, optional)
+    errors += [f"Missing required file: {file}" for file in missing_required]
+
+    checks = [(mapping_file, validate_mapping_file), (schema_file, load_schema_file),
+              (template_file, lambda path: json.loads(load_template_file(path))["template"])]
+    for file, check in checks:
+        if file in missing_required:
+            continue
+        try:
+            check(file)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            errors.append(f"{file}: {e}")
+
+    if excel_file and excel_file not in missing_required and not excel_file.endswith(('.xlsx', '.csv')):
+        errors.append(f"{excel_file}: the data file must be a .xlsx or .csv file")
+
+    return {"errors": errors, "missing_optional": missing_optional}
+
+def describe_columns(excel_file, mapping_file=DEFAULT_MAPPING_FILE, sheet=None, count_rows=False):
+    """
+    Lists the columns of the header row with their document fields (workflow step
+    "Display Excel File Information") and checks them against the mapping.
+
+    Only the header row is read (see `probe_excel_header`) and the mapping is
+    read as plain JSON, so neither pandas nor the pipeline context is loaded.
+    The rows of a CSV file are only counted with `count_rows`.
+
+    Returns:
+        - dict: `columns`, `document_fields`, `row_count`, `sheet`, `sheets` and
+          the header `errors` (same messages as `validate_excel_file_header`).
+    """
+    header = probe_excel_header(excel_file, sheet, count_rows)
+    mapping_data = validate_mapping_file(mapping_file)
+    fields = {config.get("column", field): config for field, config in mapping_data.items()}
+
+    errors = []
+    mapping_columns = extract_source_columns_from_mapping(mapping_file)
+    extra_columns = [column for column in header["columns"] if column not in mapping_columns]
+    if extra_columns:
+        errors.append(f"The following columns from Excel are missing in the mapping file: {', '.join(map(str, extra_columns))}")
+    missing_required = [column for column, config in fields.items()
+                        if config.get("isRequired") and column not in header["columns"]]
+    if missing_required:
+        errors.append(f"The following required columns are missing in the Excel file: {', '.join(sorted(missing_required))}")
+
+    return {
+        **header,
+        "document_fields": {column: fields.get(column, {}).get("documentField") for column in header["columns"]},
+        "errors": errors,
+    }
+
+def call_service(url, command, request):
+    """Posts `request` to the `command` endpoint of a running `validation_service` and returns its response."""
+    import urllib.error
+    import urllib.request
+
+    data = json.dumps(request).encode()
+    service_request = urllib.request.Request(f"{url.rstrip('/')}/{command}", data=data, method="POST",
+                                             headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(service_request) as response:
+            return json.load(response)
+    except urllib.error.HTTPError as e:
+        raise ValueError(json.load(e).get("error", str(e)))
+
+def run_service_command(command, request, service_url=None):
+    """
+    Runs `validate`, `transform` or `export` through a running service when
+    `service_url` is given, otherwise in this process (importing pandas and the
+    validation modules only now).
+    """
+    if service_url:
+        return call_service(service_url, command, request)
+    from validation_service import ValidationService
+
+    # In this process the files are those named on the command line, wherever they are
+    return getattr(ValidationService(root_dir=os.path.sep), command)(request)
+
+def print_result(result):
+    """Writes a command result to stdout as JSON."""
+    def default(value):
+        # numpy and pandas values only occur in results computed in this process
+        from output_writer import json_default
+        return json_default(value)
+    json.dump(result, sys.stdout, indent=2, default=default)
+    sys.stdout.write("\n")
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Check, inspect, validate and transform an Excel file "
+                                                 "according to the mapping file.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    def add_command(name, help, reads_data=True):
+        subparser = subparsers.add_parser(name, help=help, description=help)
+        subparser.add_argument("excel_file", nargs=None if reads_data else "?", help="Excel (.xlsx) or CSV file.")
+        subparser.add_argument("--mapping-file", default=DEFAULT_MAPPING_FILE)
+        if reads_data:
+            subparser.add_argument("--sheet", help="Worksheet to read (the first one by default).")
+        return subparser
+
+    check = add_command("check", "Check that the workflow files exist and can be read.", reads_data=False)
+    check.add_argument("--schema-file", default=DEFAULT_SCHEMA_FILE)
+    check.add_argument("--template-file", default=DEFAULT_TEMPLATE_FILE)
+    check.add_argument("--hint-file", help="Also check the files listed in this workflow hint file.")
+
+    columns = add_command("columns", "List the columns, their document fields and the row count from the header row.")
+    columns.add_argument("--count-rows", action="store_true",
+                         help="Count the rows of a CSV file (or of a workbook without stored dimensions).")
+
+    for name, help in (("validate", "Validate the values and types of the sheet."),
+                       ("transform", "Build the documents of the rows that pass value validation."),
+                       ("export", "Write the documents of the rows that pass value validation to a file.")):
+        subparser = add_command(name, help)
+        subparser.add_argument("--schema-file", default=DEFAULT_SCHEMA_FILE)
+        subparser.add_argument("--template-file", default=DEFAULT_TEMPLATE_FILE)
+        subparser.add_argument("--service", metavar="URL",
+                               help="Send the request to a running validation_service instead.")
+        if name == "validate":
+            subparser.add_argument("--max-errors", type=int, help="Stop after this many errors.")
+        if name == "transform":
+            subparser.add_argument("--limit", type=int, help="Only print the first LIMIT documents.")
+        if name == "export":
+            subparser.add_argument("--output-file", default="output_array.js")
+            subparser.add_argument("--format", default="js", help="js, json, ndjson or extjson.")
+    return parser
+
+def main(argv=None):
+    """
+    Runs one subcommand and prints its result as JSON.
+
+    Returns:
+        - int: Exit status, 1 when the result has errors.
+    """
+    args = build_parser().parse_args(argv)
+
+    if args.command == "check":
+        result = check_files(args.excel_file, args.mapping_file, args.schema_file, args.template_file, args.hint_file)
+    elif args.command == "columns":
+        result = describe_columns(args.excel_file, args.mapping_file, args.sheet, args.count_rows)
+    else:
+        request = {"excel_file": os.path.abspath(args.excel_file), "sheet": args.sheet,
+                   "mapping_file": os.path.abspath(args.mapping_file),
+                   "schema_file": os.path.abspath(args.schema_file),
+                   "template_file": os.path.abspath(args.template_file)}
+        if args.command == "validate":
+            request["max_errors"] = args.max_errors
+        elif args.command == "transform":
+            request["limit"] = args.limit
+        else:
+            request.update(output_file=os.path.abspath(args.output_file), output_format=args.format)
+        result = run_service_command(args.command, request, args.service)
+
+    print_result(result)
+    return 1 if result.get("errors") else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
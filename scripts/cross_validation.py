@@ -0,0 +1,313 @@
+import ast
+import operator
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_float_dtype, is_numeric_dtype
+
+try:
+    import pyarrow
+except ImportError:  # pragma: no cover - string functions use pandas' own string storage
+    pyarrow = None
+
+_STRING_DTYPE = pd.StringDtype("pyarrow" if pyarrow is not None else "python")
+
+# Names the single-column rules use; a cross-field rule may not reuse them
+_RESERVED_RULE_NAMES = {"isRequired", "allowNull", "allowedValues", "minLength", "maxLength", "pattern"}
+
+_COMPARISONS = {
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+}
+
+_ARITHMETIC = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.Mod: operator.mod,
+}
+
+def _strings(values):
+    """The values as strings; whole floats (integers read with missing cells) lose their ".0"."""
+    if not isinstance(values, pd.Series):
+        return values if values is None else str(values)
+    if isinstance(values.dtype, pd.StringDtype):
+        return values
+    if isinstance(values.dtype, pd.CategoricalDtype) and values.cat.categories.inferred_type == "string":
+        return values
+    if is_float_dtype(values) and (values.dropna() % 1 == 0).all():
+        values = values.astype("Int64")
+    return values.astype(_STRING_DTYPE)
+
+def _comparable(values):
+    # Categoricals with different categories cannot be compared with each other
+    if isinstance(values, pd.Series) and isinstance(values.dtype, pd.CategoricalDtype):
+        return values.astype(values.cat.categories.dtype)
+    return values
+
+def _isnull(values):
+    return values.isna() if isinstance(values, pd.Series) else pd.isna(values)
+
+def _notnull(values):
+    return values.notna() if isinstance(values, pd.Series) else not pd.isna(values)
+
+def _lookup(values, table):
+    return values.map(table) if isinstance(values, pd.Series) else table.get(values)
+
+def _number(values):
+    return pd.to_numeric(values, errors="coerce")
+
+def _date(values):
+    if isinstance(values, pd.Series) and is_numeric_dtype(values):
+        # Excel serial dates
+        return pd.to_datetime(values, unit="D", origin="1899-12-30", errors="coerce")
+    return pd.to_datetime(values, errors="coerce")
+
+def _length(values):
+    return _strings(values).str.len()
+
+def _substr(values, start, stop=None):
+    return _strings(values).str.slice(start, stop)
+
+def _startswith(values, prefixes):
+    prefixes = tuple(prefixes) if isinstance(prefixes, (list, tuple)) else (prefixes,)
+    strings = _strings(values)
+    matched = strings.str.startswith(prefixes[0])
+    for prefix in prefixes[1:]:
+        matched = matched | strings.str.startswith(prefix)
+    return matched
+
+def _matches(values, pattern):
+    return _strings(values).str.fullmatch(pattern)
+
+def _between(values, low, high):
+    return (values >= low) & (values <= high)
+
+# Function name -> (implementation, number of arguments evaluated per row, number of constant arguments)
+FUNCTIONS = {
+    "isnull": (_isnull, 1, 0),
+    "notnull": (_notnull, 1, 0),
+    "number": (_number, 1, 0),
+    "date": (_date, 1, 0),
+    "len": (_length, 1, 0),
+    "lookup": (_lookup, 1, 1),
+    "substr": (_substr, 1, 2),
+    "startswith": (_startswith, 1, 1),
+    "matches": (_matches, 1, 1),
+    "between": (_between, 1, 2),
+}
+
+class _ExpressionCompiler:
+    """
+    Compiles a rule expression (a restricted Python expression) into a function
+    of the DataFrame that returns a Series, evaluated column-wise.
+
+    Each sub-expression is cached under its syntax tree for one evaluation, so rules
+    sharing e.g. `notnull(BoroughCode)` compute it once per frame.
+    """
+
+    def __init__(self, dependencies):
+        self.dependencies = dependencies
+        self.columns = []
+
+    def compile(self, text):
+        try:
+            tree = ast.parse(text.strip(), mode="eval")
+        except SyntaxError as e:
+            raise ValueError(f"invalid expression '{text}': {e.msg}") from None
+        return self._compile(tree.body)
+
+    def _column(self, name):
+        if name not in self.columns:
+            self.columns.append(name)
+        return lambda df, cache: df[name]
+
+    def _constant(self, node):
+        try:
+            return ast.literal_eval(node)
+        except ValueError:
+            raise ValueError(f"'{ast.unparse(node)}' must be a constant") from None
+
+    def _compile(self, node):
+        key = ast.dump(node)
+        func = self._compile_node(node)
+
+        def evaluate(df, cache):
+            if key not in cache:
+                cache[key] = func(df, cache)
+            return cache[key]
+        return evaluate
+
+    def _compile_node(self, node):
+        if isinstance(node, ast.Name):
+            return self._column(node.id)
+
+        if isinstance(node, (ast.Constant, ast.List, ast.Tuple, ast.Set, ast.Dict)):
+            value = self._constant(node)
+            return lambda df, cache: value
+
+        if isinstance(node, ast.BoolOp):
+            operands = [self._compile(value) for value in node.values]
+            combine = operator.and_ if isinstance(node.op, ast.And) else operator.or_
+
+            def bool_op(df, cache):
+                result = _mask(operands[0](df, cache), df)
+                for operand in operands[1:]:
+                    result = combine(result, _mask(operand(df, cache), df))
+                return result
+            return bool_op
+
+        if isinstance(node, ast.UnaryOp):
+            operand = self._compile(node.operand)
+            if isinstance(node.op, ast.Not):
+                return lambda df, cache: ~_mask(operand(df, cache), df)
+            if isinstance(node.op, ast.USub):
+                return lambda df, cache: -operand(df, cache)
+            raise ValueError(f"unsupported operator in '{ast.unparse(node)}'")
+
+        if isinstance(node, ast.BinOp) and type(node.op) in _ARITHMETIC:
+            left, right = self._compile(node.left), self._compile(node.right)
+            op = _ARITHMETIC[type(node.op)]
+            return lambda df, cache: op(left(df, cache), right(df, cache))
+
+        if isinstance(node, ast.Compare):
+            return self._compile_compare(node)
+
+        if isinstance(node, ast.Call):
+            return self._compile_call(node)
+
+        raise ValueError(f"unsupported syntax '{ast.unparse(node)}'")
+
+    def _compile_compare(self, node):
+        steps = []
+        left = self._compile(node.left)
+        for op, comparator in zip(node.ops, node.comparators):
+            if isinstance(op, (ast.In, ast.NotIn)):
+                values = list(self._constant(comparator))
+                steps.append((left, op, values))
+            elif type(op) in _COMPARISONS:
+                right = self._compile(comparator)
+                steps.append((left, op, right))
+                left = right
+            else:
+                raise ValueError(f"unsupported comparison in '{ast.unparse(node)}'")
+
+        def compare(df, cache):
+            result = None
+            for left, op, right in steps:
+                values = left(df, cache)
+                if isinstance(op, (ast.In, ast.NotIn)):
+                    matched = values.isin(right) if isinstance(values, pd.Series) else values in right
+                    step = ~matched if isinstance(op, ast.NotIn) else matched
+                else:
+                    step = _COMPARISONS[type(op)](_comparable(values), _comparable(right(df, cache)))
+                step = _mask(step, df)
+                result = step if result is None else result & step
+            return result
+        return compare
+
+    def _compile_call(self, node):
+        name = node.func.id if isinstance(node.func, ast.Name) else None
+        if node.keywords:
+            raise ValueError(f"keyword arguments are not supported in '{ast.unparse(node)}'")
+
+        if name == "dependency":
+            if len(node.args) != 1 or not isinstance(node.args[0], ast.Name) \
+                    or node.args[0].id not in self.dependencies:
+                raise ValueError(f"dependency() takes a column with a `dependency` block, got '{ast.unparse(node)}'")
+            source, table = self.dependencies[node.args[0].id]
+            values = self._column(source)
+            return lambda df, cache: _comparable(values(df, cache)).map(table)
+
+        if name not in FUNCTIONS:
+            raise ValueError(f"unknown function '{ast.unparse(node.func)}', expected one of "
+                             f"{sorted([*FUNCTIONS, 'dependency'])}")
+        func, row_arguments, constant_arguments = FUNCTIONS[name]
+        if not row_arguments <= len(node.args) <= row_arguments + constant_arguments:
+            raise ValueError(f"{name}() takes {row_arguments} to {row_arguments + constant_arguments} arguments")
+        arguments = [self._compile(argument) for argument in node.args[:row_arguments]]
+        constants = [self._constant(argument) for argument in node.args[row_arguments:]]
+        return lambda df, cache: func(*(argument(df, cache) for argument in arguments), *constants)
+
+def _mask(values, df):
+    """Turns a comparison result into a boolean Series aligned with `df`; unknown (NA) stays NA."""
+    if isinstance(values, pd.Series):
+        return values if values.dtype == bool else values.astype("boolean")
+    return pd.Series(np.full(len(df), bool(values)), index=df.index)
+
+def compile_cross_validation_rules(specs, mapping_data):
+    """
+    Compiles the `crossValidation` rules of a mapping (from its rules file,
+    see `file_manager.load_cross_validation_rules`) into rules for
+    `validate_excel_data_values_table`.
+
+    Each entry has a `name`, a `require` expression, and optionally a `when`
+    expression, the `column` reported in the error table (the first column
+    of `require` by default) and a `message`. A row fails a rule where `when`
+    is true and `require` is false. Expressions are Python expressions over
+    the column names with `and`/`or`/`not`, comparisons, `in [...]`,
+    arithmetic and the functions of `FUNCTIONS`, plus `dependency(Column)`
+    for the value derived from the `dependency` block of a column, e.g.:
+
+        {"name": "boroughMatchesCode", "when": "notnull(Borough)", "require": "Borough == dependency(Borough)"}
+
+    Comparisons with a missing value are false, so rules on optional columns
+    guard them with `notnull(...)` in `when`.
+
+    Parameters:
+        - specs (list): The `crossValidation` entries.
+        - mapping_data (dict): The mapping data (for the `dependency` blocks).
+
+    Returns:
+        - list: Rule dictionaries with the keys of `compile_validation_rules`, plus
+          `columns` (every column the rule reads), `check` (a function of the
+          DataFrame and a cache dict returning the failed rows) and `message`.
+
+    Raises:
+        - ValueError: If a rule is incomplete or uses unsupported syntax.
+    """
+    dependencies = {
+        config.get("column", field): (config["dependency"]["fieldName"], config["dependency"]["mapping"])
+        for field, config in mapping_data.items()
+        if "dependency" in config
+    }
+    rules = []
+    for spec in specs:
+        name = spec.get("name")
+        if not name or "require" not in spec:
+            raise ValueError(f"crossValidation rules need a `name` and a `require` expression: {spec}")
+        if name in _RESERVED_RULE_NAMES:
+            raise ValueError(f"crossValidation rule name '{name}' is reserved for single-column rules")
+
+        compiler = _ExpressionCompiler(dependencies)
+        try:
+            require = compiler.compile(spec["require"])
+            when = compiler.compile(spec["when"]) if spec.get("when") else None
+        except ValueError as e:
+            raise ValueError(f"crossValidation rule '{name}': {e}") from None
+
+        def check(df, cache, require=require, when=when):
+            # An unknown (NA) requirement fails, whatever the dtype of the columns
+            failed = ~_mask(require(df, cache), df).fillna(False)
+            if when is not None:
+                failed = failed & _mask(when(df, cache), df).fillna(False)
+            return failed.astype(bool)
+
+        if not compiler.columns:
+            raise ValueError(f"crossValidation rule '{name}' does not read any column")
+        column = spec.get("column", compiler.columns[0])
+        rules.append({
+            "column": column,
+            "rule": name,
+            "allowNull": True,
+            "params": spec["require"],
+            "columns": list(dict.fromkeys([column, *compiler.columns])),
+            "check": check,
+            "message": spec.get("message"),
+        })
+    return rules
@@ -3,36 +3,36 @@ import re
 import pandas as pd
 import sys
 
+from file_manager import check_file_presence
+from pipeline_context import (
+    PipelineContext,
+    compile_validation_rules,
+    get_pipeline_context,
+)
+from schema_index import get_schema_index, resolve_schema_path
+from type_coercion import (
+    TARGET_DTYPES,
+    coerce_dataframe_types,
+    is_object_id_dtype,
+    resolve_schema_target_types,
+    resolve_target_types,
+    unpack_object_ids,
+)
+
 def get_mapping_data(mapping_file_path):
     """Reads the mapping file and returns its content as a dictionary.
+    Accepts a `PipelineContext` in place of the path, in which case the already
+    parsed mapping is returned.
     If an error occurs, it returns a string with the error description."""
     try:
-        with open(mapping_file_path, 'r') as file:
-            mapping_data = json.load(file)
-        return mapping_data
+        return get_pipeline_context(mapping_file_path).mapping_data
     except Exception as e:
         return str(e)
 
-def check_file_presence(required_files, optional_files=[]):
-    """
-    Checks the presence of required and optional files.
-
-    Parameters:
-        - required_files (list): List of paths to required files.
-        - optional_files (list): List of paths to optional files.
-
-    Returns:
-        - tuple: (list of missing required files, list of missing optional files)
-    """
-    missing_required = [file for file in required_files if not os.path.exists(file)]
-    missing_optional = [file for file in optional_files if not os.path.exists(file)]
-
-    return missing_required, missing_optional
-
 def extract_expected_data_types_from_mapping(mapping_file_path):
-    """Extracts the expected data types for each column from the mapping file."""
-    with open(mapping_file_path, 'r') as file:
-        mapping_data = json.load(file)
+    """Extracts the expected data types for each column from the mapping file
+    (or from a `PipelineContext`)."""
+    mapping_data = get_pipeline_context(mapping_file_path).mapping_data
 
     # Access the 'type' key directly from the root level of each item
     expected_data_types = {
@@ -46,35 +46,18 @@ def cast_dataframe_to_expected_types(df, mapping_file_path):
     """
     Cast the DataFrame columns to the expected data types based on the mapping file.
 
+    Types come from `type_coercion.resolve_target_types` (the mapping, then the
+    GraphQL schema of the context). Cells that cannot be converted become
+    missing; use `coerce_dataframe_types` directly to get them reported.
+
     Args:
     - df (pandas.DataFrame): The input DataFrame with the Excel data.
-    - mapping_file_path (str): Path to the mapping JSON file.
+    - mapping_file_path (str or PipelineContext): Path to the mapping JSON file, or the parsed context.
 
     Returns:
     - pandas.DataFrame: The DataFrame with columns casted to their respective types.
     """
-    with open(mapping_file_path, 'r') as file:
-        mapping_data = json.load(file)
-
-    # Extract the expected data types from the mapping data
-    expected_data_types = {key: value['type'] for key, value in mapping_data.items() if 'type' in value}
-
-    # Define a conversion dictionary for pandas data types
-    pandas_dtype_conversion = {
-        "string": "str",
-        "integer": "int64",
-        "float": "float64",
-        "boolean": "bool",
-        "datetime": "datetime64[ns]"
-    }
-
-    # Cast each column to its expected data type
-    for column, expected_dtype in expected_data_types.items():
-        if column in df.columns:
-            pandas_dtype = pandas_dtype_conversion.get(expected_dtype)
-            if pandas_dtype:
-                df[column] = df[column].astype(pandas_dtype)
-
+    df, _ = coerce_dataframe_types(df, resolve_target_types(mapping_file_path))
     return df
 
 def validate_excel_data_types_with_df(df, mapping_file_path):
@@ -85,50 +68,161 @@ def validate_excel_data_types_with_df(df, mapping_file_path):
 
     for column, expected_dtype in expected_data_types.items():
         if column in df.columns:
-            actual_dtype = df[column].dtype.name
+            dtype = df[column].dtype
+            # Compact frames keep strings in categories and ObjectIds packed
+            if isinstance(dtype, pd.CategoricalDtype):
+                dtype = dtype.categories.dtype
+            actual_dtype = "string" if is_object_id_dtype(dtype) else dtype.name
             if actual_dtype == "object":
                 actual_dtype = "string"
-            if actual_dtype != expected_dtype:
+            if actual_dtype != expected_dtype and actual_dtype != TARGET_DTYPES.get(expected_dtype):
                 errors.append(f"Expected {column} to have dtype {expected_dtype}, but found {actual_dtype}.")
 
     return errors
 
+VALIDATION_ERROR_COLUMNS = ["row", "Id", "column", "rule", "value"]
+
+def validate_excel_data_values_table(df, rules, max_errors=None):
+    """
+    Validates the data values of the DataFrame against compiled validation rules.
+
+    Every rule is evaluated as a vectorized check over its column (`isin`,
+    `str.len`, `str.fullmatch`). Null cells are only reported by the
+    `isRequired`/`allowNull` rules and are skipped by the value rules.
+    Cross-field rules (with a `check`) are evaluated as boolean masks over
+    the frame; rules reading a column the frame does not have are skipped.
+
+    Parameters:
+        - df (pd.DataFrame): The dataframe containing the data.
+        - rules (list): Rules returned by `compile_validation_rules`.
+        - max_errors (int): Stop evaluating rules once this many checks failed
+          (for fail-fast runs). The table then holds at most `max_errors` rows.
+
+    Returns:
+        - pd.DataFrame: One row per failed check with the columns
+          `row`, `Id`, `column`, `rule` and `value`, ordered by row and then by
+          rule order in the mapping.
+    """
+    frames = []
+    ids = df['Id'] if 'Id' in df.columns else pd.Series(None, index=df.index, dtype=object)
+    positions = pd.Series(range(len(df)), index=df.index)
+    string_values = {}
+    null_masks = {}
+    cross_field_cache = {}
+    error_count = 0
+
+    for order, rule in enumerate(rules):
+        column = rule["column"]
+        if any(required not in df.columns for required in rule.get("columns", [column])):
+            continue
+
+        values = df[column]
+        name = rule["rule"]
+        params = rule["params"]
+
+        if "check" not in rule and column not in null_masks:
+            null_masks[column] = values.isna()
+        is_null = null_masks.get(column)
+
+        if "check" in rule:
+            failed = rule["check"](df, cross_field_cache)
+        elif name in ("isRequired", "allowNull"):
+            failed = is_null
+        elif name == "allowedValues":
+            failed = ~is_null & ~values.isin(params)
+        else:
+            if column not in string_values:
+                present = values[~is_null]
+                # Arrow strings and string categories are checked as they are (categories once each)
+                if not isinstance(values.dtype, (pd.StringDtype, pd.CategoricalDtype)):
+                    present = present.astype(str)
+                string_values[column] = present
+            present = string_values[column]
+            if name == "minLength":
+                failed_present = present.str.len() < params
+            elif name == "maxLength":
+                failed_present = present.str.len() > params
+            else:
+                failed_present = ~present.str.fullmatch(params).astype(bool)
+            failed = failed_present.reindex(df.index, fill_value=False)
+
+        if not failed.any():
+            continue
+
+        frames.append(pd.DataFrame({
+            "row": df.index[failed.to_numpy()],
+            "Id": ids[failed].to_numpy(),
+            "column": column,
+            "rule": name,
+            "value": values[failed].to_numpy(),
+            "_position": positions[failed].to_numpy(),
+            "_order": order,
+        }))
+        error_count += int(failed.sum())
+        if max_errors is not None and error_count >= max_errors:
+            break
+
+    if not frames:
+        return pd.DataFrame(columns=VALIDATION_ERROR_COLUMNS)
+
+    errors = pd.concat(frames, ignore_index=True)
+    errors = errors.sort_values(["_position", "_order"], kind="stable")
+    if max_errors is not None:
+        errors = errors.head(max_errors)
+    return errors[VALIDATION_ERROR_COLUMNS].reset_index(drop=True)
+
+def format_validation_errors(error_table, rules):
+    """
+    Formats an error table from `validate_excel_data_values_table` as messages.
+
+    Parameters:
+        - error_table (pd.DataFrame): The structured validation errors.
+        - rules (list): The compiled rules used to produce the table.
+
+    Returns:
+        - list: List of human readable error messages, one per table row.
+    """
+    if error_table.empty:
+        return []
+
+    suffixes = {}
+    for rule in rules:
+        params = rule["params"]
+        if "check" in rule:
+            suffixes[(rule["column"], rule["rule"])] = rule["message"] or f"Fails rule {rule['rule']}: {params}."
+            continue
+        suffix = {
+            "isRequired": "Value is required.",
+            "allowNull": "Value must not be empty.",
+            "allowedValues": f"Expected one of {params}.",
+            "minLength": f"Length is less than minimum required length of {params}.",
+            "maxLength": f"Length exceeds maximum allowed length of {params}.",
+            "pattern": f"Does not match the required pattern {getattr(params, 'pattern', params)}.",
+        }[rule["rule"]]
+        suffixes[(rule["column"], rule["rule"])] = suffix
+
+    keys = list(zip(error_table["column"], error_table["rule"]))
+    messages = (
+        "Id " + error_table["Id"].astype(str)
+        + " has invalid value " + error_table["value"].astype(str)
+        + " in column " + error_table["column"].astype(str)
+        + ". " + pd.Series([suffixes[key] for key in keys], index=error_table.index)
+    )
+    return messages.tolist()
+
 def validate_excel_data_values_with_df(df, mapping_file_path):
-    mapping_data = get_mapping_data(mapping_file_path)
-    errors = []
+    """
+    Validates the data values of the DataFrame based on the mapping file rules.
 
-    for _, row in df.iterrows():
-        for column, mapping_value in mapping_data.items():
-            if column in row:
-                if 'validation' in mapping_value:
-                    validation_rules = mapping_value['validation']
-
-                    # Validate allowed values
-                    allowed_values = validation_rules.get('allowedValues', [])
-                    if allowed_values:
-                        if row[column] not in allowed_values:
-                            errors.append(f"Id {row['Id']} has invalid value {row[column]} in column {column}. Expected one of {allowed_values}.")
-
-                    # Validate minimum length
-                    min_length = validation_rules.get('minLength')
-                    if min_length:
-                        if len(str(row[column])) < min_length:
-                            errors.append(f"Id {row['Id']} has invalid value {row[column]} in column {column}. Length is less than minimum required length of {min_length}.")
-
-                    # Validate maximum length
-                    max_length = validation_rules.get('maxLength')
-                    if max_length:
-                        if len(str(row[column])) > max_length:
-                            errors.append(f"Id {row['Id']} has invalid value {row[column]} in column {column}. Length exceeds maximum allowed length of {max_length}.")
-
-                    # Validate using regex pattern
-                    pattern = validation_rules.get('pattern')
-                    if pattern:
-                        regex = re.compile(pattern)
-                        if not regex.match(str(row[column])):
-                            errors.append(f"Id {row['Id']} has invalid value {row[column]} in column {column}. Does not match the required pattern {pattern}.")
+    Parameters:
+        - df (pd.DataFrame): The dataframe containing the data.
+        - mapping_file_path (str or PipelineContext): Path to the mapping JSON file, or the parsed context.
 
-    return errors
+    Returns:
+        - list: List of validation error messages.
+    """
+    rules = get_pipeline_context(mapping_file_path).validation_rules
+    return format_validation_errors(validate_excel_data_values_table(df, rules), rules)
 
 def handle_validation_errors(df, validation_results):
     """
@@ -136,6 +230,8 @@ def handle_validation_errors(df, validation_results):
     1) Continue the workflow by excluding problematic records.
     2) Stop the workflow and ask for resubmission.
 
+    This prompts on stdin; unattended runs use `error_policy.apply_error_policy` instead.
+
     Parameters:
         df (pd.DataFrame): The dataframe containing the data.
         validation_results (list): List of validation errors.
@@ -155,11 +251,11 @@ def handle_validation_errors(df, validation_results):
     decision = input("\nErrors detected. Would you like to:\n1) Continue the workflow without the problematic records\n2) Stop the workflow and fix the issues\nEnter your choice (1/2): ")
 
     if decision == '1':
-        # Filter out the problematic records. For this, we're assuming the errors are in the format:
-        # "ID <some_id> has invalid value <some_value> in column <some_column>. Expected one of <some_allowed_values>."
-        # This can be adjusted based on the exact format of your error messages.
-        error_ids = [int(error.split(" ")[1]) for error in validation_results if "ID" in error]
-        df_clean = df[~df['Id'].isin(error_ids)]
+        # Filter out the problematic records. The errors are in the format:
+        # "Id <some_id> has invalid value <some_value> in column <some_column>. Expected one of <some_allowed_values>."
+        # Ids are hex strings, so they are compared as text.
+        error_ids = [error.split(" ")[1] for error in validation_results if error.startswith("Id ")]
+        df_clean = df[~df['Id'].astype(str).isin(error_ids)]
         return df_clean
 
     elif decision == '2':
@@ -184,6 +280,7 @@ def handle_validation_errors(df, validation_results):
 
 
 def convert_data_types_according_to_updated_mapping(df, mapping_data):
+    mapping_data = get_pipeline_context(mapping_data).mapping_data
     for field, config in mapping_data.items():
         expected_data_type = config.get("type")
         if expected_data_type and config["column"] in df.columns:
@@ -223,43 +320,73 @@ def validate_excel_data_types(excel_path, mapping_path):
 
     return validation_results
 
+def get_graphql_schema_index(graphql_schema):
+    """Returns the parsed schema index for a schema string or a `PipelineContext` with a loaded schema."""
+    if isinstance(graphql_schema, PipelineContext):
+        return graphql_schema.schema_index
+    return get_schema_index(graphql_schema)
+
 def broad_validate_against_graphql_schema(df_columns, graphql_schema_contents):
     """
-    Validates the columns of the DataFrame against the fields in the entire GraphQL schema,
-    without considering specific nested structures.
+    Validates the columns of the DataFrame against the fields of the GraphQL schema.
+
+    A column is valid if it names a field of the schema at any nesting level
+    (`PostalCode` matches `loc.postalCode`) or a dotted path from the root
+    type, compared case-insensitively.
 
     Parameters:
         - df_columns (list): List of columns in the DataFrame.
-        - graphql_schema_contents (str): Content of the GraphQL schema.
+        - graphql_schema_contents (str or PipelineContext): Content of the GraphQL schema, or the parsed context.
 
     Returns:
         - dict: Dictionary with column names as keys and 'Valid' or 'Invalid' as values.
     """
+    schema_index = get_graphql_schema_index(graphql_schema_contents)
     validation_results = {}
 
     for column in df_columns:
-        if column in graphql_schema_contents:
+        if resolve_schema_path(schema_index, column):
             validation_results[column] = "Valid"
         else:
             validation_results[column] = "Invalid: Column not found anywhere in GraphQL schema"
 
     return validation_results
 
+def validate_document_fields_against_graphql_schema(mapping_data, graphql_schema):
+    """
+    Validates the `documentField` paths of the mapping against the GraphQL schema.
+
+    Parameters:
+        - mapping_data (dict, str or PipelineContext): The mapping data.
+        - graphql_schema (str or PipelineContext): Content of the GraphQL schema, or the parsed context.
+
+    Returns:
+        - dict: Dictionary with document fields as keys and 'Valid' or 'Invalid' as values.
+    """
+    schema_index = get_graphql_schema_index(graphql_schema)
+    validation_results = {}
+
+    for document_field in get_pipeline_context(mapping_data).column_to_document_field.values():
+        if document_field.lower() in schema_index["paths_lower"]:
+            validation_results[document_field] = "Valid"
+        else:
+            validation_results[document_field] = f"Invalid: Path not found under {schema_index['root']} in GraphQL schema"
+
+    return validation_results
+
 def check_extra_columns(df_columns, mapping_path):
     """
     Checks for any extra columns in the Excel file that are not defined in the mapping file.
 
     Parameters:
         - df_columns (list): List of columns in the DataFrame (Excel file).
-        - mapping_path (str): Path to the mapping file.
+        - mapping_path (str or PipelineContext): Path to the mapping file, or the parsed context.
 
     Returns:
         - list: List of extra columns present in the Excel file but not in the mapping.
     """
     # Extract expected columns from the mapping file
-    with open(mapping_path, 'r') as f:
-        mapping = json.load(f)
-    expected_columns = list(mapping.keys())
+    expected_columns = get_pipeline_context(mapping_path).mapping_columns
 
     # Identify extra columns in the Excel file
     extra_columns = [col for col in df_columns if col not in expected_columns]
@@ -272,11 +399,13 @@ def validate_excel_data_with_mapping(excel_data, mapping):
 
     Parameters:
     - excel_data (pd.DataFrame): Data from the Excel file.
-    - mapping (dict): The mapping defining columns and their expected data types.
+    - mapping (dict or PipelineContext): The mapping defining columns and their expected data types.
 
     Returns:
     - tuple: A tuple containing a boolean indicating validity and an error message (if any).
     """
+    mapping = get_pipeline_context(mapping).mapping_data
+
     # Check if all required columns from the mapping are present in the Excel data
     missing_columns = [col for col in mapping if col not in excel_data.columns and mapping[col]['isRequired']]
     if missing_columns:
@@ -293,6 +422,10 @@ def enforce_data_types_based_on_graphql(df, graphql_schema):
     """
     Enforces data types based on the GraphQL schema.
 
+    Each column is matched to the schema field of the same name (at any
+    nesting level) and converted to the type of that field; cells that
+    cannot be converted become missing.
+
     Parameters:
         - df (pd.DataFrame): DataFrame containing the data from the Excel file.
         - graphql_schema (str): String content of the GraphQL schema.
@@ -300,6 +433,7 @@ def enforce_data_types_based_on_graphql(df, graphql_schema):
     Returns:
         - pd.DataFrame: DataFrame with enforced data types.
     """
+    df, _ = coerce_dataframe_types(df, resolve_schema_target_types(df.columns, graphql_schema))
     return df
 
 def validate_excel_file_columns(excel_columns, mapping_data, graphql_schema):
@@ -308,20 +442,20 @@ def validate_excel_file_columns(excel_columns, mapping_data, graphql_schema):
 
     Parameters:
     - excel_columns: List of columns present in the Excel file.
-    - mapping_data: Dictionary containing the mapping data.
-    - graphql_schema: String containing the GraphQL schema.
+    - mapping_data: Dictionary containing the mapping data, or a `PipelineContext`.
+    - graphql_schema: String containing the GraphQL schema, or a `PipelineContext` with a loaded schema.
 
     Returns:
     - A success message if the columns match.
     - An error message highlighting discrepancies if they don't match.
     """
-    # Extracting columns from the mapping data and GraphQL schema
-    mapping_columns = list(mapping_data.keys())
-    graphql_columns = [line.split(":")[0].strip() for line in graphql_schema.split("\n") if ":" in line]
+    # Extracting columns from the mapping data and the parsed GraphQL schema index
+    mapping_columns = set(get_pipeline_context(mapping_data).mapping_columns)
+    schema_index = get_graphql_schema_index(graphql_schema)
 
     # Checking if any Excel column is missing in the mapping file or GraphQL schema
     missing_in_mapping = [col for col in excel_columns if col not in mapping_columns]
-    missing_in_graphql = [col for col in excel_columns if col not in graphql_columns]
+    missing_in_graphql = [col for col in excel_columns if not resolve_schema_path(schema_index, col)]
 
     if missing_in_mapping:
         return f"Error: The following columns from Excel are missing in the mapping file: {', '.join(missing_in_mapping)}"
@@ -331,35 +465,149 @@ def validate_excel_file_columns(excel_columns, mapping_data, graphql_schema):
 
     return "Excel columns successfully validated against mapping file and GraphQL schema."
 
+def validate_excel_file_header(excel_columns, mapping_data, ignored_columns=()):
+    """
+    Validates the header row of an Excel file against the mapping (workflow step
+    "Excel File Validation"), before any data row is read.
+
+    Parameters:
+    - excel_columns: List of columns present in the Excel file, e.g. from `probe_excel_header`.
+    - mapping_data: Dictionary containing the mapping data, a mapping file path, or a `PipelineContext`.
+    - ignored_columns: Columns read by the pipeline without being mapped (e.g. the coordinates
+      used by the geocoding enrichment); they are not reported as missing in the mapping.
+
+    Returns:
+    - list: Error messages; empty if the header is valid.
+    """
+    context = get_pipeline_context(mapping_data)
+    errors = []
+
+    extra_columns = [column for column in check_extra_columns(excel_columns, context) if column not in ignored_columns]
+    if extra_columns:
+        errors.append(f"The following columns from Excel are missing in the mapping file: {', '.join(map(str, extra_columns))}")
 
+    missing_required = [column for column in context.required_columns if column not in excel_columns]
+    if missing_required:
+        errors.append(f"The following required columns are missing in the Excel file: {', '.join(sorted(missing_required))}")
+
+    return errors
+
+
+
+_EXCLUDED = object()
+
+def build_transform_plan(df_columns, mapping_data):
+    """
+    Resolves the mapping against the available columns once, before any row is touched.
+
+    Parameters:
+        - df_columns (list): List of columns in the DataFrame.
+        - mapping_data (dict): The mapping data.
+
+    Returns:
+        - list: One step per output field with the keys `column`, `path`
+          (the `documentField` split on dots), `dependency`,
+          `nullValueReplacement` and `excludeIfEmptyOrNan`.
+    """
+    columns = set(df_columns)
+    plan = []
+    for field, config in mapping_data.items():
+        if config.get("includeInOutput", True) is False:
+            continue
+
+        dependency = config.get("dependency")
+        source_column = dependency["fieldName"] if dependency else config["column"]
+        if source_column not in columns:
+            if config.get("isRequired"):
+                raise ValueError(f"Required column '{source_column}' for field '{field}' is missing in the Excel data.")
+            continue  # Skip the column if it's not required and missing in the Excel data
+
+        plan.append({
+            "column": source_column,
+            "path": tuple(config["documentField"].split(".")),
+            "dependency": dependency["mapping"] if dependency else None,
+            "nullValueReplacement": config.get("nullValueReplacement"),
+            "excludeIfEmptyOrNan": bool(config.get("excludeIfEmptyOrNan", False)),
+        })
+    return plan
+
+def _resolve_plan_values(df, step):
+    """Applies one plan step to its source column and returns the output values as a list."""
+    values = unpack_object_ids(df[step["column"]])
+    if step["dependency"] is not None:
+        values = values.map(step["dependency"])
+
+    is_null = values.isna()
+    if step["nullValueReplacement"] is not None and is_null.any():
+        values = values.astype(object).where(~is_null, step["nullValueReplacement"])
+        is_null = values.isna()
+
+    values = values.astype(object).where(~is_null, None)
+    if step["excludeIfEmptyOrNan"]:
+        excluded = is_null
+        if pd.api.types.infer_dtype(values, skipna=True) in ("string", "mixed", "mixed-integer"):
+            excluded = excluded | values.str.strip().eq("").fillna(False).astype(bool)
+        values = values.where(~excluded, _EXCLUDED)
+    return values.tolist()
+
+def _assemble_documents(steps, columns, depth, row_count):
+    """
+    Assembles one level of the nested documents from resolved column values.
+
+    Steps sharing the same key at `depth` are grouped (in order of first
+    appearance) and built recursively, so each level is produced with a single
+    comprehension over the rows.
+    """
+    keys, values, can_exclude = [], [], False
+    groups = {}
+    for step, column in zip(steps, columns):
+        key = step["path"][depth]
+        if len(step["path"]) == depth + 1:
+            keys.append(key)
+            values.append(column)
+            can_exclude = can_exclude or step["excludeIfEmptyOrNan"]
+        else:
+            if key not in groups:
+                groups[key] = ([], [])
+                keys.append(key)
+                values.append(None)
+            groups[key][0].append(step)
+            groups[key][1].append(column)
+
+    for position, key in enumerate(keys):
+        if values[position] is None:
+            child_steps, child_columns = groups[key]
+            children = _assemble_documents(child_steps, child_columns, depth + 1, row_count)
+            if any(step["excludeIfEmptyOrNan"] for step in child_steps):
+                children = [child if child else _EXCLUDED for child in children]
+                can_exclude = True
+            values[position] = children
+
+    if not keys:
+        return [{} for _ in range(row_count)]
+    if can_exclude:
+        return [
+            {key: value for key, value in zip(keys, row) if value is not _EXCLUDED}
+            for row in zip(*values)
+        ]
+    return [dict(zip(keys, row)) for row in zip(*values)]
 
 def process_excel_data_with_mapping(df, mapping_data):
     """
     Processes the excel data according to the provided mapping.
 
+    The mapping is resolved into a plan once; dependency mappings,
+    `nullValueReplacement`, `excludeIfEmptyOrNan` and `includeInOutput` are
+    applied per column, and the documents are then assembled from those columns,
+    nested on the dotted `documentField` paths (e.g. `loc.boroughCode`).
+
     Parameters:
         - df (pd.DataFrame): The excel data in dataframe format.
-        - mapping_data (dict): The mapping data.
+        - mapping_data (dict or PipelineContext): The mapping data.
 
     Returns:
         - list: A list of dictionaries containing the processed data.
     """
-    output_array = []
-    for index, row in df.iterrows():
-        document = {}
-        for field, config in mapping_data.items():
-            if config["column"] not in df.columns and not config["isRequired"]:
-                continue  # Skip the column if it's not required and missing in the Excel data
-            if "dependency" in config:
-                # If there's a dependency defined, use the mapping
-                dependency_field = config["dependency"]["fieldName"]
-                dependency_mapping = config["dependency"]["mapping"]
-                if row[dependency_field] in dependency_mapping:
-                    document[config["documentField"]] = dependency_mapping[row[dependency_field]]
-                else:
-                    document[config["documentField"]] = None
-            else:
-                # Otherwise, use the direct mapping
-                document[config["documentField"]] = row[config["column"]]
-        output_array.append(document)
-    return output_array
\ No newline at end of file
+    plan = build_transform_plan(df.columns, get_pipeline_context(mapping_data).mapping_data)
+    columns = [_resolve_plan_values(df, step) for step in plan]
+    return _assemble_documents(plan, columns, 0, len(df))
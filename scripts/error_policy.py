@@ -0,0 +1,117 @@
+import logging
+import os
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+ERROR_POLICIES = ("fail-fast", "quarantine", "threshold")
+DEFAULT_ERROR_POLICY = "fail-fast"
+
+# Number of errors collected before a fail-fast run stops validating
+DEFAULT_MAX_ERRORS = 100
+
+REJECT_REASONS_COLUMN = "_rejectReasons"
+
+def _reject_reasons(error_table, messages):
+    """Joins the error messages (or `column.rule` when none are given) of each rejected row."""
+    if messages is None:
+        messages = error_table["column"].astype(str) + "." + error_table["rule"].astype(str)
+    reasons = pd.Series(list(messages), index=error_table.index)
+    return reasons.groupby(error_table["row"].to_numpy(), sort=False).agg("; ".join)
+
+def write_rejects(rejects, rejects_path, append=False):
+    """
+    Writes the rejected rows with their reasons to a CSV file.
+
+    Parameters:
+        - rejects (pd.DataFrame): Rejected rows, with the `_rejectReasons` column.
+        - rejects_path (str): Path of the rejects file.
+        - append (bool): Append to an existing file (e.g. for the next chunk) instead of replacing it.
+    """
+    write_header = not (append and os.path.exists(rejects_path))
+    rejects.to_csv(rejects_path, mode='a' if append else 'w', header=write_header, index_label="row")
+
+def check_error_rate(rejected_rows, rows, max_error_rate, first_error=None):
+    """
+    Raises when more than `max_error_rate` percent of the rows were rejected (the `threshold` policy).
+
+    Parameters:
+        - rejected_rows (int): Number of rows with errors.
+        - rows (int): Number of validated rows.
+        - max_error_rate (float): Highest accepted percentage of rows with errors.
+        - first_error (str): The first error message, quoted in the exception.
+
+    Returns:
+        - float: The error rate in percent.
+
+    Raises:
+        - ValueError: If the error rate is above `max_error_rate`.
+    """
+    error_rate = 100.0 * rejected_rows / rows if rows else 0.0
+    if error_rate > max_error_rate:
+        raise ValueError(f"{error_rate:.2f}% of the rows have validation errors, above the "
+                         f"{max_error_rate}% threshold" + (f" (first: {first_error})" if first_error else ""))
+    return error_rate
+
+def apply_error_policy(df, error_table, policy=DEFAULT_ERROR_POLICY, max_error_rate=None, rejects_path=None,
+                       messages=None, append=False):
+    """
+    Applies the error policy to the validated data, without prompting.
+
+    Policies:
+        - fail-fast: raise on the first errors.
+        - quarantine: drop the rows with errors and write them with their reasons to `rejects_path`.
+        - threshold: like quarantine, but raise if more than `max_error_rate` percent of the rows have errors.
+
+    Parameters:
+        - df (pd.DataFrame): The validated data.
+        - error_table (pd.DataFrame): Result of `validate_excel_data_values_table`.
+        - policy (str): One of `ERROR_POLICIES`.
+        - max_error_rate (float): Highest accepted percentage of rows with errors, for `threshold`.
+        - rejects_path (str): CSV file for the rejected rows. Nothing is written when None.
+        - messages (list): Error messages aligned with `error_table` (from `format_validation_errors`),
+          used as the reject reasons.
+        - append (bool): Append to the rejects file, e.g. when called once per chunk.
+
+    Returns:
+        - tuple: (DataFrame without the rejected rows, summary dictionary with `policy`,
+          `errors`, `rows`, `rejected_rows`, `error_rate` and `rejects_file`)
+
+    Raises:
+        - ValueError: For `fail-fast` when there are errors, or for `threshold` when the
+          error rate is above `max_error_rate`.
+    """
+    if policy not in ERROR_POLICIES:
+        raise ValueError(f"Unsupported error policy '{policy}'. Expected one of {list(ERROR_POLICIES)}.")
+    if policy == "threshold" and max_error_rate is None:
+        raise ValueError("The threshold error policy needs a maximum error rate.")
+
+    rejected = df.index.isin(error_table["row"].unique())
+    rejected_rows = int(rejected.sum())
+    error_rate = 100.0 * rejected_rows / len(df) if len(df) else 0.0
+    summary = {
+        "policy": policy,
+        "errors": len(error_table),
+        "rows": len(df),
+        "rejected_rows": rejected_rows,
+        "error_rate": error_rate,
+        "rejects_file": None,
+    }
+    if not len(error_table):
+        return df, summary
+
+    first_error = messages[0] if messages else f"{error_table['column'].iloc[0]}.{error_table['rule'].iloc[0]}"
+    if policy == "fail-fast":
+        raise ValueError(f"Validation failed with {len(error_table)} errors (first: {first_error})")
+    if policy == "threshold":
+        check_error_rate(rejected_rows, len(df), max_error_rate, first_error)
+
+    if rejects_path:
+        rejects = df[rejected].assign(**{REJECT_REASONS_COLUMN: _reject_reasons(error_table, messages)})
+        write_rejects(rejects, rejects_path, append)
+        summary["rejects_file"] = rejects_path
+
+    logger.warning(f"Rejected {rejected_rows} of {len(df)} rows with validation errors"
+                   f"{' (written to ' + rejects_path + ')' if rejects_path else ''}")
+    return df[~rejected], summary
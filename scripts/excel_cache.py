@@ -0,0 +1,236 @@
+import argparse
+import hashlib
+import json
+import logging
+import os
+import time
+
+import pandas as pd
+
+try:
+    import pyarrow
+    import pyarrow.feather as feather
+except ImportError:  # pragma: no cover - the cache falls back to pickle files
+    pyarrow = None
+    feather = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "navigatorgpt", "excel")
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+
+def get_cache_dir():
+    """Returns the cache directory (`NAVIGATOR_EXCEL_CACHE_DIR` or `~/.cache/navigatorgpt/excel`)."""
+    return os.environ.get("NAVIGATOR_EXCEL_CACHE_DIR", DEFAULT_CACHE_DIR)
+
+def get_cache_max_bytes():
+    """Returns the cache size limit in bytes (`NAVIGATOR_EXCEL_CACHE_MAX_BYTES`, 1 GiB by default)."""
+    return int(os.environ.get("NAVIGATOR_EXCEL_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+
+def is_cache_enabled():
+    """The cache is on unless `NAVIGATOR_EXCEL_CACHE` is set to 0/false/off."""
+    return os.environ.get("NAVIGATOR_EXCEL_CACHE", "1").lower() not in ("0", "false", "off")
+
+def _file_sha256(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for block in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def get_cache_key(file_path, sheet_name=None, dtype=None):
+    """
+    Builds the cache key of a parsed workbook.
+
+    The key covers the absolute path, size, modification time and SHA-256 of
+    the file, the sheet and the dtype overrides passed to the parser.
+
+    Parameters:
+        - file_path (str): Path to the Excel file.
+        - sheet_name (str): Worksheet name, or None for the first worksheet.
+        - dtype (dict): The dtype overrides used to parse the sheet.
+
+    Returns:
+        - tuple: (key string, metadata dictionary describing the source)
+    """
+    stat = os.stat(file_path)
+    metadata = {
+        "path": os.path.abspath(file_path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": _file_sha256(file_path),
+        "sheet": sheet_name,
+        "dtype": {str(column): str(value) for column, value in (dtype or {}).items()},
+    }
+    key = hashlib.sha256(json.dumps(metadata, sort_keys=True).encode()).hexdigest()
+    return key, metadata
+
+def _entry_paths(cache_dir, key):
+    base = os.path.join(cache_dir, key)
+    return base + ".feather", base + ".pkl", base + ".json"
+
+def read_cached_frame(key, cache_dir=None):
+    """
+    Returns the cached DataFrame for `key`, or None on a miss.
+
+    Feather entries are read with pyarrow and converted to a DataFrame, which
+    holds its own copy of the data. A hit refreshes the entry's access time for the LRU eviction.
+    """
+    feather_path, pickle_path, metadata_path = _entry_paths(cache_dir or get_cache_dir(), key)
+    try:
+        if feather is not None and os.path.exists(feather_path):
+            df = feather.read_table(feather_path, memory_map=True).to_pandas()
+            data_path = feather_path
+        elif os.path.exists(pickle_path):
+            df = pd.read_pickle(pickle_path)
+            data_path = pickle_path
+        else:
+            return None
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable cache entry {key}: {e}")
+        return None
+
+    now = time.time()
+    for path in (data_path, metadata_path):
+        if os.path.exists(path):
+            os.utime(path, (now, now))
+    return df
+
+def write_cached_frame(key, metadata, df, cache_dir=None, max_bytes=None):
+    """
+    Stores a parsed DataFrame in the cache and evicts old entries beyond `max_bytes`.
+
+    Frames are written as uncompressed Feather, which reads back without
+    decompressing; frames Arrow cannot represent (e.g. columns mixing dates, numbers and
+    text) are pickled instead.
+    """
+    cache_dir = cache_dir or get_cache_dir()
+    os.makedirs(cache_dir, exist_ok=True)
+    feather_path, pickle_path, metadata_path = _entry_paths(cache_dir, key)
+
+    data_path = None
+    if feather is not None and isinstance(df.index, pd.RangeIndex) and df.index.start == 0:
+        try:
+            feather.write_feather(df, feather_path + ".tmp", compression="uncompressed")
+            os.replace(feather_path + ".tmp", feather_path)
+            data_path = feather_path
+        except (pyarrow.ArrowException, ValueError, TypeError):
+            if os.path.exists(feather_path + ".tmp"):
+                os.remove(feather_path + ".tmp")
+    if data_path is None:
+        df.to_pickle(pickle_path + ".tmp")
+        os.replace(pickle_path + ".tmp", pickle_path)
+        data_path = pickle_path
+
+    metadata = {**metadata, "format": os.path.splitext(data_path)[1][1:], "bytes": os.path.getsize(data_path),
+                "rows": len(df), "created": time.time()}
+    with open(metadata_path, 'w') as file:
+        json.dump(metadata, file, indent=4)
+
+    evict_cache(max_bytes if max_bytes is not None else get_cache_max_bytes(), cache_dir)
+
+def list_cache_entries(cache_dir=None):
+    """
+    Lists the cache entries, most recently used first.
+
+    Returns:
+        - list: One dictionary per entry with the source metadata, `key`,
+          `bytes` and `last_access`.
+    """
+    cache_dir = cache_dir or get_cache_dir()
+    if not os.path.isdir(cache_dir):
+        return []
+
+    entries = []
+    for name in os.listdir(cache_dir):
+        if not name.endswith(".json"):
+            continue
+        key = name[:-len(".json")]
+        feather_path, pickle_path, metadata_path = _entry_paths(cache_dir, key)
+        data_path = feather_path if os.path.exists(feather_path) else pickle_path
+        if not os.path.exists(data_path):
+            continue
+        with open(metadata_path, 'r') as file:
+            metadata = json.load(file)
+        entries.append({
+            **metadata,
+            "key": key,
+            "bytes": os.path.getsize(data_path),
+            "last_access": os.path.getmtime(data_path),
+        })
+    return sorted(entries, key=lambda entry: entry["last_access"], reverse=True)
+
+def _remove_entry(cache_dir, key):
+    for path in _entry_paths(cache_dir, key):
+        if os.path.exists(path):
+            os.remove(path)
+
+def evict_cache(max_bytes, cache_dir=None):
+    """Removes least recently used entries until the cache holds at most `max_bytes`. Returns the removed keys."""
+    cache_dir = cache_dir or get_cache_dir()
+    entries = list_cache_entries(cache_dir)
+    total = sum(entry["bytes"] for entry in entries)
+    removed = []
+    while entries and total > max_bytes:
+        entry = entries.pop()
+        _remove_entry(cache_dir, entry["key"])
+        total -= entry["bytes"]
+        removed.append(entry["key"])
+    return removed
+
+def clear_cache(cache_dir=None):
+    """Removes every cache entry. Returns the number of entries removed."""
+    cache_dir = cache_dir or get_cache_dir()
+    entries = list_cache_entries(cache_dir)
+    for entry in entries:
+        _remove_entry(cache_dir, entry["key"])
+    return len(entries)
+
+def load_excel_with_cache(file_path, reader, sheet_name=None, dtype=None):
+    """
+    Returns the parsed sheet from the cache, parsing it with `reader()` on a miss.
+
+    Parameters:
+        - file_path (str): Path to the Excel file.
+        - reader (callable): Parses the sheet when it is not cached.
+        - sheet_name (str): Worksheet name, or None for the first worksheet.
+        - dtype (dict): The dtype overrides `reader` applies.
+
+    Returns:
+        - pd.DataFrame: The parsed sheet.
+    """
+    if not is_cache_enabled():
+        return reader()
+
+    key, metadata = get_cache_key(file_path, sheet_name, dtype)
+    df = read_cached_frame(key)
+    if df is not None:
+        return df
+
+    df = reader()
+    try:
+        write_cached_frame(key, metadata, df)
+    except OSError as e:
+        logger.warning(f"Could not cache '{file_path}': {e}")
+    return df
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect or clear the parsed Excel cache.")
+    parser.add_argument("command", choices=["list", "clear", "evict"])
+    parser.add_argument("--cache-dir", default=None, help="Cache directory (default: $NAVIGATOR_EXCEL_CACHE_DIR or ~/.cache/navigatorgpt/excel).")
+    parser.add_argument("--max-bytes", type=int, default=None, help="Size limit for 'evict'.")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        entries = list_cache_entries(args.cache_dir)
+        for entry in entries:
+            print(f"{entry['key'][:12]}  {entry['bytes']:>12,}  {entry['format']:<7}  "
+                  f"{time.strftime('%m-%d-%Y.%H.%M.%S', time.localtime(entry['last_access']))}  "
+                  f"{entry['path']}{' [' + entry['sheet'] + ']' if entry['sheet'] else ''}")
+        print(f"{len(entries)} entries, {sum(entry['bytes'] for entry in entries):,} bytes "
+              f"in {args.cache_dir or get_cache_dir()}")
+    elif args.command == "clear":
+        print(f"Removed {clear_cache(args.cache_dir)} entries.")
+    else:
+        max_bytes = args.max_bytes if args.max_bytes is not None else get_cache_max_bytes()
+        print(f"Removed {len(evict_cache(max_bytes, args.cache_dir))} entries.")
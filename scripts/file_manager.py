@@ -1,20 +1,36 @@
 
 import os
+import csv
 import json
-import pandas as pd
 from datetime import datetime
 
+# pandas, openpyxl and the modules built on them are imported by the functions
+# that read data, so the file and mapping checks of `cli.py` start without them
+
+DATA_FILE_EXTENSIONS = ('.xlsx', '.csv')
+
+# The cross-field rules of a mapping live next to it, e.g. `attration.json` ->
+# `attration.rules.json` as {"crossValidation": [...]}, so the mapping itself
+# stays a plain column -> config dictionary
+RULES_FILE_SUFFIX = ".rules.json"
+CROSS_VALIDATION_KEY = "crossValidation"
+
+def check_excel_file_path(file_path):
+    """Checks that the provided data file exists and has a supported extension
+    (`.xlsx` or `.csv`) without reading its content.
+    """
+    if not os.path.exists(file_path) or not file_path.endswith(DATA_FILE_EXTENSIONS):
+        raise FileNotFoundError(f"[Errno 2] No such file or directory: '{file_path}'")
 
 def validate_excel_file_path(file_path):
     """Validates the path of the provided Excel file.
     If the file exists and is valid, it returns the content as a pandas DataFrame.
     Otherwise, it raises an appropriate exception.
     """
-    if not os.path.exists(file_path) or not file_path.endswith('.xlsx'):
-        raise FileNotFoundError(f"[Errno 2] No such file or directory: '{file_path}'")
+    check_excel_file_path(file_path)
 
     try:
-        data = pd.read_excel(file_path)
+        data = load_excel_data(file_path)
         return data
     except Exception as e:
         raise e
@@ -47,6 +63,16 @@ def validate_schema_file(file_path):
     :param file_path: Path to the GraphQL schema file.
     :return: True if basic checks pass, raises an exception otherwise.
     """
+    load_schema_file(file_path)
+    return True
+
+def load_schema_file(file_path):
+    """
+    Checks the GraphQL schema file like `validate_schema_file` and returns its content.
+
+    :param file_path: Path to the GraphQL schema file.
+    :return: The schema as a string, raises an exception if the checks fail.
+    """
 
     # Check if the file exists
     if not os.path.exists(file_path):
@@ -59,8 +85,7 @@ def validate_schema_file(file_path):
      # Try reading the file as a text file (Replace w/graphene)
     try:
         with open(file_path, 'r') as f:
-            _ = f.read()
-        return True
+            return f.read()
     except Exception as e:
         raise ValueError(f"File '{file_path}' could not be read as a text file. Error: {str(e)}")
 
@@ -94,9 +119,98 @@ def load_mapping_file(file_path):
         data = json.load(file)
     return data
 
-def load_excel_data(file_path):
-    """Loads an Excel file and returns a DataFrame."""
-    return pd.read_excel(file_path)
+def get_rules_file_path(mapping_file_path):
+    """Returns the path of the cross-field rules file of a mapping (`<mapping>.rules.json`)."""
+    return os.path.splitext(mapping_file_path)[0] + RULES_FILE_SUFFIX
+
+def load_cross_validation_rules(mapping_file_path):
+    """
+    Loads the cross-field rules of a mapping from its rules file.
+
+    Returns:
+        - list: The `crossValidation` entries; empty if the mapping has no rules file.
+    """
+    rules_file_path = get_rules_file_path(mapping_file_path)
+    if not os.path.exists(rules_file_path):
+        return []
+    return validate_mapping_file(rules_file_path).get(CROSS_VALIDATION_KEY, [])
+
+def load_excel_data(file_path, sheet_name=None, dtype=None):
+    """Loads an Excel file (or a `.csv` export) and returns a DataFrame.
+    `sheet_name` selects the worksheet; the first worksheet is used by default.
+    Parsed worksheets are kept in the on-disk cache of `excel_cache`, so loading
+    an unchanged workbook again skips the openpyxl parse."""
+    import pandas as pd
+    from excel_cache import load_excel_with_cache
+
+    if file_path.endswith('.csv'):
+        return pd.read_csv(file_path, dtype=dtype)
+    return load_excel_with_cache(
+        file_path,
+        lambda: pd.read_excel(file_path, sheet_name=sheet_name if sheet_name is not None else 0, dtype=dtype),
+        sheet_name=sheet_name,
+        dtype=dtype,
+    )
+
+def _convert_excel_value(value):
+    """Converts a raw openpyxl cell value the same way `pd.read_excel` does."""
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+def load_excel_data_in_chunks(file_path, chunk_size=10000, sheet_name=None):
+    """
+    Loads an Excel or CSV file as a sequence of DataFrames of at most `chunk_size` rows.
+
+    `.xlsx` files are read row by row with openpyxl in read-only mode and
+    `.csv` files with `pd.read_csv(chunksize=...)`, so only one chunk is held in
+    memory at a time. Each chunk is parsed with the same type inference as
+    `load_excel_data` and keeps the row numbers of the full sheet as its index.
+
+    Parameters:
+    - file_path (str): Path to the `.xlsx` or `.csv` file.
+    - chunk_size (int): Maximum number of rows per chunk.
+    - sheet_name (str): Worksheet to read. Defaults to the first worksheet.
+
+    Returns:
+    - generator: Yields one pandas DataFrame per chunk.
+    """
+    import pandas as pd
+    from openpyxl import load_workbook
+
+    if file_path.endswith('.csv'):
+        yield from pd.read_csv(file_path, chunksize=chunk_size)
+        return
+
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        worksheet = workbook[sheet_name] if sheet_name else workbook.worksheets[0]
+        rows = worksheet.iter_rows(values_only=True)
+        header = [_convert_excel_value(value) for value in next(rows, ())]
+
+        offset = 0
+        chunk = []
+        for row in rows:
+            chunk.append([_convert_excel_value(value) for value in row])
+            if len(chunk) == chunk_size:
+                yield _parse_excel_chunk(header, chunk, offset)
+                offset += len(chunk)
+                chunk = []
+        if chunk or offset == 0:
+            yield _parse_excel_chunk(header, chunk, offset)
+    finally:
+        workbook.close()
+
+def _parse_excel_chunk(header, rows, offset):
+    """Builds a DataFrame for one chunk of raw worksheet rows."""
+    import pandas as pd
+    from pandas.io.parsers import TextParser
+
+    df = TextParser([header] + rows, header=0).read()
+    df.index = pd.RangeIndex(offset, offset + len(df))
+    return df
 
 def load_template_file(file_path):
     """
@@ -112,16 +226,94 @@ def load_template_file(file_path):
         content = file.read()
     return content
 
+def check_file_presence(required_files, optional_files=[]):
+    """
+    Checks the presence of required and optional files.
+
+    Parameters:
+        - required_files (list): List of paths to required files.
+        - optional_files (list): List of paths to optional files.
+
+    Returns:
+        - tuple: (list of missing required files, list of missing optional files)
+    """
+    missing_required = [file for file in required_files if not os.path.exists(file)]
+    missing_optional = [file for file in optional_files if not os.path.exists(file)]
+
+    return missing_required, missing_optional
+
 def check_script_dependencies(script_names):
     for script in script_names:
         if not os.path.exists(script):
             return False
     return True
 
-# Load the Excel file to inspect its columns
+def _header_column_names(header):
+    """Names the header cells the way `pd.read_excel` does (`Unnamed: n`, `name.1` for duplicates)."""
+    columns, seen = [], {}
+    for index, value in enumerate(header):
+        name = f"Unnamed: {index}" if value is None else value
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        columns.append(name)
+    return columns
+
+def probe_excel_header(file_path, sheet_name=None, count_rows=False):
+    """
+    Reads only the header row of an Excel or CSV file.
+
+    For `.xlsx` files the worksheet is opened with openpyxl in read-only mode,
+    only the first row is read and the row count comes from the sheet
+    dimensions, so the cost does not depend on the size of the sheet. For
+    `.csv` files only the header line is read with the `csv` module, so pandas
+    is not imported. A CSV file (or a workbook without stored dimensions) has
+    no row count unless `count_rows` is set, which reads every record.
+
+    Parameters:
+    - file_path (str): Path to the `.xlsx` or `.csv` file.
+    - sheet_name (str): Worksheet to probe. Defaults to the first worksheet.
+    - count_rows (bool): Count the rows when the file does not record their number.
+
+    Returns:
+    - dict: `columns` (list), `sheets` (list of worksheet names), `sheet`
+      (the probed worksheet) and `row_count` (number of data rows, or None if not counted).
+    """
+    if file_path.endswith('.csv'):
+        with open(file_path, 'r', newline='') as file:
+            reader = csv.reader(file)
+            header = next(reader, [])
+            row_count = sum(1 for _ in reader) if count_rows else None
+        columns = _header_column_names([value or None for value in header])
+        return {"columns": columns, "sheets": [], "sheet": None, "row_count": row_count}
+
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        worksheet = workbook[sheet_name] if sheet_name else workbook.worksheets[0]
+        header = next(worksheet.iter_rows(min_row=1, max_row=1, values_only=True), ())
+
+        max_row = worksheet.max_row
+        if max_row is None and count_rows:
+            # The workbook has no stored dimensions, so the rows have to be counted
+            worksheet.reset_dimensions()
+            max_row = sum(1 for _ in worksheet.iter_rows(values_only=True))
+
+        return {
+            "columns": _header_column_names(header),
+            "sheets": workbook.sheetnames,
+            "sheet": worksheet.title,
+            "row_count": max(max_row - 1, 0) if max_row is not None else None,
+        }
+    finally:
+        workbook.close()
+
+# Read the header row of the Excel file to inspect its columns
 def get_excel_columns(excel_path):
-    df = pd.read_excel(excel_path)
-    return df.columns.tolist()
+    return probe_excel_header(excel_path)["columns"]
 
 # Function to extract source column names from the mapping file
 def extract_source_columns_from_mapping(mapping_file_path):
@@ -201,10 +393,12 @@ def save_processed_data_to_template(data, template_content, output_file_path):
 
 def save_output_array_to_js_file(output_array, output_file_path):
     """Saves the generated output array to a .js file."""
+    from output_writer import json_default
+
     with open(output_file_path, 'w') as file:
         file.write("data = [\n")
         for item in output_array:
-            file.write(json.dumps(item, indent=4))
+            file.write(json.dumps(item, indent=4, default=json_default))
             file.write(",\n")
         file.write("];")
 
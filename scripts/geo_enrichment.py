@@ -0,0 +1,227 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+try:
+    import shapely
+    from shapely import STRtree
+except ImportError:  # pragma: no cover - geocoding enrichment is optional
+    shapely = None
+    STRtree = None
+
+from pipeline_context import get_pipeline_context
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "navigatorgpt", "geo")
+
+DEFAULT_LAT_COLUMN = "Latitude"
+DEFAULT_LON_COLUMN = "Longitude"
+
+# Document fields filled by the enrichment; their columns are read from the mapping
+NEIGHBORHOOD_FIELD = "loc.neighborhood"
+BOROUGH_CODE_FIELD = "loc.boroughCode"
+
+# Coordinates are memoized at this many decimals (~0.1 m)
+COORDINATE_DECIMALS = 6
+
+# In-process neighborhood indexes, keyed by the GeoJSON cache key
+_INDEX_CACHE = {}
+
+def get_geo_cache_dir():
+    """Returns the cache directory of the spatial indexes (`NAVIGATOR_GEO_CACHE_DIR` or `~/.cache/navigatorgpt/geo`)."""
+    return os.environ.get("NAVIGATOR_GEO_CACHE_DIR", DEFAULT_CACHE_DIR)
+
+def _require_shapely():
+    if shapely is None:
+        raise ImportError("shapely is required for the geocoding enrichment (pip install shapely).")
+
+def _geojson_cache_key(geojson_path):
+    digest = hashlib.sha256()
+    with open(geojson_path, 'rb') as file:
+        for block in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(block)
+    digest.update(shapely.__version__.encode())
+    return digest.hexdigest()
+
+def build_neighborhood_index(geojson_path):
+    """
+    Builds the spatial index of the polygons in a GeoJSON FeatureCollection.
+
+    Parameters:
+        - geojson_path (str): Path to the GeoJSON file (e.g. `nycneighborhoods.geojson`).
+
+    Returns:
+        - dict: `tree` (STRtree over the feature geometries), `properties`
+          (DataFrame of the feature properties, one row per tree geometry) and
+          `memo` (per-coordinate lookup cache).
+    """
+    _require_shapely()
+    with open(geojson_path, 'r') as file:
+        features = json.load(file)["features"]
+
+    geometries = shapely.from_geojson([json.dumps(feature["geometry"]) for feature in features])
+    return {
+        "tree": STRtree(geometries),
+        "properties": pd.DataFrame([feature.get("properties") or {} for feature in features]),
+        "memo": {},
+    }
+
+def load_neighborhood_index(geojson_path, cache_dir=None):
+    """
+    Returns the spatial index of a GeoJSON file, building it only once.
+
+    The index is kept in memory for the process and pickled on disk, keyed by
+    the SHA-256 of the file, so later runs skip parsing the polygons.
+
+    Parameters:
+        - geojson_path (str): Path to the GeoJSON file.
+        - cache_dir (str): Cache directory. Defaults to `get_geo_cache_dir()`.
+
+    Returns:
+        - dict: The index from `build_neighborhood_index`.
+    """
+    _require_shapely()
+    key = _geojson_cache_key(geojson_path)
+    index = _INDEX_CACHE.get(key)
+    if index is not None:
+        return index
+
+    cache_path = os.path.join(cache_dir or get_geo_cache_dir(), f"{key}.pkl")
+    if os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'rb') as file:
+                index = pickle.load(file)
+        except (OSError, pickle.UnpicklingError, EOFError) as e:
+            logger.warning(f"Ignoring unreadable spatial index cache {cache_path}: {e}")
+
+    if index is None:
+        index = build_neighborhood_index(geojson_path)
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            with open(cache_path + ".tmp", 'wb') as file:
+                pickle.dump({**index, "memo": {}}, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(cache_path + ".tmp", cache_path)
+        except OSError as e:
+            logger.warning(f"Could not cache the spatial index of '{geojson_path}': {e}")
+
+    index["memo"] = {}
+    _INDEX_CACHE[key] = index
+    return index
+
+def lookup_features(index, latitudes, longitudes):
+    """
+    Finds the feature containing each point.
+
+    Coordinates are rounded to `COORDINATE_DECIMALS`, de-duplicated and looked
+    up in the index's memo; only the unseen ones are queried against the
+    STRtree, in a single vectorized batch.
+
+    Parameters:
+        - index (dict): Result of `load_neighborhood_index`.
+        - latitudes (array-like): Point latitudes (WGS84).
+        - longitudes (array-like): Point longitudes (WGS84).
+
+    Returns:
+        - np.ndarray: Position of the containing feature in `index["properties"]`
+          for each point, or -1 (outside every polygon or missing coordinates).
+    """
+    _require_shapely()
+    coordinates = pd.DataFrame({
+        "lat": pd.to_numeric(pd.Series(latitudes), errors="coerce").round(COORDINATE_DECIMALS).to_numpy(),
+        "lon": pd.to_numeric(pd.Series(longitudes), errors="coerce").round(COORDINATE_DECIMALS).to_numpy(),
+    })
+    valid = coordinates.notna().all(axis=1).to_numpy()
+    unique = coordinates[valid].drop_duplicates()
+    keys = list(zip(unique["lat"], unique["lon"]))
+
+    memo = index["memo"]
+    unseen = [key for key in keys if key not in memo]
+    if unseen:
+        unseen_lat, unseen_lon = np.array(unseen).T
+        point_positions, feature_positions = index["tree"].query(
+            shapely.points(unseen_lon, unseen_lat), predicate="intersects")
+        # A point on a shared border matches several polygons; the query results are
+        # not in feature order, so they are sorted and the lowest feature position wins
+        order = np.lexsort((feature_positions, point_positions))
+        points, first = np.unique(point_positions[order], return_index=True)
+        found = np.full(len(unseen), -1)
+        found[points] = feature_positions[order][first]
+        memo.update(zip(unseen, found.tolist()))
+
+    matches = pd.Series([memo[key] for key in keys], index=pd.MultiIndex.from_arrays([unique["lat"], unique["lon"]]))
+    result = np.full(len(coordinates), -1)
+    result[valid] = matches.reindex(pd.MultiIndex.from_frame(coordinates[valid])).to_numpy()
+    return result
+
+def get_location_columns(mapping_data):
+    """
+    Returns the columns of the `NEIGHBORHOOD_FIELD` and `BOROUGH_CODE_FIELD`
+    document fields (e.g. `Neighborhood` and `BoroughCode`); None for a field the mapping does not write.
+    """
+    document_field_to_column = {field: column
+                                for column, field in get_pipeline_context(mapping_data).column_to_document_field.items()}
+    return document_field_to_column.get(NEIGHBORHOOD_FIELD), document_field_to_column.get(BOROUGH_CODE_FIELD)
+
+def get_borough_codes(mapping_data):
+    """Returns the borough name -> borough code table, inverted from the dependency on the borough code column."""
+    borough_code_column = get_location_columns(mapping_data)[1]
+    for source, table in get_pipeline_context(mapping_data).dependency_tables.values():
+        if source == borough_code_column:
+            return {name: code for code, name in table.items()}
+    return {}
+
+def enrich_locations(df, index, mapping_data, lat_column=DEFAULT_LAT_COLUMN, lon_column=DEFAULT_LON_COLUMN,
+                     neighborhood_property="neighborhood", borough_property="borough", overwrite=False):
+    """
+    Fills the columns of `loc.neighborhood` and `loc.boroughCode` (`Neighborhood`
+    and `BoroughCode` in `attration.json`, see `get_location_columns`) from the
+    polygon containing each row's coordinates.
+
+    Existing values are kept unless `overwrite` is set. Rows without
+    coordinates, or outside every polygon, are left unchanged.
+
+    Parameters:
+        - df (pd.DataFrame): The Excel data.
+        - index (dict): Result of `load_neighborhood_index`.
+        - mapping_data (dict, str or PipelineContext): The mapping, giving the columns to fill and the
+          borough name -> code table.
+        - lat_column (str): Column holding the latitude.
+        - lon_column (str): Column holding the longitude.
+        - neighborhood_property (str): GeoJSON property with the neighborhood name.
+        - borough_property (str): GeoJSON property with the borough name.
+        - overwrite (bool): Replace existing values.
+
+    Returns:
+        - tuple: (the enriched DataFrame, number of rows matched to a polygon)
+    """
+    if lat_column not in df.columns or lon_column not in df.columns:
+        return df, 0
+
+    positions = lookup_features(index, df[lat_column], df[lon_column])
+    matched = positions >= 0
+    properties = index["properties"]
+
+    def column_values(name):
+        if name not in properties or not matched.any():
+            return pd.Series(None, index=df.index, dtype=object)
+        values = properties[name].to_numpy(dtype=object)
+        return pd.Series(np.where(matched, values[np.where(matched, positions, 0)], None), index=df.index)
+
+    neighborhood_column, borough_code_column = get_location_columns(mapping_data)
+    neighborhoods = column_values(neighborhood_property)
+    borough_codes = column_values(borough_property).map(get_borough_codes(mapping_data))
+
+    enriched = {}
+    for column, values in ((neighborhood_column, neighborhoods), (borough_code_column, borough_codes)):
+        if column is None:
+            continue
+        existing = df[column] if column in df.columns else pd.Series(None, index=df.index, dtype=object)
+        enriched[column] = values.where(values.notna(), existing) if overwrite else existing.where(
+            existing.notna(), values)
+    return df.assign(**enriched), int(matched.sum())
@@ -0,0 +1,358 @@
+import argparse
+import json
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow
+    import pyarrow.csv as pa_csv
+    import pyarrow.compute as pc
+except ImportError:  # pragma: no cover - reference files are read with pandas instead
+    pyarrow = None
+    pa_csv = None
+    pc = None
+
+from file_manager import load_excel_data
+from type_coercion import decode_object_ids, unpack_object_ids
+
+logger = logging.getLogger(__name__)
+
+ID_ERROR_COLUMNS = ["row", "Id", "column", "rule", "value"]
+ID_ERROR_MESSAGES = {
+    "uniqueId": "Id repeats an earlier row.",
+    "referencedId": "Id is not in the reference id set.",
+}
+
+# Columns holding the ids in a reference CSV, in order of preference
+REFERENCE_ID_COLUMNS = ("_id", "id", "Id")
+# Any 24-digit hex value, also inside `ObjectId(...)` or `{"$oid": ...}` of a mongoexport dump
+_OBJECT_ID_REGEX = r"(?P<id>[0-9a-fA-F]{24})"
+
+# 10 bits per id and 7 hashes give about 1% false positives
+DEFAULT_BITS_PER_ID = 10
+DEFAULT_HASHES = 7
+
+INDEX_FILE = "index.json"
+IDS_FILE = "ids.npy"
+BLOOM_FILE = "bloom.npy"
+
+def _hash_pairs(ids):
+    """Two 32-bit hashes of each 12-byte id (splitmix64 of its 4-byte and 8-byte halves)."""
+    raw = np.ascontiguousarray(ids).view(np.uint8).reshape(-1, 12)
+    high = raw[:, :4].copy().view(">u4").ravel().astype(np.uint64)
+    low = raw[:, 4:].copy().view(">u8").ravel().astype(np.uint64)
+    h = low ^ (high * np.uint64(0x9E3779B97F4A7C15))
+    h ^= h >> np.uint64(30)
+    h *= np.uint64(0xBF58476D1CE4E5B9)
+    h ^= h >> np.uint64(27)
+    h *= np.uint64(0x94D049BB133111EB)
+    h ^= h >> np.uint64(31)
+    return h & np.uint64(0xFFFFFFFF), (h >> np.uint64(32)) | np.uint64(1)
+
+def _bloom_positions(ids, bit_count, hashes):
+    """Yields the bit set by each hash function for every id (double hashing)."""
+    first, second = _hash_pairs(ids)
+    mask = np.uint64(bit_count - 1)
+    for index in range(hashes):
+        yield (first + np.uint64(index) * second) & mask
+
+def build_bloom_filter(ids, bits_per_id=DEFAULT_BITS_PER_ID, hashes=DEFAULT_HASHES):
+    """
+    Builds a Bloom filter of 12-byte ids.
+
+    The bit count is rounded up to a power of two so positions are masked
+    rather than divided. The bits are set in a boolean array (one byte per
+    bit while building) and packed at the end.
+
+    Returns:
+        - np.ndarray: The filter bits, packed into uint8.
+    """
+    bit_count = 1 << max(int(np.ceil(np.log2(max(len(ids), 1) * bits_per_id))), 3)
+    flags = np.zeros(bit_count, dtype=bool)
+    for positions in _bloom_positions(ids, bit_count, hashes):
+        flags[positions] = True
+    return np.packbits(flags, bitorder="little")
+
+def bloom_filter_contains(bits, ids, hashes=DEFAULT_HASHES):
+    """Returns a boolean array: False where an id is certainly not in the filter."""
+    found = np.ones(len(ids), dtype=bool)
+    for positions in _bloom_positions(ids, len(bits) * 8, hashes):
+        found &= (bits[positions >> np.uint64(3)] >> (positions & np.uint64(7)).astype(np.uint8)) & 1 == 1
+    return found
+
+def sorted_distinct(ids):
+    """Sorts `S12` ids and drops the repeated ones (a sort and one comparison, no hashing)."""
+    ids = np.sort(ids)
+    if len(ids) < 2:
+        return ids
+    return ids[np.concatenate([[True], ids[1:] != ids[:-1]])]
+
+def sorted_contains(sorted_ids, ids):
+    """Membership of `ids` in a sorted `S12` array (e.g. memory-mapped), by binary search."""
+    if not len(sorted_ids):
+        return np.zeros(len(ids), dtype=bool)
+    positions = np.searchsorted(sorted_ids, ids)
+    return sorted_ids[np.minimum(positions, len(sorted_ids) - 1)] == ids
+
+class ReferenceIdIndex:
+    """
+    A set of ObjectIds stored as a sorted array of 12-byte values and a Bloom filter.
+
+    Both arrays are memory-mapped, so the index costs little memory whatever
+    its size: ids missing from the filter are rejected without touching the
+    sorted array, and the others are confirmed by binary search.
+
+    Attributes:
+        - ids (np.ndarray): The sorted, distinct ids (`S12`).
+        - bloom (np.ndarray): The Bloom filter bits.
+        - hashes (int): Number of hash functions of the filter.
+        - metadata (dict): The content of `index.json`.
+    """
+
+    def __init__(self, ids, bloom, hashes=DEFAULT_HASHES, metadata=None):
+        self.ids = ids
+        self.bloom = bloom
+        self.hashes = hashes
+        self.metadata = metadata or {}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def contains(self, ids):
+        """
+        Checks 12-byte ids against the index.
+
+        Parameters:
+            - ids (np.ndarray): `S12` values, e.g. from `decode_object_ids`.
+
+        Returns:
+            - np.ndarray: Boolean array, True where the id is in the index.
+        """
+        found = bloom_filter_contains(self.bloom, ids, self.hashes)
+        candidates = np.flatnonzero(found)
+        found[candidates] = sorted_contains(self.ids, ids[candidates])
+        return found
+
+def read_reference_ids(source_path, column=None, block_size=16 * 1024 * 1024):
+    """
+    Reads the ObjectIds of a reference file, a block at a time.
+
+    CSV files (e.g. `landmarks_api_*.csv`) are read from `column`, or from the
+    first of `REFERENCE_ID_COLUMNS` found in the header. Other files (a
+    mongoexport dump in JSON or CSV, or one id per line) are read line by
+    line. In both cases the first 24-digit hex value is taken, so
+    `ObjectId(...)` and `{"$oid": ...}` wrappers are accepted.
+
+    Parameters:
+        - source_path (str): The reference file.
+        - column (str): Id column of a CSV file.
+        - block_size (int): Bytes parsed at a time.
+
+    Yields:
+        - np.ndarray: The valid ids of each block (`S12`).
+    """
+    is_csv = source_path.lower().endswith(".csv")
+    if is_csv and column is None:
+        header = pd.read_csv(source_path, nrows=0).columns
+        column = next((name for name in REFERENCE_ID_COLUMNS if name in header), None)
+        if column is None:
+            raise ValueError(f"'{source_path}' has none of the id columns {list(REFERENCE_ID_COLUMNS)}.")
+
+    if pa_csv is None:  # pragma: no cover - pyarrow not installed
+        if is_csv:
+            chunks = pd.read_csv(source_path, usecols=[column], dtype=str, chunksize=1_000_000)
+            values = (chunk[column] for chunk in chunks)
+        else:
+            chunks = pd.read_csv(source_path, names=["line"], sep="\x1f", dtype=str, chunksize=1_000_000)
+            values = (chunk["line"] for chunk in chunks)
+        for block in values:
+            ids, valid = decode_object_ids(block.str.extract(_OBJECT_ID_REGEX)["id"])
+            yield ids[valid]
+        return
+
+    read_options = pa_csv.ReadOptions(block_size=block_size)
+    if is_csv:
+        convert_options = pa_csv.ConvertOptions(include_columns=[column],
+                                                column_types={column: pyarrow.string()})
+        parse_options = pa_csv.ParseOptions()
+    else:
+        column = "line"
+        read_options = pa_csv.ReadOptions(block_size=block_size, column_names=[column])
+        convert_options = pa_csv.ConvertOptions(column_types={column: pyarrow.string()})
+        parse_options = pa_csv.ParseOptions(delimiter="\x1f", quote_char=False)
+
+    with pa_csv.open_csv(source_path, read_options=read_options, parse_options=parse_options,
+                         convert_options=convert_options) as reader:
+        for batch in reader:
+            values = pc.struct_field(pc.extract_regex(batch.column(column), _OBJECT_ID_REGEX), "id")
+            ids, valid = decode_object_ids(values)
+            yield ids[valid]
+
+def _source_metadata(source_path):
+    stat = os.stat(source_path)
+    return {"path": os.path.abspath(source_path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+def build_reference_id_index(source_path, index_dir, column=None, bits_per_id=DEFAULT_BITS_PER_ID,
+                             hashes=DEFAULT_HASHES):
+    """
+    Builds the id index of a reference file in `index_dir`.
+
+    The directory gets `ids.npy` (the sorted, distinct ids as 12-byte
+    values), `bloom.npy` (the Bloom filter) and `index.json` (the source file
+    and the filter settings).
+
+    Parameters:
+        - source_path (str): The reference file, see `read_reference_ids`.
+        - index_dir (str): Directory receiving the index.
+        - column (str): Id column of a CSV file.
+        - bits_per_id (int): Bloom filter bits per id.
+        - hashes (int): Number of hash functions of the Bloom filter.
+
+    Returns:
+        - ReferenceIdIndex: The index, memory-mapped from `index_dir`.
+    """
+    blocks = list(read_reference_ids(source_path, column))
+    ids = sorted_distinct(np.concatenate(blocks)) if blocks else np.array([], dtype="S12")
+    os.makedirs(index_dir, exist_ok=True)
+    np.save(os.path.join(index_dir, IDS_FILE), ids)
+    np.save(os.path.join(index_dir, BLOOM_FILE), build_bloom_filter(ids, bits_per_id, hashes))
+    metadata = {"source": _source_metadata(source_path), "column": column, "ids": len(ids),
+                "bits_per_id": bits_per_id, "hashes": hashes}
+    with open(os.path.join(index_dir, INDEX_FILE), 'w') as file:
+        json.dump(metadata, file, indent=4)
+    logger.info(f"Indexed {len(ids)} reference ids from {source_path} in {index_dir}")
+    return load_reference_id_index(index_dir)
+
+def load_reference_id_index(index_dir):
+    """Opens an index written by `build_reference_id_index`, memory-mapping its arrays."""
+    with open(os.path.join(index_dir, INDEX_FILE)) as file:
+        metadata = json.load(file)
+    return ReferenceIdIndex(np.load(os.path.join(index_dir, IDS_FILE), mmap_mode="r"),
+                            np.load(os.path.join(index_dir, BLOOM_FILE), mmap_mode="r"),
+                            metadata.get("hashes", DEFAULT_HASHES), metadata)
+
+def get_reference_id_index(reference_path, index_dir=None, column=None):
+    """
+    Returns the id index of a reference file, building it on first use.
+
+    The index is kept in `index_dir` (`<reference_path>.idindex` by default)
+    and rebuilt when the size or modification time of the reference file
+    changes. `reference_path` may also be an index directory.
+
+    Returns:
+        - ReferenceIdIndex: The index.
+    """
+    if os.path.isdir(reference_path):
+        return load_reference_id_index(reference_path)
+
+    index_dir = index_dir or f"{reference_path}.idindex"
+    index_file = os.path.join(index_dir, INDEX_FILE)
+    if os.path.exists(index_file):
+        with open(index_file) as file:
+            metadata = json.load(file)
+        if metadata.get("source") == _source_metadata(reference_path) and metadata.get("column") == column:
+            return load_reference_id_index(index_dir)
+    return build_reference_id_index(reference_path, index_dir, column)
+
+def find_duplicate_ids(ids, valid, seen=None):
+    """
+    Finds the ids that repeat an earlier id, by sorting them.
+
+    Parameters:
+        - ids (np.ndarray): `S12` values from `decode_object_ids`.
+        - valid (np.ndarray): Boolean mask of the valid ids; the others are never duplicates.
+        - seen (np.ndarray): Sorted, distinct ids of earlier chunks, which also count as earlier rows.
+
+    Returns:
+        - tuple: (boolean array marking every occurrence after the first, sorted
+          distinct ids of `seen` and `ids` for the next chunk)
+    """
+    present = np.flatnonzero(valid)
+    order = np.argsort(ids[present], kind="stable")
+    sorted_ids = ids[present][order]
+    repeated = np.zeros(len(present), dtype=bool)
+    repeated[order[1:][sorted_ids[1:] == sorted_ids[:-1]]] = True
+    if seen is not None:
+        repeated |= sorted_contains(seen, ids[present])
+
+    duplicates = np.zeros(len(ids), dtype=bool)
+    duplicates[present] = repeated
+    distinct = sorted_ids[~np.concatenate([[False], sorted_ids[1:] == sorted_ids[:-1]])] if len(present) else sorted_ids
+    if seen is not None and len(seen):
+        # Both parts are sorted runs, which the stable sort merges
+        distinct = np.sort(np.concatenate([seen, distinct[~sorted_contains(seen, distinct)]]), kind="stable")
+    return duplicates, distinct
+
+def check_object_ids(df, reference_index=None, column="Id", seen=None):
+    """
+    Checks that the ObjectIds of a column are unique and, with `reference_index`, that they exist.
+
+    Values that are missing or not ObjectIds are left to the `pattern` rule.
+
+    Parameters:
+        - df (pd.DataFrame): The sheet (or chunk).
+        - reference_index (ReferenceIdIndex): Ids the rows may reference, e.g. of the target collection.
+        - column (str): The id column.
+        - seen (np.ndarray): Ids of earlier chunks (from the previous call), in streaming mode.
+
+    Returns:
+        - tuple: (error table with the columns of `ID_ERROR_COLUMNS` and the rules
+          `uniqueId`/`referencedId`, ordered by row; `seen` for the next chunk)
+    """
+    if column not in df.columns:
+        return pd.DataFrame(columns=ID_ERROR_COLUMNS), seen
+
+    ids, valid = decode_object_ids(df[column])
+    duplicates, seen = find_duplicate_ids(ids, valid, seen)
+    failed = {"uniqueId": duplicates}
+    if reference_index is not None:
+        failed["referencedId"] = valid & ~reference_index.contains(ids)
+
+    values = unpack_object_ids(df[column]).to_numpy(dtype=object)
+    frames = [pd.DataFrame({
+        "row": df.index[mask],
+        "Id": values[mask],
+        "column": column,
+        "rule": rule,
+        "value": values[mask],
+        "_position": np.flatnonzero(mask),
+    }) for rule, mask in failed.items() if mask.any()]
+    if not frames:
+        return pd.DataFrame(columns=ID_ERROR_COLUMNS), seen
+    errors = pd.concat(frames, ignore_index=True).sort_values("_position", kind="stable")
+    return errors[ID_ERROR_COLUMNS].reset_index(drop=True), seen
+
+def format_id_errors(error_table):
+    """Formats an error table from `check_object_ids` as messages, like `format_validation_errors`."""
+    if error_table.empty:
+        return []
+    messages = (
+        "Id " + error_table["Id"].astype(str)
+        + " has invalid value " + error_table["value"].astype(str)
+        + " in column " + error_table["column"].astype(str)
+        + ". " + error_table["rule"].map(ID_ERROR_MESSAGES)
+    )
+    return messages.tolist()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Build a reference id index or check a sheet's Ids against it.")
+    parser.add_argument("command", choices=["build", "check"])
+    parser.add_argument("reference", help="Reference file (landmarks_api_*.csv, mongoexport _id dump) or index directory.")
+    parser.add_argument("excel_file", nargs="?", help="Sheet to check, for 'check'.")
+    parser.add_argument("--index-dir", help="Index directory (default: <reference>.idindex).")
+    parser.add_argument("--column", help="Id column of a reference CSV.")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        index = build_reference_id_index(args.reference, args.index_dir or f"{args.reference}.idindex", args.column)
+        print(f"{len(index)} ids indexed.")
+    else:
+        index = get_reference_id_index(args.reference, args.index_dir, args.column)
+        errors, _ = check_object_ids(load_excel_data(args.excel_file), index)
+        for message in format_id_errors(errors):
+            print(message)
+        print(f"{len(errors)} errors.")
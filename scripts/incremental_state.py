@@ -0,0 +1,180 @@
+import hashlib
+import json
+import os
+import sqlite3
+from contextlib import closing
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_float_dtype
+
+from pipeline_context import get_pipeline_context
+
+FINGERPRINT_ALGORITHM = "pandas-siphash-v3"
+
+def _normalized_strings(values):
+    """
+    The values as strings; whole floats (integers read with missing cells) lose their ".0".
+    Missing values stay None, which `hash_pandas_object` hashes apart from any text (e.g. "None").
+    """
+    strings = values.astype(str).astype(object).where(values.notna(), None)
+    if is_float_dtype(values):
+        whole = ((values % 1 == 0) & (values.abs() < 2 ** 63)).fillna(False).to_numpy(dtype=bool)
+        strings[whole] = values[whole].astype(np.int64).astype(str)
+    return strings
+
+def _mapping_hash_key(context):
+    """The 16-character hash key of the mapping, so that editing the mapping changes every fingerprint."""
+    return hashlib.sha256(json.dumps(context.mapping_data, sort_keys=True).encode()).hexdigest()[:16]
+
+def compute_row_fingerprints(df, mapping_data, id_column="Id"):
+    """
+    Computes a 64-bit content hash per row over the mapped columns.
+
+    Values are normalized to strings first so the hash does not depend on the
+    dtype pandas inferred for a column (e.g. PostalCode read as int in one
+    month, as float with a missing cell in the next and as text after that).
+    The mapping is part of the hash key, so a changed mapping re-emits every
+    row. Hashing is vectorized with `pd.util.hash_pandas_object`.
+
+    Parameters:
+        - df (pd.DataFrame): The Excel data.
+        - mapping_data (dict, str or PipelineContext): The mapping, used to select the hashed columns.
+        - id_column (str): The column holding the document Id.
+
+    Returns:
+        - pd.DataFrame: Columns `Id` and `fingerprint` (int64), indexed like `df`.
+    """
+    context = get_pipeline_context(mapping_data)
+    columns = [column for column in context.mapping_columns if column in df.columns and column != id_column]
+
+    normalized = pd.DataFrame({column: _normalized_strings(df[column]) for column in columns}, index=df.index)
+    hashes = pd.util.hash_pandas_object(normalized, index=False, hash_key=_mapping_hash_key(context)).to_numpy()
+
+    return pd.DataFrame({
+        "Id": df[id_column].astype(str).to_numpy(),
+        "fingerprint": hashes.view(np.int64),
+    }, index=df.index)
+
+def _connect(state_path):
+    connection = sqlite3.connect(state_path)
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS fingerprints ("
+        "source TEXT NOT NULL, id TEXT NOT NULL, fingerprint INTEGER NOT NULL, "
+        "PRIMARY KEY (source, id))"
+    )
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS builds ("
+        "source TEXT PRIMARY KEY, algorithm TEXT NOT NULL, built_at TEXT NOT NULL)"
+    )
+    return connection
+
+def load_fingerprints(state_path, source):
+    """
+    Loads the fingerprints stored by the last successful build of `source`.
+
+    Returns an empty table when there is no state yet or when it was written
+    with a different fingerprint algorithm (forcing a full rebuild).
+
+    Parameters:
+        - state_path (str): Path to the SQLite state file.
+        - source (str): Name of the import source (e.g. the Excel file and sheet).
+
+    Returns:
+        - pd.DataFrame: Columns `Id` and `fingerprint`.
+    """
+    empty = pd.DataFrame({"Id": pd.Series(dtype=object), "fingerprint": pd.Series(dtype=np.int64)})
+    if not os.path.exists(state_path):
+        return empty
+
+    with closing(_connect(state_path)) as connection:
+        build = connection.execute("SELECT algorithm FROM builds WHERE source = ?", (source,)).fetchone()
+        if build is None or build[0] != FINGERPRINT_ALGORITHM:
+            return empty
+        return pd.read_sql_query(
+            "SELECT id AS Id, fingerprint FROM fingerprints WHERE source = ?",
+            connection, params=(source,), dtype={"fingerprint": np.int64},
+        )
+
+def diff_fingerprints(current, previous):
+    """
+    Compares the current fingerprints with the previous build.
+
+    Parameters:
+        - current (pd.DataFrame): Result of `compute_row_fingerprints`.
+        - previous (pd.DataFrame): Result of `load_fingerprints`.
+
+    Returns:
+        - dict: `new` and `changed` (boolean masks aligned with `current`),
+          `unchanged_count`, and `deleted` (list of Ids present in the previous
+          build but no longer in the sheet).
+    """
+    previous_fingerprints = previous.drop_duplicates("Id", keep="last").set_index("Id")["fingerprint"]
+    matched = current["Id"].map(previous_fingerprints)
+
+    is_new = matched.isna()
+    is_changed = ~is_new & (matched != current["fingerprint"])
+    deleted = previous_fingerprints.index.difference(pd.Index(current["Id"].unique()))
+
+    return {
+        "new": is_new,
+        "changed": is_changed,
+        "unchanged_count": int((~is_new & ~is_changed).sum()),
+        "deleted": deleted.tolist(),
+    }
+
+def select_changed_rows(df, state_path, source, mapping_data, id_column="Id"):
+    """
+    Keeps only the rows that are new or changed since the last successful build.
+
+    Parameters:
+        - df (pd.DataFrame): The Excel data.
+        - state_path (str): Path to the SQLite state file.
+        - source (str): Name of the import source.
+        - mapping_data (dict, str or PipelineContext): The mapping data.
+        - id_column (str): The column holding the document Id.
+
+    Returns:
+        - tuple: (DataFrame of new/changed rows, diff from `diff_fingerprints`,
+          fingerprints of every row for `save_fingerprints`)
+    """
+    fingerprints = compute_row_fingerprints(df, mapping_data, id_column)
+    diff = diff_fingerprints(fingerprints, load_fingerprints(state_path, source))
+    return df[diff["new"] | diff["changed"]], diff, fingerprints
+
+def save_fingerprints(state_path, source, fingerprints, deleted_ids=(), full_build=False):
+    """
+    Records a successful build.
+
+    Upserts the given fingerprints and removes the tombstoned Ids. With
+    `full_build=True` every stored fingerprint of the source is replaced.
+
+    Parameters:
+        - state_path (str): Path to the SQLite state file.
+        - source (str): Name of the import source.
+        - fingerprints (pd.DataFrame): Fingerprints of the rows that were emitted.
+        - deleted_ids (list): Ids reported as deleted.
+        - full_build (bool): Replace the whole state of the source.
+    """
+    rows = fingerprints.drop_duplicates("Id", keep="last")
+    with closing(_connect(state_path)) as connection, connection:
+        build = connection.execute("SELECT algorithm FROM builds WHERE source = ?", (source,)).fetchone()
+        if full_build or build is None or build[0] != FINGERPRINT_ALGORITHM:
+            connection.execute("DELETE FROM fingerprints WHERE source = ?", (source,))
+        connection.executemany(
+            "DELETE FROM fingerprints WHERE source = ? AND id = ?",
+            ((source, deleted_id) for deleted_id in deleted_ids),
+        )
+        connection.executemany(
+            "INSERT OR REPLACE INTO fingerprints (source, id, fingerprint) VALUES (?, ?, ?)",
+            zip([source] * len(rows), rows["Id"].tolist(), rows["fingerprint"].tolist()),
+        )
+        connection.execute(
+            "INSERT OR REPLACE INTO builds (source, algorithm, built_at) VALUES (?, ?, datetime('now'))",
+            (source, FINGERPRINT_ALGORITHM),
+        )
+
+def save_tombstones(deleted_ids, output_file_path):
+    """Writes the Ids deleted since the last build as a JSON array."""
+    with open(output_file_path, 'w') as file:
+        json.dump(list(deleted_ids), file, indent=4)
@@ -1,27 +1,47 @@
 
+import argparse
+import itertools
+import os
 import pandas as pd
+import pickle
 import logging
 import sys
+import tempfile
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 from file_manager import (
-    validate_excel_file_path,
-    validate_mapping_file,
-    validate_schema_file,
-    load_mapping_file,
+    check_excel_file_path,
     load_excel_data,
-    save_output_array_to_js_file,
-    load_template_file,
-    save_processed_data_to_template,
+    load_excel_data_in_chunks,
+    probe_excel_header,
 )
+from pipeline_context import load_pipeline_context
+from incremental_state import select_changed_rows, save_fingerprints, save_tombstones
+from mongodb_loader import (
+    DEFAULT_BATCH_SIZE,
+    get_document_field_types,
+    get_document_paths,
+    get_mongo_client,
+    load_documents_to_mongodb,
+)
+from type_coercion import compact_dataframe, coerce_dataframe_types, format_coercion_errors, resolve_target_types
+from geo_enrichment import DEFAULT_LAT_COLUMN, DEFAULT_LON_COLUMN, enrich_locations, load_neighborhood_index
+from error_policy import DEFAULT_ERROR_POLICY, DEFAULT_MAX_ERRORS, ERROR_POLICIES, apply_error_policy, check_error_rate
+from run_report import PROFILERS, RunReport, count_errors_by_rule, log_run_report, save_run_report
+from reconciliation import load_reference_extract, reconcile_with_reference, summarize_reconciliation
+from id_index import check_object_ids, format_id_errors, get_reference_id_index
+from pipelined_io import DEFAULT_QUEUE_SIZE, log_pipeline_timings, run_pipelined
+from pipeline_dag import DEFAULT_MAX_WORKERS, PipelineGraph, compute_run_key, same_rows
+from output_writer import COMPRESSION_EXTENSIONS, OUTPUT_EXTENSIONS, OUTPUT_FORMATS, write_documents
 from data_validation import (
-    cast_dataframe_to_expected_types,
+    format_validation_errors,
     validate_excel_data_types_with_df,
-    validate_excel_data_values_with_df,
-    handle_validation_errors,
+    validate_excel_data_values_table,
+    validate_excel_file_header,
+    validate_document_fields_against_graphql_schema,
     process_excel_data_with_mapping,
 )
 
@@ -30,41 +50,712 @@ MAPPING_FILE_PATH = "attration.json"
 TEMPLATE_PATH = "display-array.template"
 SCHEMA_FILE_PATH = "Attraction.ql"
 OUTPUT_JS_PATH = "output_array.js"
+RUN_REPORT_PATH = "run_report.json"
+REJECTS_PATH = "output_array.rejects.csv"
+RECONCILIATION_PATH = "output_array.reconciliation.csv"
+DEFAULT_CHUNK_SIZE = 10000
+
+# Options of the whole-file pipeline that streaming mode does not support
+STREAMING_UNSUPPORTED_OPTIONS = ("state_file", "checkpoint_dir", "reference_path")
+
+# Stage names used in the run report
+PIPELINE_STAGES = (
+    "load_context", "inspect_excel_file", "check_schema_fields", "load_excel_data", "select_changed_rows", "enrich_locations",
+    "compact_frame", "validate_values",
+    "check_ids", "apply_error_policy", "validate_types", "coerce_types", "process_documents", "reconcile",
+    "save_output",
+    "save_state", "load_mongodb",
+)
+
+def main(stream=False, chunk_size=DEFAULT_CHUNK_SIZE, mongodb_uri=None, database_name=None,
+         collection_name="attractions", batch_size=DEFAULT_BATCH_SIZE, state_file=None, state_source=None,
+         output_format="js", compression=None, use_orjson=False, timestamp_output=False,
+         report_path=None, profile_stage=None, profiler="cprofile", trace_memory=False,
+         error_policy=DEFAULT_ERROR_POLICY, max_error_rate=None, max_errors=DEFAULT_MAX_ERRORS,
+         rejects_path=REJECTS_PATH, geojson_path=None, lat_column=DEFAULT_LAT_COLUMN,
+         lon_column=DEFAULT_LON_COLUMN, checkpoint_dir=None, max_workers=DEFAULT_MAX_WORKERS, reference_path=None,
+         reconciliation_path=RECONCILIATION_PATH, pipelined=False, queue_size=DEFAULT_QUEUE_SIZE, compact=False,
+         check_ids=False, reference_ids_path=None, delta=False):
+    """
+    Runs the import workflow.
+
+    Parameters:
+        - stream (bool): Process the Excel data in chunks of `chunk_size` rows
+          instead of loading the whole file. Produces the same output file.
+          `state_file`, `checkpoint_dir` and `reference_path` are not available in this mode.
+        - chunk_size (int): Number of rows per chunk in streaming mode.
+        - mongodb_uri (str): When given, the processed documents are also upserted into MongoDB
+          (chunk by chunk in streaming mode).
+        - database_name (str): Target database. Defaults to the database in `mongodb_uri`.
+        - collection_name (str): Target collection.
+        - batch_size (int): Number of upserts per MongoDB bulk write.
+        - delta (bool): Compare the documents with the stored ones and only write the fields that
+          differ (`$set`/`$unset`); unchanged documents are skipped.
+        - state_file (str): Incremental mode: SQLite file with the fingerprints of the last
+          successful build. Only new or changed rows are processed and the deleted Ids are
+          written next to the output as `<output>.deleted.json`.
+        - state_source (str): Name of the import in the state file. Defaults to the Excel file name.
+        - output_format (str): Output file format, one of `output_writer.OUTPUT_FORMATS`.
+        - compression (str): Compress the output file with "gzip" or "zstd".
+        - use_orjson (bool): Serialize the output with orjson.
+        - timestamp_output (bool): End the output file name in `mm-dd-yyyy.hh.mm.ss`.
+        - report_path (str): Where to write the JSON run report (Build ID, stage timings, memory, error counts).
+          The report is only returned and logged when not given.
+        - profile_stage (str): Capture a profile of this stage, one of `PIPELINE_STAGES`.
+        - profiler (str): "cprofile" or "pyinstrument".
+        - trace_memory (bool): Record tracemalloc allocations per stage.
+        - error_policy (str): What to do with rows failing value validation, one of
+          `error_policy.ERROR_POLICIES` (fail-fast, quarantine or threshold).
+        - max_error_rate (float): Highest accepted percentage of rows with errors for the threshold policy.
+        - max_errors (int): Number of errors after which a fail-fast run stops validating.
+        - rejects_path (str): CSV file receiving the rejected rows and their reasons (quarantine/threshold).
+        - geojson_path (str): Neighborhood polygons (e.g. `nycneighborhoods.geojson`). When given, missing
+          Neighborhood/BoroughCode values are filled from the coordinates in `lat_column`/`lon_column`.
+        - lat_column (str): Column holding the latitude.
+        - lon_column (str): Column holding the longitude.
+        - checkpoint_dir (str): Save the loaded, quarantined and coerced frames as Parquet in this
+          directory, so a rerun after a failure resumes from the last of them.
+        - max_workers (int): Number of independent stages run concurrently.
+        - reference_path (str): Reference extract (e.g. `landmarks_api_*.csv`) the rows are reconciled
+          with before the output is written.
+        - reconciliation_path (str): CSV file receiving the new/updated/conflicting/duplicate status of each row.
+        - pipelined (bool): Streaming mode with parsing, validation, transform and writes overlapped in
+          worker threads (implies `stream`). Their work and wait times are added to the run report.
+        - queue_size (int): Chunks waiting between two pipelined stages.
+        - compact (bool): Keep the frame in compact dtypes (categories, Arrow strings, 12-byte
+          ObjectIds). Its size before and after is added to the `memory` section of the report.
+        - check_ids (bool): Reject the rows whose Id repeats an earlier row (also across chunks).
+        - reference_ids_path (str): Also reject the rows whose Id is not in this reference id set: a
+          `landmarks_api_*.csv` export, a mongoexport `_id` dump or an index directory of `id_index.py`.
+          The index is built next to the file on first use. Implies `check_ids`.
+
+    Returns:
+        - dict: The run report.
+
+    Raises:
+        - ValueError: If an option of `STREAMING_UNSUPPORTED_OPTIONS` is given in streaming mode.
+    """
+    if stream or pipelined:
+        options = {"state_file": state_file, "checkpoint_dir": checkpoint_dir, "reference_path": reference_path}
+        unsupported = [name for name in STREAMING_UNSUPPORTED_OPTIONS if options[name]]
+        if unsupported:
+            raise ValueError(f"Not available in streaming mode: {', '.join(unsupported)}.")
 
-def main():
+    output_options = {"output_format": output_format, "compression": compression,
+                      "use_orjson": use_orjson, "timestamp": timestamp_output}
+    error_options = {"policy": error_policy, "max_error_rate": max_error_rate, "rejects_path": rejects_path,
+                     "max_errors": max_errors}
+    geo_options = {"geojson_path": geojson_path, "lat_column": lat_column, "lon_column": lon_column}
+    reconcile_options = {"reference_path": reference_path, "reconciliation_path": reconciliation_path}
+    id_options = {"check_ids": check_ids or bool(reference_ids_path), "reference_ids_path": reference_ids_path}
+    report = RunReport(profile_stage=profile_stage, profiler=profiler, trace_memory=trace_memory)
+    logger.info(f"Build {report.build_id} started at {report.started_at.isoformat()}")
 
-    # 1. Validate the Necessary file paths
-    validate_excel_file_path(EXCEL_FILE_PATH)
-    validate_mapping_file(MAPPING_FILE_PATH)
-    validate_schema_file(SCHEMA_FILE_PATH)
+    status, error = "failed", None
+    try:
+        if stream or pipelined:
+            mongo_options = {"mongodb_uri": mongodb_uri, "database_name": database_name,
+                             "collection_name": collection_name, "batch_size": batch_size, "delta": delta}
+            run_streaming_pipeline(chunk_size, report=report, error_options=error_options, geo_options=geo_options,
+                                   pipelined=pipelined, queue_size=queue_size, mongo_options=mongo_options,
+                                   compact=compact, id_options=id_options, **output_options)
+        else:
+            run_pipeline(report, mongodb_uri, database_name, collection_name, batch_size, state_file, state_source,
+                         delta=delta, error_options=error_options, geo_options=geo_options, checkpoint_dir=checkpoint_dir,
+                         max_workers=max_workers, reconcile_options=reconcile_options, compact=compact,
+                         id_options=id_options, **output_options)
+        status = "ok"
+    except BaseException as e:
+        error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        run_report = report.finish(status, error)
+        if report_path:
+            save_run_report(run_report, report_path)
+        log_run_report(run_report)
+    return run_report
+
+def run_pipeline(report, mongodb_uri=None, database_name=None, collection_name="attractions",
+                 batch_size=DEFAULT_BATCH_SIZE, state_file=None, state_source=None, error_options=None,
+                 geo_options=None, checkpoint_dir=None, max_workers=DEFAULT_MAX_WORKERS, reconcile_options=None,
+                 compact=False, id_options=None, delta=False, **output_options):
+    """
+    Runs the workflow on the whole Excel file as a stage graph, timing each step in `report`.
+
+    With `checkpoint_dir`, a failed run resumes from its last checkpointed
+    stage; the checkpoints are removed once the run succeeds. See `main` for
+    the other parameters.
+    """
+    graph = build_pipeline_graph(report, mongodb_uri, database_name, collection_name, batch_size, state_file,
+                                 state_source, error_options, geo_options, checkpoint_dir, max_workers,
+                                 reconcile_options, compact, id_options, delta, **output_options)
+    targets = ["save_output"] + [name for name in ("save_state", "load_mongodb") if name in graph.stages]
+    results = graph.run(*targets)
+    graph.clear_checkpoints()
+    return results["save_output"]
+
+def build_pipeline_graph(report, mongodb_uri=None, database_name=None, collection_name="attractions",
+                         batch_size=DEFAULT_BATCH_SIZE, state_file=None, state_source=None, error_options=None,
+                         geo_options=None, checkpoint_dir=None, max_workers=DEFAULT_MAX_WORKERS,
+                         reconcile_options=None, compact=False, id_options=None, delta=False, **output_options):
+    """
+    Declares the workflow steps as a `PipelineGraph`.
+
+    The header check and the schema check, and the value and type
+    validations, do not depend on each other and run concurrently. The
+    loaded, quarantined and coerced frames are checkpointed.
+
+    Returns:
+        - PipelineGraph: The graph; run `save_output` (and `save_state`/`load_mongodb` when declared).
+    """
+    error_options = error_options or {}
+    geo_options = geo_options or {}
+    reconcile_options = reconcile_options or {}
+    id_options = id_options or {}
+    state_source = state_source or os.path.basename(EXCEL_FILE_PATH)
+    run_key = compute_run_key(
+        [EXCEL_FILE_PATH, MAPPING_FILE_PATH, SCHEMA_FILE_PATH, TEMPLATE_PATH, state_file,
+         geo_options.get("geojson_path"), id_options.get("reference_ids_path")],
+        {"error_options": error_options, "geo_options": geo_options, "state_source": state_source,
+         "compact": compact, "id_options": id_options})
+    graph = PipelineGraph(report, checkpoint_dir, run_key, max_workers)
+    incremental = {}
+
+    # 1. Validate the Necessary file paths and parse the mapping, schema and template once
+    def load_context():
+        check_excel_file_path(EXCEL_FILE_PATH)
+        return load_pipeline_context(MAPPING_FILE_PATH, SCHEMA_FILE_PATH, TEMPLATE_PATH)
+    graph.add_stage("load_context", load_context)
+
+    # 1a. Display the Excel file information and validate its header row; check the document fields in the schema
+    graph.add_stage("inspect_excel_file",
+                    lambda context: inspect_excel_file(EXCEL_FILE_PATH, context, get_coordinate_columns(geo_options)),
+                    ["load_context"])
+    graph.add_stage("check_schema_fields", check_schema_fields, ["load_context"])
 
     # 2. Load the Excel data
-    df = load_excel_data(EXCEL_FILE_PATH)
+    graph.add_stage("load_excel_data", lambda: load_excel_data(EXCEL_FILE_PATH), after=["inspect_excel_file"],
+                    checkpoint=True)
+    frame = "load_excel_data"
+
+    # 2a. Incremental mode: keep only the rows that changed since the last build
+    if state_file:
+        def select_rows(df, context):
+            df, incremental["diff"], incremental["fingerprints"] = select_changed_rows(df, state_file, state_source,
+                                                                                       context)
+            diff = incremental["diff"]
+            logger.info(f"Incremental build: {int(diff['new'].sum())} new, {int(diff['changed'].sum())} changed, "
+                        f"{diff['unchanged_count']} unchanged, {len(diff['deleted'])} deleted")
+            return df
+        graph.add_stage("select_changed_rows", select_rows, [frame, "load_context"])
+        frame = "select_changed_rows"
+
+    # 2b. Optionally fill the neighborhood and borough from the coordinates
+    if geo_options.get("geojson_path"):
+        def enrich(df, context):
+            neighborhood_index = load_neighborhood_index(geo_options["geojson_path"])
+            return enrich_dataframe_locations(df, neighborhood_index, context, geo_options)
+        graph.add_stage("enrich_locations", enrich, [frame, "load_context"])
+        frame = "enrich_locations"
+
+    # 2c. Optionally convert the frame to compact dtypes before it is validated
+    if compact:
+        graph.add_stage("compact_frame", lambda df, context: compact_frame(df, context, report),
+                        [frame, "load_context"])
+        frame = "compact_frame"
 
     # 3. Validate data values based on allowed values, patterns etc.
-    data_value_validation_results = validate_excel_data_values_with_df(df, MAPPING_FILE_PATH)
+    def validate_values(df, context):
+        value_errors = validate_excel_data_values_table(df, context.validation_rules,
+                                                        get_validation_error_limit(error_options))
+        report.add_errors("values", count_errors_by_rule(value_errors))
+        return value_errors, format_validation_errors(value_errors, context.validation_rules)
+    graph.add_stage("validate_values", validate_values, [frame, "load_context"], rows_out=same_rows)
 
-    # 4. Handle the validation errors
-    df = handle_validation_errors(df, data_value_validation_results)
+    # 4. Validate the Excel data types (independent of the value validation)
+    def validate_types(df, context):
+        data_type_validation_results = validate_excel_data_types_with_df(df, context)
+        report.add_errors("types", {"dtype": len(data_type_validation_results)} if data_type_validation_results
+                          else {})
+        return data_type_validation_results
+    graph.add_stage("validate_types", validate_types, [frame, "load_context"], rows_out=same_rows)
 
-    # 5. Validate the Excel data types
-    data_type_validation_results = validate_excel_data_types_with_df(df, MAPPING_FILE_PATH)
+    # 4a. Optionally check that the Ids are unique and exist in the reference id set
+    validations = ["validate_values"]
+    if id_options.get("check_ids"):
+        def check_ids(df):
+            reference_index = load_reference_ids(id_options.get("reference_ids_path"))
+            id_errors, id_messages, _ = check_sheet_ids(df, report, reference_index)
+            return id_errors, id_messages
+        graph.add_stage("check_ids", check_ids, [frame], rows_out=same_rows)
+        validations.append("check_ids")
 
-    # 6. Cast to the Correct Data Type
-    df = cast_dataframe_to_expected_types(df, MAPPING_FILE_PATH)
+    # 5. Handle the validation errors with the error policy (no prompt)
+    graph.add_stage("apply_error_policy",
+                    lambda df, *validation: handle_errors_with_policy(df, *merge_validation_errors(*validation),
+                                                                      error_options),
+                    [frame, *validations], after=["validate_types"], checkpoint=True)
+
+    # 6. Cast to the Correct Data Type (mapping and schema types); cells that cannot be converted become missing
+    def coerce_types(df, context):
+        df, coercion_errors = coerce_dataframe_types(df, resolve_target_types(context), compact=compact)
+        report.add_errors("coercion", count_errors_by_rule(coercion_errors, "type"))
+        log_coercion_errors(coercion_errors)
+        return df
+    graph.add_stage("coerce_types", coerce_types, ["apply_error_policy", "load_context"], checkpoint=True)
 
     # 7. Process the Excel data with the mapping
-    processed_data = process_excel_data_with_mapping(df, load_mapping_file(MAPPING_FILE_PATH))
+    graph.add_stage("process_documents", process_excel_data_with_mapping, ["coerce_types", "load_context"])
 
-    # 8. Save the processed data to the template
-    save_processed_data_to_template(processed_data, load_template_file(TEMPLATE_PATH), OUTPUT_JS_PATH)
+    # 7a. Optionally reconcile the rows with a reference extract before the documents are written
+    output_after = ["check_schema_fields"]
+    if reconcile_options.get("reference_path"):
+        graph.add_stage("reconcile", lambda df: reconcile_rows(df, report, **reconcile_options), ["coerce_types"],
+                        rows_out=same_rows)
+        output_after.append("reconcile")
 
-    # 9. Save the output array to a .js file
-    save_output_array_to_js_file(processed_data, OUTPUT_JS_PATH)
+    # 8-9. Save the processed data with the template in a single pass
+    graph.add_stage("save_output", lambda documents, context: save_output(documents, context, **output_options),
+                    ["process_documents", "load_context"], after=output_after,
+                    rows_out=lambda output, rows_in: output["documents"])
 
-if __name__ == "__main__":
-    main()
+    # 9a. Incremental mode: record the build and the tombstones
+    if state_file:
+        def save_state(df, output):
+            save_tombstones(incremental["diff"]["deleted"], f"{output['path']}.deleted.json")
+            save_fingerprints(state_file, state_source, incremental["fingerprints"].loc[df.index],
+                              incremental["diff"]["deleted"])
+        graph.add_stage("save_state", save_state, ["coerce_types", "save_output"], after=["select_changed_rows"])
+
+    # 10. Optionally upsert the documents into MongoDB
+    if mongodb_uri:
+        def load_mongodb(documents, context, header):
+            client = get_mongo_client(mongodb_uri)
+            database = client[database_name] if database_name else client.get_default_database()
+            stats = load_documents_to_mongodb(documents, database[collection_name], context, batch_size=batch_size,
+                                              delta=delta, paths=get_document_paths(context, header["columns"]))
+            logger.info(f"MongoDB load: {stats}")
+            return stats
+        graph.add_stage("load_mongodb", load_mongodb, ["process_documents", "load_context", "inspect_excel_file"],
+                        rows_out=lambda stats, rows_in: stats["documents"])
+
+    return graph
+
+def get_coordinate_columns(geo_options):
+    """Returns the latitude and longitude columns read by the geocoding enrichment, or () without a GeoJSON file."""
+    if not geo_options or not geo_options.get("geojson_path"):
+        return ()
+    return (geo_options.get("lat_column", DEFAULT_LAT_COLUMN), geo_options.get("lon_column", DEFAULT_LON_COLUMN))
+
+def inspect_excel_file(excel_path, context, ignored_columns=()):
+    """
+    Workflow steps "Display Excel File Information" and "Excel File Validation".
+
+    Only the header row and the sheet dimensions are read, so a file with the
+    wrong columns is rejected before its data is parsed. `ignored_columns`
+    (the coordinates of the geocoding enrichment) need not be in the mapping.
+
+    Raises:
+        - ValueError: If the header does not match the mapping.
+    """
+    header = probe_excel_header(excel_path)
+    rows = f", {header['row_count']} rows" if header["row_count"] is not None else ""
+    logger.info(f"Excel file: {excel_path} (sheet {header['sheet']}{rows})")
+    for column in header["columns"]:
+        logger.info(f"  {column} -> {context.column_to_document_field.get(column, '(not mapped)')}")
+
+    errors = validate_excel_file_header(header["columns"], context, ignored_columns)
+    for error in errors:
+        logger.error(f"❌ {error}")
+    if errors:
+        raise ValueError(f"Excel file '{excel_path}' failed header validation: {' '.join(errors)}")
+    logger.info("✅ Excel columns validated against the mapping file.")
+    return header
+
+def check_schema_fields(context):
+    """Warns about the document fields of the mapping that are not in the GraphQL schema."""
+    if context.schema_contents is None:
+        return {}
+    results = validate_document_fields_against_graphql_schema(context, context)
+    for document_field, result in results.items():
+        if result != "Valid":
+            logger.warning(f"⚠️ {document_field}: {result}")
+    return results
+
+def get_validation_error_limit(error_options):
+    """Fail-fast runs stop validating after `max_errors` errors; the other policies need every error."""
+    if error_options.get("policy", DEFAULT_ERROR_POLICY) == "fail-fast":
+        return error_options.get("max_errors")
+    return None
+
+def handle_errors_with_policy(df, error_table, messages, error_options, append=False):
+    """Workflow step "Handle the validation errors": logs the errors and applies the error policy."""
+    for message in messages:
+        logger.error(f"❌ {message}")
+    df, summary = apply_error_policy(df, error_table, error_options.get("policy", DEFAULT_ERROR_POLICY),
+                                     error_options.get("max_error_rate"), error_options.get("rejects_path"),
+                                     messages, append=append)
+    if summary["errors"]:
+        logger.info(f"Error policy {summary['policy']}: {summary['rejected_rows']} of {summary['rows']} rows "
+                    f"rejected ({summary['error_rate']:.2f}%)")
+    return df
+
+def merge_validation_errors(*validations):
+    """Concatenates (error table, messages) pairs, e.g. of the value validation and the Id checks."""
+    tables = [table for table, _ in validations if not table.empty]
+    error_table = pd.concat(tables, ignore_index=True) if tables else validations[0][0]
+    return error_table, [message for _, messages in validations for message in messages]
+
+def load_reference_ids(reference_ids_path):
+    """Opens (building it on first use) the id index of `reference_ids_path`, or returns None without one."""
+    if not reference_ids_path:
+        return None
+    reference_index = get_reference_id_index(reference_ids_path)
+    logger.info(f"Reference ids: {len(reference_index)} ids from {reference_ids_path}")
+    return reference_index
 
+def check_sheet_ids(df, report, reference_index=None, seen=None):
+    """
+    Checks the Id column for duplicates (and against `reference_index`) and counts the errors in the report.
 
+    Returns:
+        - tuple: (error table, messages, ids seen so far for the next chunk)
+    """
+    id_errors, seen = check_object_ids(df, reference_index, seen=seen)
+    report.add_errors("ids", count_errors_by_rule(id_errors))
+    return id_errors, format_id_errors(id_errors), seen
 
+def enrich_dataframe_locations(df, neighborhood_index, context, geo_options):
+    """Fills Neighborhood/BoroughCode from the neighborhood polygons and logs how many rows matched."""
+    df, matched = enrich_locations(df, neighborhood_index, context, geo_options.get("lat_column", DEFAULT_LAT_COLUMN),
+                                   geo_options.get("lon_column", DEFAULT_LON_COLUMN))
+    logger.info(f"Geocoding enrichment: {matched} of {len(df)} rows matched a neighborhood")
+    return df
 
+def compact_frame(df, context, report):
+    """Converts the frame to compact dtypes and adds its size before and after to the `memory` section of the report."""
+    frame_bytes = int(df.memory_usage(deep=True).sum())
+    df, dtypes = compact_dataframe(df, context)
+    compact_bytes = int(df.memory_usage(deep=True).sum())
+    report.memory["frame_bytes"] = report.memory.get("frame_bytes", 0) + frame_bytes
+    report.memory["compact_frame_bytes"] = report.memory.get("compact_frame_bytes", 0) + compact_bytes
+    report.memory["dtypes"] = {**report.memory.get("dtypes", {}), **dtypes}
+    logger.info(f"Compact dtypes: {frame_bytes / 1e6:.1f} MB -> {compact_bytes / 1e6:.1f} MB ({len(dtypes)} columns)")
+    return df
+
+def reconcile_rows(df, report, reference_path, reconciliation_path=RECONCILIATION_PATH):
+    """
+    Reconciles the rows with a reference extract, writes the status of each row
+    to `reconciliation_path` and counts the conflicting and duplicate rows in the report.
+    """
+    reconciliation = reconcile_with_reference(df, load_reference_extract(reference_path))
+    summary = summarize_reconciliation(reconciliation)
+    if reconciliation_path:
+        reconciliation.to_csv(reconciliation_path, index=False)
+    report.add_errors("reconciliation", {status: summary[status] for status in ("conflicting", "duplicate")
+                                         if summary[status]})
+    logger.info(f"Reconciliation with {reference_path}: {summary}")
+    for message in reconciliation.loc[reconciliation["status"].isin(["conflicting", "duplicate"]), "detail"]:
+        logger.warning(f"⚠️ {message}")
+    return reconciliation
+
+def log_coercion_errors(coercion_errors):
+    """Logs the cells `coerce_dataframe_types` could not convert."""
+    for error in format_coercion_errors(coercion_errors):
+        logger.warning(f"⚠️ {error}")
+
+def save_output(documents, context, output_format="js", compression=None, use_orjson=False, timestamp=False):
+    """
+    Workflow step "Output Results": writes the documents to `OUTPUT_JS_PATH`
+    (with the extension of `output_format`) in one streaming pass.
+
+    Returns:
+        - dict: The `path` of the written file and the number of `documents`.
+    """
+    output_path = os.path.splitext(OUTPUT_JS_PATH)[0] + OUTPUT_EXTENSIONS[output_format]
+    output = write_documents(documents, output_path, output_format, template_content=context.template_content,
+                             compression=compression, use_orjson=use_orjson,
+                             field_types=get_document_field_types(context), timestamp=timestamp)
+    logger.info(f"✅ Saved {output['documents']} documents to {output['path']}")
+    return output
+
+def run_streaming_pipeline(chunk_size=DEFAULT_CHUNK_SIZE, report=None, error_options=None, geo_options=None,
+                           pipelined=False, queue_size=DEFAULT_QUEUE_SIZE, mongo_options=None, compact=False,
+                           id_options=None, **output_options):
+    """
+    Runs steps 3-7 of the workflow chunk by chunk and streams the documents
+    into the output file, so peak memory depends on `chunk_size` and not on
+    the size of the Excel file.
+
+    With `pipelined`, parsing, validation, the transform and the MongoDB load
+    each run in their own thread: chunk N+1 is parsed while chunk N is
+    validated and chunk N-1 is written. The work and wait times of each
+    thread are recorded in the `pipeline` section of the report.
+
+    The per-chunk stages run while the output is written, so their times are
+    also part of the `save_output` stage of the report.
+
+    A chunk failing validation stops the run without touching the previous
+    output file (see `write_documents`). With an error policy that can stop
+    the run on a later chunk (fail-fast, threshold), the documents are spooled
+    to a temporary file and upserted into MongoDB only once every chunk
+    passed; with quarantine each chunk is upserted as soon as it is built.
+
+    The threshold policy applies to the whole run: each chunk is quarantined
+    and the error rate of all the rows is checked after the last chunk, before
+    the output file is replaced and the spooled documents are upserted.
+
+    Parameters:
+        - chunk_size (int): Number of rows per chunk.
+        - report (RunReport): Records the stage timings. A new one is created if not given.
+        - error_options (dict): `policy`, `max_error_rate`, `max_errors` and `rejects_path`, see `main`.
+        - geo_options (dict): `geojson_path`, `lat_column` and `lon_column`, see `main`.
+        - pipelined (bool): Overlap parsing, validation and writing in worker threads.
+        - queue_size (int): Chunks waiting between two pipelined stages.
+        - mongo_options (dict): `mongodb_uri`, `database_name`, `collection_name`, `batch_size` and
+          `delta`; when given, each chunk is also upserted into MongoDB.
+        - compact (bool): Convert each chunk to compact dtypes, see `main`.
+        - id_options (dict): `check_ids` and `reference_ids_path`, see `main`. Duplicates are
+          found across chunks: the Ids of earlier chunks are kept as sorted 12-byte values.
+        - output_options: Keyword arguments of `save_output`.
+    """
+    report = report or RunReport()
+    error_options = error_options or {}
+    geo_options = geo_options or {}
+    mongo_options = mongo_options or {}
+    id_options = id_options or {}
+
+    # 1. Validate the Necessary file paths (without reading the Excel data)
+    with report.stage("load_context"):
+        check_excel_file_path(EXCEL_FILE_PATH)
+        context = load_pipeline_context(MAPPING_FILE_PATH, SCHEMA_FILE_PATH, TEMPLATE_PATH)
+    with report.stage("inspect_excel_file"):
+        header = inspect_excel_file(EXCEL_FILE_PATH, context, get_coordinate_columns(geo_options))
+    with report.stage("check_schema_fields"):
+        check_schema_fields(context)
+    rules = context.validation_rules
+    target_types = resolve_target_types(context)
+    neighborhood_index = load_neighborhood_index(geo_options["geojson_path"]) if geo_options.get("geojson_path") else None
+    reference_index = load_reference_ids(id_options.get("reference_ids_path"))
+    id_state = {"seen": None}
+    threshold = error_options.get("policy", DEFAULT_ERROR_POLICY) == "threshold"
+    if threshold and error_options.get("max_error_rate") is None:
+        raise ValueError("The threshold error policy needs a maximum error rate.")
+    chunk_error_options = {**error_options, "policy": "quarantine"} if threshold else error_options
+    totals = {"rows": 0, "rejected_rows": 0, "first_error": None}
+
+    def read_chunks():
+        # 2. Load the Excel data one chunk at a time
+        chunks = load_excel_data_in_chunks(EXCEL_FILE_PATH, chunk_size)
+        while True:
+            with report.stage("load_excel_data") as stage:
+                chunk = next(chunks, None)
+                stage["rows_out"] = 0 if chunk is None else len(chunk)
+            if chunk is None:
+                return
+            yield chunk
+
+    def validate_chunk(indexed_chunk):
+        chunk_index, chunk = indexed_chunk
+
+        # 2b. Optionally fill the neighborhood and borough from the coordinates
+        if neighborhood_index is not None:
+            with report.stage("enrich_locations", rows_in=len(chunk)) as stage:
+                chunk = enrich_dataframe_locations(chunk, neighborhood_index, context, geo_options)
+                stage["rows_out"] = len(chunk)
+
+        # 2c. Optionally convert the chunk to compact dtypes
+        if compact:
+            with report.stage("compact_frame", rows_in=len(chunk)) as stage:
+                chunk = compact_frame(chunk, context, report)
+                stage["rows_out"] = len(chunk)
+
+        # 3. Validate data values based on allowed values, patterns etc.
+        with report.stage("validate_values", rows_in=len(chunk)) as stage:
+            errors = validate_excel_data_values_table(chunk, rules, get_validation_error_limit(error_options))
+            stage["rows_out"] = len(chunk)
+        report.add_errors("values", count_errors_by_rule(errors))
+        validations = [(errors, format_validation_errors(errors, rules))]
+
+        # 3a. Optionally check that the Ids are unique (across chunks) and exist in the reference id set
+        if id_options.get("check_ids"):
+            with report.stage("check_ids", rows_in=len(chunk)) as stage:
+                id_errors, id_messages, id_state["seen"] = check_sheet_ids(chunk, report, reference_index,
+                                                                           id_state["seen"])
+                stage["rows_out"] = len(chunk)
+            validations.append((id_errors, id_messages))
+
+        # 4. Handle the validation errors with the error policy (rejects of later chunks are appended)
+        with report.stage("apply_error_policy", rows_in=len(chunk)) as stage:
+            error_table, messages = merge_validation_errors(*validations)
+            rows = len(chunk)
+            chunk = handle_errors_with_policy(chunk, error_table, messages, chunk_error_options,
+                                              append=chunk_index > 0)
+            stage["rows_out"] = len(chunk)
+        totals["rows"] += rows
+        totals["rejected_rows"] += rows - len(chunk)
+        totals["first_error"] = totals["first_error"] or (messages[0] if messages else None)
+
+        # 5. Validate the Excel data types
+        with report.stage("validate_types", rows_in=len(chunk)) as stage:
+            type_errors = validate_excel_data_types_with_df(chunk, context)
+            stage["rows_out"] = len(chunk)
+        report.add_errors("types", {"dtype": len(type_errors)} if type_errors else {})
+
+        # 6. Cast to the Correct Data Type
+        with report.stage("coerce_types", rows_in=len(chunk)) as stage:
+            chunk, coercion_errors = coerce_dataframe_types(chunk, target_types, compact=compact)
+            stage["rows_out"] = len(chunk)
+        report.add_errors("coercion", count_errors_by_rule(coercion_errors, "type"))
+        log_coercion_errors(coercion_errors)
+        return chunk
+
+    def transform_chunk(chunk):
+        # 7. Process the Excel data with the mapping
+        with report.stage("process_documents", rows_in=len(chunk)) as stage:
+            documents = process_excel_data_with_mapping(chunk, context)
+            stage["rows_out"] = len(documents)
+        return documents
+
+    stages = [("validate", validate_chunk), ("transform", transform_chunk)]
+
+    # 10. Optionally upsert each chunk into MongoDB before it is written to the file (or spool it, see above)
+    spool = None
+    if mongo_options.get("mongodb_uri"):
+        client = get_mongo_client(mongo_options["mongodb_uri"])
+        database_name = mongo_options.get("database_name")
+        database = client[database_name] if database_name else client.get_default_database()
+        collection = database[mongo_options.get("collection_name", "attractions")]
+        paths = get_document_paths(context, header["columns"])
+
+        def load_to_mongodb(documents):
+            with report.stage("load_mongodb", rows_in=len(documents)) as stage:
+                stats = load_documents_to_mongodb(documents, collection, context,
+                                                  batch_size=mongo_options.get("batch_size", DEFAULT_BATCH_SIZE),
+                                                  delta=mongo_options.get("delta", False), paths=paths)
+                stage["rows_out"] = stats["documents"]
+
+        if error_options.get("policy", DEFAULT_ERROR_POLICY) == "quarantine":
+            def load_chunk_to_mongodb(documents):
+                load_to_mongodb(documents)
+                return documents
+        else:
+            spool = tempfile.TemporaryFile()
+
+            def load_chunk_to_mongodb(documents):
+                pickle.dump(documents, spool)
+                return documents
+        stages.append(("load_mongodb", load_chunk_to_mongodb))
+
+    if pipelined:
+        document_chunks = run_pipelined(enumerate(read_chunks()), stages, queue_size, report.pipeline,
+                                        source_name="parse", sink_name="write")
+    else:
+        def run_stages(item):
+            for _, func in stages:
+                item = func(item)
+            return item
+        document_chunks = map(run_stages, enumerate(read_chunks()))
+
+    def documents():
+        yield from itertools.chain.from_iterable(document_chunks)
+        if threshold:
+            # 4a. Every chunk was validated: check the error rate of the whole run
+            error_rate = check_error_rate(totals["rejected_rows"], totals["rows"], error_options["max_error_rate"],
+                                          totals["first_error"])
+            logger.info(f"Error policy threshold: {totals['rejected_rows']} of {totals['rows']} rows rejected "
+                        f"({error_rate:.2f}%)")
+
+    # 8-9. Save the processed data with the template in a single pass
+    try:
+        with report.stage("save_output") as stage:
+            output = save_output(documents(), context, **output_options)
+            stage["rows_out"] = output["documents"]
+        if pipelined:
+            log_pipeline_timings(report.pipeline)
+
+        # 10a. Every chunk passed: upsert the spooled documents
+        if spool is not None:
+            spool.seek(0)
+            while True:
+                try:
+                    documents = pickle.load(spool)
+                except EOFError:
+                    break
+                load_to_mongodb(documents)
+    finally:
+        if spool is not None:
+            spool.close()
+    return output
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import an Excel file according to the mapping file.")
+    parser.add_argument("--stream", action="store_true",
+                        help="Process the Excel file in chunks with bounded memory.")
+    parser.add_argument("--pipelined", action="store_true",
+                        help="Stream the Excel file with parsing, validation and writes overlapped in threads.")
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE,
+                        help="Chunks waiting between two pipelined stages.")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="Number of rows per chunk in streaming mode.")
+    parser.add_argument("--mongodb-uri", help="Also upsert the processed documents into this MongoDB instance.")
+    parser.add_argument("--database", help="Target database (defaults to the one in the connection string).")
+    parser.add_argument("--collection", default="attractions", help="Target collection.")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="Number of upserts per MongoDB bulk write.")
+    parser.add_argument("--delta", action="store_true",
+                        help="Only write the fields that differ from the stored documents ($set/$unset).")
+    parser.add_argument("--state-file",
+                        help="Incremental mode: only process rows that changed since the build recorded in this file "
+                             "(not with --stream).")
+    parser.add_argument("--state-source", help="Name of the import in the state file (default: Excel file name).")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="js",
+                        help="Output format: js (template wrapper), json array, ndjson or extjson (mongoimport).")
+    parser.add_argument("--compression", choices=list(COMPRESSION_EXTENSIONS), help="Compress the output file.")
+    parser.add_argument("--orjson", action="store_true", help="Serialize the output with orjson.")
+    parser.add_argument("--timestamp", action="store_true",
+                        help="End the output file name in the run's mm-dd-yyyy.hh.mm.ss timestamp.")
+    parser.add_argument("--report", nargs="?", const=RUN_REPORT_PATH,
+                        help="Write the JSON run report (Build ID, stage timings, memory, error counts) to this file "
+                             f"({RUN_REPORT_PATH} if no file is named).")
+    parser.add_argument("--profile-stage", choices=PIPELINE_STAGES, help="Capture a profile of one stage.")
+    parser.add_argument("--profiler", choices=PROFILERS, default="cprofile", help="Profiler for --profile-stage.")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="Record tracemalloc allocations per stage (slower).")
+    parser.add_argument("--error-policy", choices=ERROR_POLICIES, default=DEFAULT_ERROR_POLICY,
+                        help="fail-fast: stop on errors; quarantine: drop rows with errors into the rejects file; "
+                             "threshold: quarantine unless more than --max-error-rate percent of the rows fail.")
+    parser.add_argument("--max-error-rate", type=float, help="Highest accepted error rate in percent (threshold).")
+    parser.add_argument("--max-errors", type=int, default=DEFAULT_MAX_ERRORS,
+                        help="Stop validating after this many errors (fail-fast).")
+    parser.add_argument("--rejects-file", default=REJECTS_PATH, help="CSV file for the rejected rows and reasons.")
+    parser.add_argument("--geojson", help="Fill missing neighborhoods and borough codes from these GeoJSON polygons.")
+    parser.add_argument("--lat-column", default=DEFAULT_LAT_COLUMN, help="Latitude column for --geojson.")
+    parser.add_argument("--lon-column", default=DEFAULT_LON_COLUMN, help="Longitude column for --geojson.")
+    parser.add_argument("--checkpoint-dir",
+                        help="Checkpoint intermediate frames here so a failed run resumes where it stopped (not with --stream).")
+    parser.add_argument("--reference-csv",
+                        help="Reconcile the rows with this reference extract (e.g. landmarks_api_*.csv, not with --stream).")
+    parser.add_argument("--reconciliation-file", default=RECONCILIATION_PATH,
+                        help="CSV file for the reconciliation status of each row.")
+    parser.add_argument("--compact", action="store_true",
+                        help="Keep the data in compact dtypes (categories, Arrow strings, packed ObjectIds).")
+    parser.add_argument("--check-ids", action="store_true", help="Reject rows whose Id repeats an earlier row.")
+    parser.add_argument("--reference-ids",
+                        help="Also reject rows whose Id is not in this reference id set (landmarks_api_*.csv, "
+                             "mongoexport _id dump or id index directory).")
+    parser.add_argument("--workers", type=int, default=DEFAULT_MAX_WORKERS,
+                        help="Number of independent stages run concurrently.")
+    args = parser.parse_args()
+    main(stream=args.stream, chunk_size=args.chunk_size, mongodb_uri=args.mongodb_uri,
+         database_name=args.database, collection_name=args.collection, batch_size=args.batch_size,
+         state_file=args.state_file, state_source=args.state_source, output_format=args.format,
+         compression=args.compression, use_orjson=args.orjson, timestamp_output=args.timestamp,
+         report_path=args.report, profile_stage=args.profile_stage, profiler=args.profiler,
+         trace_memory=args.trace_memory, error_policy=args.error_policy, max_error_rate=args.max_error_rate,
+         max_errors=args.max_errors, rejects_path=args.rejects_file, geojson_path=args.geojson,
+         lat_column=args.lat_column, lon_column=args.lon_column, checkpoint_dir=args.checkpoint_dir,
+         max_workers=args.workers, reference_path=args.reference_csv,
+         reconciliation_path=args.reconciliation_file, pipelined=args.pipelined, queue_size=args.queue_size,
+         compact=args.compact, check_ids=args.check_ids, reference_ids_path=args.reference_ids,
+         delta=args.delta)
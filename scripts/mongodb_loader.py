@@ -0,0 +1,352 @@
+import json
+import queue
+import threading
+import time
+from collections import Counter
+from datetime import date, datetime, timezone
+
+import pandas as pd
+from bson.int64 import Int64
+from bson.objectid import ObjectId
+from pymongo import MongoClient, UpdateOne
+
+from data_validation import build_transform_plan
+from pipeline_context import get_pipeline_context
+from type_coercion import to_long
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_QUEUE_SIZE = 4
+DEFAULT_MAX_POOL_SIZE = 10
+
+# One pooled client per connection string, shared by every load in the process.
+_CLIENTS = {}
+_CLIENTS_LOCK = threading.Lock()
+
+def load_mongodb_uri(secret_file_path):
+    """Reads the MongoDB connection string from a JSON secret file (`{"connection_string": ...}`)."""
+    with open(secret_file_path, 'r') as file:
+        return json.load(file)['connection_string']
+
+def get_mongo_client(mongodb_uri, max_pool_size=DEFAULT_MAX_POOL_SIZE):
+    """
+    Returns a pooled `MongoClient` for the connection string, creating it on first use.
+
+    Parameters:
+        - mongodb_uri (str): MongoDB connection string.
+        - max_pool_size (int): Maximum number of pooled connections.
+
+    Returns:
+        - MongoClient: The shared client.
+    """
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(mongodb_uri)
+        if client is None:
+            client = MongoClient(mongodb_uri, maxPoolSize=max_pool_size)
+            _CLIENTS[mongodb_uri] = client
+        return client
+
+def close_mongo_clients():
+    """Closes every pooled client."""
+    with _CLIENTS_LOCK:
+        for client in _CLIENTS.values():
+            client.close()
+        _CLIENTS.clear()
+
+def get_document_field_types(mapping_data):
+    """
+    Returns the mapping `type` of every `documentField` (e.g. `loc.bbl` -> `long`).
+
+    Parameters:
+        - mapping_data (dict or PipelineContext): The mapping data.
+    """
+    context = get_pipeline_context(mapping_data)
+    return {
+        context.column_to_document_field[column]: dtype
+        for column, dtype in context.column_to_dtype.items()
+        if column in context.column_to_document_field
+    }
+
+def get_document_paths(mapping_data, columns=None):
+    """
+    Returns the dotted `documentField` paths written for a sheet, in mapping order.
+
+    Parameters:
+        - mapping_data (dict or PipelineContext): The mapping data.
+        - columns (list): Columns of the sheet; the fields whose source column is
+          missing are left out. Every mapped field is returned when not given.
+    """
+    context = get_pipeline_context(mapping_data)
+    if columns is None:
+        columns = [config["dependency"]["fieldName"] if "dependency" in config else config["column"]
+                   for config in context.mapping_data.values()]
+    return [".".join(step["path"]) for step in build_transform_plan(columns, context.mapping_data)]
+
+def _to_bson_date(value):
+    if isinstance(value, dict) and "$date" in value:
+        value = value["$date"]
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    if isinstance(value, date) and not isinstance(value, datetime):
+        return datetime(value.year, value.month, value.day)
+    if isinstance(value, str):
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return value
+
+def _to_bson_long(value):
+    return Int64(to_long(value))
+
+_BSON_CONVERTERS = {
+    "date": _to_bson_date,
+    "datetime": _to_bson_date,
+    "long": _to_bson_long,
+}
+
+def flatten_document(document, prefix=""):
+    """Flattens a nested document into dotted paths, e.g. {"loc": {"city": x}} -> {"loc.city": x}."""
+    flat = {}
+    for key, value in document.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict) and value and not any(sub_key.startswith("$") for sub_key in value):
+            flat.update(flatten_document(value, f"{path}."))
+        else:
+            flat[path] = value
+    return flat
+
+def convert_document_fields(document, field_types):
+    """
+    Flattens one processed document into its `_id` ObjectId and its dotted
+    fields, with `date`/`long` fields converted to BSON dates and 64-bit integers.
+
+    Returns:
+        - tuple: (ObjectId, dict of dotted path -> value)
+    """
+    fields = flatten_document(document)
+    object_id = ObjectId(fields.pop("id"))
+
+    for path, value in fields.items():
+        converter = _BSON_CONVERTERS.get(field_types.get(path))
+        if converter is None or isinstance(value, dict):
+            if converter:
+                fields[path] = converter(value)
+        elif value is None or value == "" or pd.isna(value):
+            fields[path] = None
+        else:
+            fields[path] = converter(value)
+
+    return object_id, fields
+
+def build_upsert_operation(document, field_types):
+    """
+    Converts one processed document into an `UpdateOne` upsert.
+
+    `id` becomes the `_id` ObjectId and `date`/`long` fields are converted to
+    BSON dates and 64-bit integers. Fields are written with `$set` on dotted
+    paths so existing sub-documents are updated in place.
+
+    Parameters:
+        - document (dict): A document from `process_excel_data_with_mapping`.
+        - field_types (dict): Result of `get_document_field_types`.
+
+    Returns:
+        - UpdateOne: The upsert operation.
+    """
+    object_id, fields = convert_document_fields(document, field_types)
+    return UpdateOne({"_id": object_id}, {"$set": fields}, upsert=True)
+
+_MISSING = object()
+
+def _get_path(document, path):
+    """Value at a dotted path of a stored document, `_MISSING` if a key is absent."""
+    value = document
+    for key in path.split("."):
+        if not isinstance(value, dict) or key not in value:
+            return _MISSING
+        value = value[key]
+    return value
+
+def _stored_datetime(value):
+    """A datetime as MongoDB returns it: naive UTC with millisecond precision."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.replace(microsecond=value.microsecond // 1000 * 1000)
+
+def _same_value(value, stored):
+    if isinstance(value, datetime) and isinstance(stored, datetime):
+        return _stored_datetime(value) == _stored_datetime(stored)
+    # Compare the types too: 1, 1.0 and True are equal in Python but not the same BSON value
+    return type(value) is type(stored) and value == stored
+
+def diff_document_fields(fields, stored, paths):
+    """
+    Compares the converted fields of a document with the stored document.
+
+    Parameters:
+        - fields (dict): Dotted path -> value, from `convert_document_fields`.
+        - stored (dict): The stored document (nested), or None if it does not exist yet.
+        - paths (list): Paths owned by the import; those absent from `fields`
+          but present in `stored` are unset.
+
+    Returns:
+        - tuple: (dict of the paths to `$set`, list of the paths to `$unset`)
+    """
+    if stored is None:
+        return fields, []
+    changed = {path: value for path, value in fields.items() if not _same_value(value, _get_path(stored, path))}
+    unset = [path for path in paths if path not in fields and _get_path(stored, path) is not _MISSING]
+    return changed, unset
+
+def build_delta_operations(converted, collection, paths):
+    """
+    Builds the minimal updates of one batch against the stored documents.
+
+    The stored documents are fetched with one `$in` query on their `_id`
+    projected on `paths` and the converted fields; documents that did not
+    change get no operation at all. When an `_id` appears several times in
+    the batch, its last document is the one compared and written.
+
+    Parameters:
+        - converted (list): (ObjectId, fields) pairs from `convert_document_fields`.
+        - collection (Collection): The pymongo (or mongomock) collection.
+        - paths (list): Dotted `documentField` paths owned by the import, see `get_document_paths`.
+
+    Returns:
+        - tuple: (list of `UpdateOne`, Counter of the changed paths, number of unchanged documents)
+    """
+    latest = dict(converted)
+    projection = dict.fromkeys(paths, 1)
+    for fields in latest.values():
+        projection.update(dict.fromkeys(fields, 1))
+    stored = {document["_id"]: document
+              for document in collection.find({"_id": {"$in": list(latest)}}, projection)}
+
+    operations, changed_fields, unchanged = [], Counter(), 0
+    for object_id, fields in latest.items():
+        changed, unset = diff_document_fields(fields, stored.get(object_id), paths)
+        if not changed and not unset:
+            unchanged += 1
+            continue
+        update = {}
+        if changed:
+            update["$set"] = changed
+        if unset:
+            update["$unset"] = dict.fromkeys(unset, "")
+        operations.append(UpdateOne({"_id": object_id}, update, upsert=True))
+        changed_fields.update([*changed, *unset])
+    return operations, changed_fields, unchanged
+
+def load_documents_to_mongodb(documents, collection, mapping_data, batch_size=DEFAULT_BATCH_SIZE,
+                              queue_size=DEFAULT_QUEUE_SIZE, delta=False, paths=None):
+    """
+    Upserts processed documents into a MongoDB collection with unordered `bulk_write` batches.
+
+    Documents are converted and batched on the calling thread while a writer
+    thread sends the batches; at most `queue_size` batches wait between the
+    two, so a slow server throttles the transform instead of buffering the
+    whole import in memory.
+
+    With `delta`, each batch is compared with the stored documents first (see
+    `build_delta_operations`): only the fields that differ are written with
+    `$set`/`$unset` and unchanged documents are skipped, so a repeated import
+    of the same sheet writes nothing. The comparison runs on the writer thread
+    right before the batch is sent, after the earlier batches were written, so
+    an `_id` repeated in a later batch is compared with its latest version.
+
+    Parameters:
+        - documents (iterable): Documents from `process_excel_data_with_mapping` (a list or a generator).
+        - collection (Collection): Target pymongo (or mongomock) collection.
+        - mapping_data (dict or PipelineContext): The mapping data, used for the BSON type conversions.
+        - batch_size (int): Number of operations per `bulk_write`.
+        - queue_size (int): Maximum number of batches waiting for the writer.
+        - delta (bool): Only write the fields that differ from the stored documents.
+        - paths (list): Delta mode: the `documentField` paths owned by the import, unset
+          when a document no longer has them. Defaults to every mapped field
+          (`get_document_paths`); pass the paths of the sheet's columns so the
+          fields of missing columns are kept.
+
+    Returns:
+        - dict: Counters for the load: `documents`, `batches`, `matched`, `modified`,
+          `upserted`, `elapsed_seconds`, `documents_per_second`,
+          `mean_batch_latency_seconds` and `max_batch_latency_seconds`. In delta mode
+          also `unchanged` (documents skipped) and `changed_fields` (path -> number
+          of documents where it was set or unset).
+    """
+    field_types = get_document_field_types(mapping_data)
+    if delta and paths is None:
+        paths = get_document_paths(mapping_data)
+    batches = queue.Queue(maxsize=queue_size)
+    stats = {
+        "documents": 0,
+        "batches": 0,
+        "matched": 0,
+        "modified": 0,
+        "upserted": 0,
+        "batch_latencies": [],
+    }
+    if delta:
+        stats["unchanged"] = 0
+        stats["changed_fields"] = Counter()
+    failures = []
+
+    def send(batch):
+        batches.put(batch)
+
+    def writer():
+        while True:
+            batch = batches.get()
+            if batch is None:
+                return
+            if failures:
+                continue  # Drain the queue so the producer is never blocked
+            try:
+                if delta:
+                    batch, changed_fields, unchanged = build_delta_operations(batch, collection, paths)
+                    stats["unchanged"] += unchanged
+                    stats["changed_fields"].update(changed_fields)
+                    if not batch:
+                        continue
+                started = time.perf_counter()
+                result = collection.bulk_write(batch, ordered=False)
+                stats["batch_latencies"].append(time.perf_counter() - started)
+            except Exception as e:
+                failures.append(e)
+                continue
+            stats["batches"] += 1
+            stats["matched"] += result.matched_count
+            stats["modified"] += result.modified_count
+            stats["upserted"] += result.upserted_count
+
+    started = time.perf_counter()
+    writer_thread = threading.Thread(target=writer, name="mongodb-bulk-writer", daemon=True)
+    writer_thread.start()
+
+    try:
+        batch = []
+        for document in documents:
+            if failures:
+                break
+            if delta:
+                batch.append(convert_document_fields(document, field_types))
+            else:
+                batch.append(build_upsert_operation(document, field_types))
+            stats["documents"] += 1
+            if len(batch) >= batch_size:
+                send(batch)
+                batch = []
+        if batch and not failures:
+            send(batch)
+    finally:
+        batches.put(None)
+        writer_thread.join()
+
+    if failures:
+        raise failures[0]
+
+    elapsed = time.perf_counter() - started
+    latencies = stats.pop("batch_latencies")
+    stats["elapsed_seconds"] = elapsed
+    stats["documents_per_second"] = stats["documents"] / elapsed if elapsed else 0.0
+    stats["mean_batch_latency_seconds"] = sum(latencies) / len(latencies) if latencies else 0.0
+    stats["max_batch_latency_seconds"] = max(latencies, default=0.0)
+    if delta:
+        stats["changed_fields"] = dict(stats["changed_fields"])
+    return stats
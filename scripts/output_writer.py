@@ -0,0 +1,205 @@
+import gzip
+import json
+import os
+import re
+from datetime import date, datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from type_coercion import to_long
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - the writer falls back to the json module
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - zstd compression is optional
+    zstandard = None
+
+OUTPUT_FORMATS = ("js", "json", "ndjson", "extjson")
+OUTPUT_EXTENSIONS = {"js": ".js", "json": ".json", "ndjson": ".ndjson", "extjson": ".json"}
+COMPRESSION_EXTENSIONS = {"gzip": ".gz", "zstd": ".zst"}
+
+# Wrapper of the .js output when no template is given
+DEFAULT_JS_TEMPLATE = "data = [\n{{data}}\n];"
+
+TIMESTAMP_FORMAT = "%m-%d-%Y.%H.%M.%S"
+
+_OBJECT_ID_PATTERN = re.compile(r"^[0-9a-fA-F]{24}$")
+
+def json_default(value):
+    """Serializes the values `json`/`orjson` do not handle natively (Timestamps, numpy scalars, NaT)."""
+    if value is pd.NaT:
+        return None
+    if isinstance(value, (pd.Timestamp, datetime, date)):
+        return value.isoformat()
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return None if np.isnan(value) else float(value)
+    if isinstance(value, np.bool_):
+        return bool(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def get_serializer(use_orjson=False):
+    """
+    Returns a function serializing one document to UTF-8 bytes.
+
+    Parameters:
+        - use_orjson (bool): Serialize with orjson instead of the json module.
+
+    Raises:
+        - ImportError: If `use_orjson` is set and orjson is not installed.
+    """
+    if use_orjson:
+        if orjson is None:
+            raise ImportError("orjson is not installed (pip install orjson).")
+        return lambda document: orjson.dumps(document, default=json_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    return lambda document: json.dumps(document, default=json_default).encode("utf-8")
+
+def _to_extended_value(value, field_type):
+    if value is None or value is pd.NaT or (isinstance(value, float) and np.isnan(value)):
+        return None
+    if field_type in ("date", "datetime"):
+        if isinstance(value, str):
+            value = pd.Timestamp(value)
+        if isinstance(value, date) and not isinstance(value, datetime):
+            value = datetime(value.year, value.month, value.day)
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        return {"$date": value.strftime("%Y-%m-%dT%H:%M:%S.") + f"{value.microsecond // 1000:03d}Z"}
+    if field_type == "long":
+        return {"$numberLong": str(to_long(value))}
+    return value
+
+def to_extended_json(document, field_types, prefix=""):
+    """
+    Converts a processed document to MongoDB Extended JSON: `$oid`, `$numberLong`
+    and `$date` as an ISO-8601 UTC string (the relaxed form of `$date`, read by `mongoimport`).
+
+    The top-level `id` becomes the `_id` ObjectId when it is a 24-digit hex
+    string, as in `mongodb_loader.build_upsert_operation`.
+
+    Parameters:
+        - document (dict): A document from `process_excel_data_with_mapping`.
+        - field_types (dict): `documentField` -> mapping type (see `mongodb_loader.get_document_field_types`).
+
+    Returns:
+        - dict: The document as accepted by `mongoimport`.
+    """
+    converted = {}
+    for key, value in document.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            converted[key] = to_extended_json(value, field_types, f"{path}.")
+        else:
+            converted[key] = _to_extended_value(value, field_types.get(path))
+
+    if not prefix and "id" in converted:
+        object_id = converted.pop("id")
+        if isinstance(object_id, str) and _OBJECT_ID_PATTERN.match(object_id):
+            object_id = {"$oid": object_id}
+        converted = {"_id": object_id, **converted}
+    return converted
+
+def timestamped_output_path(output_file_path, timestamp=None):
+    """
+    Inserts the `mm-dd-yyyy.hh.mm.ss` timestamp before the extension,
+    e.g. `output_array.js` -> `output_array.10-18-2026.14.03.22.js`.
+
+    Parameters:
+        - output_file_path (str): The output path.
+        - timestamp (datetime): The time to use. Defaults to now.
+    """
+    base, extension = os.path.splitext(output_file_path)
+    return f"{base}.{(timestamp or datetime.now()).strftime(TIMESTAMP_FORMAT)}{extension}"
+
+def _open_output_file(output_file_path, compression):
+    if compression is None:
+        return open(output_file_path, 'wb')
+    if compression == "gzip":
+        return gzip.open(output_file_path, 'wb')
+    if compression == "zstd":
+        if zstandard is None:
+            raise ImportError("zstandard is not installed (pip install zstandard).")
+        return zstandard.ZstdCompressor().stream_writer(open(output_file_path, 'wb'), closefd=True)
+    raise ValueError(f"Unsupported compression '{compression}'. Expected one of {list(COMPRESSION_EXTENSIONS)}.")
+
+def _split_template(template_content):
+    template_string = json.loads(template_content)["template"] if template_content else DEFAULT_JS_TEMPLATE
+    if "{{data}}" not in template_string:
+        raise ValueError("The output template has no {{data}} placeholder.")
+    return template_string.split("{{data}}", 1)
+
+def write_documents(documents, output_file_path, output_format="js", template_content=None, compression=None,
+                    use_orjson=False, field_types=None, timestamp=False):
+    """
+    Writes the processed documents to the output file in a single streaming pass.
+
+    Documents are serialized and written one at a time, so memory does not
+    grow with the number of documents and `documents` may be a generator.
+    They are written to `<path>.tmp`, which replaces the output file only once
+    every document was written: if `documents` raises (e.g. a later chunk fails
+    validation), the previous output file is left untouched.
+
+    Formats:
+        - js: the documents inside the `display-array.template` wrapper (`let data = [ ... ];`).
+        - json: a JSON array.
+        - ndjson: one document per line.
+        - extjson: one MongoDB Extended JSON document per line, for `mongoimport`.
+
+    Parameters:
+        - documents (iterable): Documents from `process_excel_data_with_mapping` (a list or a generator).
+        - output_file_path (str): The output path. The compression extension is appended if missing.
+        - output_format (str): One of `OUTPUT_FORMATS`.
+        - template_content (str): Content of the output template, for the js format.
+        - compression (str): None, "gzip" or "zstd".
+        - use_orjson (bool): Serialize with orjson.
+        - field_types (dict): `documentField` -> mapping type, for the extjson format.
+        - timestamp (bool): Insert the `mm-dd-yyyy.hh.mm.ss` timestamp in the file name.
+
+    Returns:
+        - dict: `path` of the written file and the number of `documents`.
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unsupported output format '{output_format}'. Expected one of {list(OUTPUT_FORMATS)}.")
+
+    if timestamp:
+        output_file_path = timestamped_output_path(output_file_path)
+    compression_extension = COMPRESSION_EXTENSIONS.get(compression, "")
+    if compression_extension and not output_file_path.endswith(compression_extension):
+        output_file_path += compression_extension
+
+    serialize = get_serializer(use_orjson)
+    if output_format == "js":
+        prefix, suffix = (part.encode("utf-8") for part in _split_template(template_content))
+        separator = b",\n"
+    elif output_format == "json":
+        prefix, suffix, separator = b"[\n", b"\n]\n", b",\n"
+    else:
+        prefix, suffix, separator = b"", b"\n", b"\n"
+
+    count = 0
+    temp_path = f"{output_file_path}.tmp"
+    try:
+        with _open_output_file(temp_path, compression) as file:
+            file.write(prefix)
+            for document in documents:
+                if output_format == "extjson":
+                    document = to_extended_json(document, field_types or {})
+                if count:
+                    file.write(separator)
+                file.write(serialize(document))
+                count += 1
+            if count or output_format in ("js", "json"):
+                file.write(suffix)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    os.replace(temp_path, output_file_path)
+
+    return {"path": output_file_path, "documents": count}
@@ -0,0 +1,193 @@
+import os
+import re
+
+from file_manager import (
+    get_rules_file_path,
+    load_cross_validation_rules,
+    validate_mapping_file,
+    load_schema_file,
+    load_template_file,
+)
+from schema_index import get_schema_index
+from cross_validation import compile_cross_validation_rules
+
+# Process-wide cache of parsed contexts, keyed by the absolute file paths.
+# Each entry keeps the (mtime, size) stamps of the files it was built from.
+_CONTEXT_CACHE = {}
+
+def compile_validation_rules(mapping_data, cross_validation=()):
+    """
+    Compiles the `validation` blocks of the mapping into column-level rules.
+
+    Each rule is resolved once (nested `length.min/max` folded into
+    minLength/maxLength, patterns precompiled) so the checks can be applied to
+    a whole column at a time instead of cell by cell. The cross-field rules
+    follow the column rules (see `cross_validation.compile_cross_validation_rules`).
+
+    Parameters:
+        - mapping_data (dict): The mapping data.
+        - cross_validation (list): The `crossValidation` entries of the mapping's rules file.
+
+    Returns:
+        - list: List of rule dictionaries with the keys `column`, `rule`,
+          `allowNull` and `params`, in mapping order.
+    """
+    rules = []
+    for column, mapping_value in mapping_data.items():
+        validation_rules = mapping_value.get('validation')
+        if not validation_rules:
+            continue
+
+        length_rules = validation_rules.get('length', {})
+        is_required = bool(validation_rules.get('isRequired', mapping_value.get('isRequired', False)))
+        allow_null = validation_rules.get('allowNull', not is_required)
+
+        def add_rule(rule, params=None):
+            rules.append({
+                "column": column,
+                "rule": rule,
+                "allowNull": allow_null,
+                "params": params,
+            })
+
+        if is_required:
+            add_rule("isRequired")
+        elif allow_null is False:
+            add_rule("allowNull")
+
+        allowed_values = validation_rules.get('allowedValues', [])
+        if allowed_values:
+            add_rule("allowedValues", list(allowed_values))
+
+        min_length = validation_rules.get('minLength', length_rules.get('min'))
+        if min_length:
+            add_rule("minLength", min_length)
+
+        max_length = validation_rules.get('maxLength', length_rules.get('max'))
+        if max_length:
+            add_rule("maxLength", max_length)
+
+        pattern = validation_rules.get('pattern')
+        if pattern:
+            add_rule("pattern", re.compile(pattern))
+
+    rules.extend(compile_cross_validation_rules(cross_validation, mapping_data))
+    return rules
+
+class PipelineContext:
+    """
+    Parsed mapping, schema and template for one import, with the lookups the
+    validation and transform steps derive from them.
+
+    Attributes:
+        - mapping_data (dict): The mapping data.
+        - cross_validation (list): The `crossValidation` rules of the mapping's rules file.
+        - schema_contents (str): Content of the GraphQL schema, if loaded.
+        - template_content (str): Content of the output template, if loaded.
+        - column_to_document_field (dict): Excel column -> `documentField`.
+        - column_to_dtype (dict): Excel column -> mapping `type`.
+        - compiled_patterns (dict): Excel column -> compiled validation pattern.
+        - dependency_tables (dict): Excel column -> (source column, value mapping).
+        - required_columns (set): Excel columns flagged `isRequired`.
+        - validation_rules (list): Rules from `compile_validation_rules`.
+        - schema_index (dict): Parsed schema from `build_schema_index`, built on first use.
+    """
+
+    def __init__(self, mapping_data, schema_contents=None, template_content=None, cross_validation=None):
+        self.cross_validation = list(cross_validation or [])
+        self.mapping_data = mapping_data
+        self.schema_contents = schema_contents
+        self.template_content = template_content
+
+        self.column_to_document_field = {}
+        self.column_to_dtype = {}
+        self.compiled_patterns = {}
+        self.dependency_tables = {}
+        self.required_columns = set()
+
+        for field, config in self.mapping_data.items():
+            column = config.get("column", field)
+            if "documentField" in config:
+                self.column_to_document_field[column] = config["documentField"]
+            if "type" in config:
+                self.column_to_dtype[column] = config["type"]
+            if config.get("isRequired"):
+                self.required_columns.add(column)
+            if "dependency" in config:
+                self.dependency_tables[column] = (
+                    config["dependency"]["fieldName"],
+                    config["dependency"]["mapping"],
+                )
+
+        self.validation_rules = compile_validation_rules(mapping_data, self.cross_validation)
+        for rule in self.validation_rules:
+            if rule["rule"] == "pattern":
+                self.compiled_patterns[rule["column"]] = rule["params"]
+
+    @property
+    def mapping_columns(self):
+        """List of the Excel columns defined in the mapping."""
+        return list(self.mapping_data.keys())
+
+    @property
+    def schema_index(self):
+        """Index of the GraphQL schema fields, or None when no schema was loaded."""
+        if self.schema_contents is None:
+            return None
+        return get_schema_index(self.schema_contents)
+
+def _file_stamp(file_path):
+    if file_path is None or not os.path.exists(file_path):
+        return None
+    stat = os.stat(file_path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+def load_pipeline_context(mapping_file_path, schema_file_path=None, template_path=None):
+    """
+    Loads the mapping with its rules file (and optionally the schema and
+    template) into a `PipelineContext`.
+
+    The files are validated and parsed once per process: a second call with the
+    same paths returns the cached context as long as none of the files changed
+    (by modification time and size).
+
+    Parameters:
+        - mapping_file_path (str): Path to the mapping JSON file.
+        - schema_file_path (str): Path to the GraphQL schema file.
+        - template_path (str): Path to the output template file.
+
+    Returns:
+        - PipelineContext: The parsed context.
+    """
+    paths = tuple(os.path.abspath(path) if path else None
+                  for path in (mapping_file_path, schema_file_path, template_path))
+    stamps = tuple(_file_stamp(path) for path in (*paths, get_rules_file_path(paths[0])))
+
+    cached = _CONTEXT_CACHE.get(paths)
+    if cached and cached[0] == stamps:
+        return cached[1]
+
+    context = PipelineContext(
+        validate_mapping_file(mapping_file_path),
+        schema_contents=load_schema_file(schema_file_path) if schema_file_path else None,
+        template_content=load_template_file(template_path) if template_path else None,
+        cross_validation=load_cross_validation_rules(mapping_file_path),
+    )
+    _CONTEXT_CACHE[paths] = (stamps, context)
+    return context
+
+def get_pipeline_context(source):
+    """
+    Returns a `PipelineContext` for a context, a mapping dictionary or a mapping file path.
+
+    Lets the validation and transform helpers accept any of the three.
+    """
+    if isinstance(source, PipelineContext):
+        return source
+    if isinstance(source, dict):
+        return PipelineContext(source)
+    return load_pipeline_context(source)
+
+def clear_pipeline_context_cache():
+    """Drops every cached context."""
+    _CONTEXT_CACHE.clear()
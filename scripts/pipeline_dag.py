@@ -0,0 +1,275 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+
+import pandas as pd
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover - checkpoints fall back to pickle files
+    pyarrow = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 4
+MANIFEST_FILE = "manifest.json"
+
+def compute_run_key(paths, options=None):
+    """
+    Builds the key identifying the inputs of a run, so checkpoints of another run are not reused.
+
+    Parameters:
+        - paths (list): Input files (missing files and None are allowed); their size and
+          modification time are part of the key.
+        - options (dict): JSON-serializable options that change the stage results.
+
+    Returns:
+        - str: A SHA-256 hex digest.
+    """
+    stamps = []
+    for path in paths:
+        if path and os.path.exists(path):
+            stat = os.stat(path)
+            stamps.append([os.path.abspath(path), stat.st_size, stat.st_mtime_ns])
+        else:
+            stamps.append([path, None, None])
+    payload = json.dumps({"files": stamps, "options": options or {}}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def _count_rows(value):
+    return len(value) if isinstance(value, (pd.DataFrame, list)) else None
+
+def count_rows(result, rows_in):
+    """Default `rows_out` of a stage: the length of a DataFrame or list result."""
+    return _count_rows(result)
+
+def same_rows(result, rows_in):
+    """`rows_out` of a stage that checks its input without changing it (e.g. a validation)."""
+    return rows_in
+
+class PipelineGraph:
+    """
+    A declared graph of pipeline stages, evaluated lazily.
+
+    `run()` only evaluates the stages the requested targets depend on, each
+    once, running the stages whose inputs are ready concurrently on a thread
+    pool. Stages marked `checkpoint` save their result under `checkpoint_dir`
+    (DataFrames as Parquet), and a later run with the same `run_key` loads it
+    instead of evaluating the stage and everything upstream of it.
+
+    Attributes:
+        - stages (dict): Stage name -> declaration.
+        - results (dict): Stage name -> result of the stages evaluated so far.
+        - resumed (list): Stages loaded from a checkpoint.
+    """
+
+    def __init__(self, report=None, checkpoint_dir=None, run_key=None, max_workers=DEFAULT_MAX_WORKERS):
+        """
+        Parameters:
+            - report (RunReport): Times each stage. Optional.
+            - checkpoint_dir (str): Directory of the checkpoints. Checkpointing is off when None.
+            - run_key (str): Key of the run's inputs (see `compute_run_key`). Checkpoints
+              written under another key are discarded.
+            - max_workers (int): Number of stages evaluated at the same time.
+        """
+        self.report = report
+        self.checkpoint_dir = checkpoint_dir
+        self.run_key = run_key
+        self.max_workers = max_workers
+        self.stages = {}
+        self.results = {}
+        self.resumed = []
+        self._lock = threading.Lock()
+        self._manifest = self._load_manifest() if checkpoint_dir else None
+
+    def add_stage(self, name, func, inputs=(), after=(), checkpoint=False, rows_out=count_rows):
+        """
+        Declares a stage.
+
+        Parameters:
+            - name (str): Stage name, also used in the run report.
+            - func (callable): Called with the results of `inputs`, in order.
+            - inputs (list): Stages whose results are passed to `func`.
+            - after (list): Stages that must have run first, without passing their results.
+            - checkpoint (bool): Save the result so a rerun can resume from this stage.
+            - rows_out (callable): Returns the `rows_out` of the report from the result and `rows_in`.
+        """
+        if name in self.stages:
+            raise ValueError(f"Stage '{name}' is already declared.")
+        for dependency in [*inputs, *after]:
+            if dependency not in self.stages:
+                raise ValueError(f"Stage '{name}' depends on undeclared stage '{dependency}'.")
+        self.stages[name] = {"func": func, "inputs": list(inputs), "after": list(after), "checkpoint": checkpoint,
+                             "rows_out": rows_out}
+
+    def _plan(self, targets):
+        """Returns stage name -> "run" or "resume" for the stages needed by `targets`."""
+        plan = {}
+
+        def visit(name):
+            if name in plan or name in self.results:
+                return
+            if name not in self.stages:
+                raise ValueError(f"Unknown stage '{name}'.")
+            stage = self.stages[name]
+            if stage["checkpoint"] and self._has_checkpoint(name):
+                plan[name] = "resume"
+                return
+            plan[name] = "run"
+            for dependency in stage["inputs"] + stage["after"]:
+                visit(dependency)
+
+        for target in targets:
+            visit(target)
+        return plan
+
+    def _dependencies(self, name, action):
+        stage = self.stages[name]
+        return [] if action == "resume" else stage["inputs"] + stage["after"]
+
+    def _evaluate(self, name, action):
+        stage = self.stages[name]
+        if action == "resume":
+            with self._stage(name, None) as measurement:
+                result = self._read_checkpoint(name)
+                measurement["rows_out"] = _count_rows(result)
+                measurement["checkpoint"] = "resumed"
+            logger.info(f"Resumed stage {name} from its checkpoint")
+            return result
+
+        arguments = [self.results[dependency] for dependency in stage["inputs"]]
+        rows_in = next((_count_rows(argument) for argument in arguments if _count_rows(argument) is not None), None)
+        with self._stage(name, rows_in) as measurement:
+            result = stage["func"](*arguments)
+            measurement["rows_out"] = stage["rows_out"](result, rows_in)
+            if stage["checkpoint"] and self.checkpoint_dir:
+                self._write_checkpoint(name, result)
+                measurement["checkpoint"] = "saved"
+        return result
+
+    def _stage(self, name, rows_in):
+        if self.report is None:
+            return nullcontext({})
+        return self.report.stage(name, rows_in=rows_in)
+
+    def run(self, *targets):
+        """
+        Evaluates the target stages and what they depend on.
+
+        Stages already evaluated by an earlier call are not evaluated again.
+        When a stage fails, the stages not yet started are cancelled and the
+        error is raised once the running ones have finished.
+
+        Returns:
+            - dict: Stage name -> result, for every evaluated stage.
+        """
+        plan = self._plan(targets)
+        waiting = dict(plan)
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            try:
+                while waiting or running:
+                    for name, action in list(waiting.items()):
+                        if all(dependency in self.results for dependency in self._dependencies(name, action)):
+                            running[executor.submit(self._evaluate, name, action)] = name
+                            del waiting[name]
+                    if not running:
+                        raise RuntimeError(f"Stages {sorted(waiting)} cannot be scheduled.")
+
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        name = running.pop(future)
+                        self.results[name] = future.result()
+                        if plan[name] == "resume":
+                            self.resumed.append(name)
+            except BaseException:
+                executor.shutdown(wait=True, cancel_futures=True)
+                raise
+        return self.results
+
+    def _checkpoint_path(self, name, extension):
+        return os.path.join(self.checkpoint_dir, f"{name}.{extension}")
+
+    def _load_manifest(self):
+        manifest_path = os.path.join(self.checkpoint_dir, MANIFEST_FILE)
+        manifest = None
+        if os.path.exists(manifest_path):
+            try:
+                with open(manifest_path, 'r') as file:
+                    manifest = json.load(file)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable checkpoint manifest {manifest_path}: {e}")
+        if manifest is None or manifest.get("run_key") != self.run_key:
+            if manifest is not None:
+                logger.info(f"Discarding the checkpoints in {self.checkpoint_dir}: the inputs changed")
+            self._remove_checkpoints(manifest)
+            manifest = {"run_key": self.run_key, "stages": {}}
+        return manifest
+
+    def _save_manifest(self):
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        manifest_path = os.path.join(self.checkpoint_dir, MANIFEST_FILE)
+        with open(manifest_path + ".tmp", 'w') as file:
+            json.dump(self._manifest, file, indent=4)
+        os.replace(manifest_path + ".tmp", manifest_path)
+
+    def _remove_checkpoints(self, manifest):
+        for entry in ((manifest or {}).get("stages") or {}).values():
+            if os.path.exists(entry["path"]):
+                os.remove(entry["path"])
+
+    def _has_checkpoint(self, name):
+        entry = self._manifest["stages"].get(name) if self._manifest else None
+        return entry is not None and os.path.exists(entry["path"])
+
+    def _read_checkpoint(self, name):
+        entry = self._manifest["stages"][name]
+        if entry["format"] == "parquet":
+            # Fixed-size binary columns (packed ObjectIds) need an explicit dtype, pandas cannot parse its name
+            return pyarrow.parquet.read_table(entry["path"]).to_pandas(
+                types_mapper=lambda arrow_type: pd.ArrowDtype(arrow_type)
+                if pyarrow.types.is_fixed_size_binary(arrow_type) else None)
+        with open(entry["path"], 'rb') as file:
+            return pickle.load(file)
+
+    def _write_checkpoint(self, name, result):
+        """Saves a DataFrame as Parquet; other values, and frames Arrow cannot represent, are pickled."""
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        path = None
+        if pyarrow is not None and isinstance(result, pd.DataFrame):
+            path = self._checkpoint_path(name, "parquet")
+            try:
+                result.to_parquet(path + ".tmp", engine="pyarrow")
+                os.replace(path + ".tmp", path)
+            except (pyarrow.ArrowException, ValueError, TypeError):
+                if os.path.exists(path + ".tmp"):
+                    os.remove(path + ".tmp")
+                path = None
+        if path is None:
+            path = self._checkpoint_path(name, "pkl")
+            with open(path + ".tmp", 'wb') as file:
+                pickle.dump(result, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(path + ".tmp", path)
+
+        with self._lock:
+            self._manifest["stages"][name] = {"path": path, "format": os.path.splitext(path)[1][1:],
+                                              "rows": _count_rows(result), "created": time.time()}
+            self._save_manifest()
+
+    def clear_checkpoints(self):
+        """Removes the checkpoints, e.g. once the run has completed."""
+        if not self.checkpoint_dir:
+            return
+        with self._lock:
+            self._remove_checkpoints(self._manifest)
+            self._manifest = {"run_key": self.run_key, "stages": {}}
+            manifest_path = os.path.join(self.checkpoint_dir, MANIFEST_FILE)
+            if os.path.exists(manifest_path):
+                os.remove(manifest_path)
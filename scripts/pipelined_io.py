@@ -0,0 +1,142 @@
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Items waiting between two stages; a full queue blocks the stage before it (backpressure)
+DEFAULT_QUEUE_SIZE = 2
+
+_POLL_SECONDS = 0.1
+_DONE = object()
+
+class _Failure:
+    """Carries the exception of a stage to the consumer."""
+
+    def __init__(self, error):
+        self.error = error
+
+def _new_timing():
+    return {"items": 0, "work_seconds": 0.0, "wait_input_seconds": 0.0, "wait_output_seconds": 0.0}
+
+def run_pipelined(source, stages, queue_size=DEFAULT_QUEUE_SIZE, timings=None, source_name="source",
+                  sink_name="sink"):
+    """
+    Runs a producer-consumer pipeline: the source and every stage run in their
+    own thread, connected by bounded queues, and the results are yielded to
+    the caller (the sink).
+
+    While the sink writes item N-1, the last stage processes item N and the
+    source produces item N+1. A stage that is faster than the next one blocks
+    once `queue_size` items wait for it, so memory stays bounded.
+
+    Each entry of `timings` records how many `items` a stage handled, the
+    time it spent working, waiting for its input (starved) and waiting for
+    room in its output queue (blocked by a slower stage downstream). The
+    sink's work is the time the caller spends between two items.
+
+    Parameters:
+        - source (iterable): Produces the items, e.g. Excel chunks.
+        - stages (list): (name, function) pairs; each function maps one item to the next stage's item.
+        - queue_size (int): Maximum number of items waiting between two stages.
+        - timings (dict): Filled with stage name -> timing, including `source_name` and `sink_name`.
+        - source_name (str): Name of the source in `timings`.
+        - sink_name (str): Name of the caller in `timings`.
+
+    Yields:
+        - The results of the last stage, in source order.
+
+    Raises:
+        - The first exception raised by the source or a stage, once the pipeline has stopped.
+    """
+    timings = {} if timings is None else timings
+    for name in [source_name, *(name for name, _ in stages), sink_name]:
+        timings[name] = _new_timing()
+    queues = [queue.Queue(maxsize=queue_size) for _ in range(len(stages) + 1)]
+    stop = threading.Event()
+
+    def put(output_queue, item, timing):
+        started = time.perf_counter()
+        while not stop.is_set():
+            try:
+                output_queue.put(item, timeout=_POLL_SECONDS)
+                break
+            except queue.Full:
+                continue
+        timing["wait_output_seconds"] += time.perf_counter() - started
+
+    def get(input_queue, timing):
+        started = time.perf_counter()
+        item = _DONE
+        while not stop.is_set():
+            try:
+                item = input_queue.get(timeout=_POLL_SECONDS)
+                break
+            except queue.Empty:
+                continue
+        timing["wait_input_seconds"] += time.perf_counter() - started
+        return item
+
+    def produce():
+        timing = timings[source_name]
+        iterator = iter(source)
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                item = next(iterator, _DONE)
+            except BaseException as e:
+                item = _Failure(e)
+            timing["work_seconds"] += time.perf_counter() - started
+            if item is not _DONE and not isinstance(item, _Failure):
+                timing["items"] += 1
+            put(queues[0], item, timing)
+            if item is _DONE or isinstance(item, _Failure):
+                return
+
+    def work(name, func, input_queue, output_queue):
+        timing = timings[name]
+        while True:
+            item = get(input_queue, timing)
+            if item is not _DONE and not isinstance(item, _Failure):
+                started = time.perf_counter()
+                try:
+                    item = func(item)
+                    timing["items"] += 1
+                except BaseException as e:
+                    item = _Failure(e)
+                timing["work_seconds"] += time.perf_counter() - started
+            put(output_queue, item, timing)
+            if item is _DONE or isinstance(item, _Failure) or stop.is_set():
+                return
+
+    threads = [threading.Thread(target=produce, name=f"pipeline-{source_name}", daemon=True)]
+    for position, (name, func) in enumerate(stages):
+        threads.append(threading.Thread(target=work, args=(name, func, queues[position], queues[position + 1]),
+                                        name=f"pipeline-{name}", daemon=True))
+    for thread in threads:
+        thread.start()
+
+    sink = timings[sink_name]
+    try:
+        while True:
+            item = get(queues[-1], sink)
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            sink["items"] += 1
+            started = time.perf_counter()
+            yield item
+            sink["work_seconds"] += time.perf_counter() - started
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+def log_pipeline_timings(timings):
+    """Logs the work and wait times of each pipeline stage, to size the workers and queues."""
+    for name, timing in timings.items():
+        logger.info(f"  {name}: {timing['items']} items, {timing['work_seconds']:.3f}s working, "
+                    f"{timing['wait_input_seconds']:.3f}s waiting for input, "
+                    f"{timing['wait_output_seconds']:.3f}s blocked on output")
@@ -0,0 +1,319 @@
+import argparse
+import difflib
+import logging
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow
+    import pyarrow.compute as pc
+except ImportError:  # pragma: no cover - tokens are split with pandas instead
+    pyarrow = None
+    pc = None
+
+from file_manager import load_excel_data
+from type_coercion import STRING_DTYPE, unpack_object_ids
+
+logger = logging.getLogger(__name__)
+
+# Sheet column -> reference extract column, in matching priority
+DEFAULT_KEY_COLUMNS = {"Id": "_id", "LPNumber": "lpNumber", "BBL": "bbl"}
+
+# Sheet column -> reference column compared on matched records
+DEFAULT_COMPARE_COLUMNS = {"Title": "title", "LPNumber": "lpNumber"}
+
+RECONCILIATION_STATUSES = ("new", "unchanged", "updated", "conflicting", "duplicate")
+RECONCILIATION_COLUMNS = ["row", "Id", "status", "match_key", "reference_row", "reference_id", "score", "detail"]
+
+DEFAULT_MIN_TITLE_SCORE = 0.9
+
+# Each title is blocked on its rarest tokens; tokens in more reference titles than this
+# (e.g. "house", "church") never form a block
+DEFAULT_BLOCK_TOKENS = 2
+DEFAULT_MAX_BLOCK_SIZE = 1000
+
+ALIAS_SEPARATOR = " | "
+
+def load_reference_extract(csv_path):
+    """
+    Loads a reference extract such as `landmarks_api_*.csv` (`_id,title,lpNumber,aliases,areaName`).
+
+    Every column is read as a string, with the pyarrow CSV parser when it is installed.
+    """
+    if pyarrow is None:  # pragma: no cover - pyarrow not installed
+        return pd.read_csv(csv_path, dtype=str)
+    return pd.read_csv(csv_path, dtype=str, engine="pyarrow")
+
+def normalize_keys(values):
+    """Normalizes join keys: trimmed and lower-cased strings, empty values become missing."""
+    keys = unpack_object_ids(pd.Series(values)).astype(STRING_DTYPE).str.strip().str.lower()
+    return keys.mask(keys.eq("").fillna(False))
+
+def normalize_titles(values):
+    """Normalizes titles for fuzzy matching: accents, punctuation and a leading "the" removed, spaces collapsed."""
+    titles = pd.Series(values).astype(STRING_DTYPE)
+    accented = titles.str.contains(r"[^\x00-\x7f]", regex=True).fillna(False)
+    if accented.any():
+        titles[accented] = (titles[accented].str.normalize("NFKD")
+                            .str.encode("ascii", errors="ignore").str.decode("ascii"))
+    titles = (titles.str.lower()
+              .str.replace("&", " and ", regex=False)
+              .str.replace(r"['’]", "", regex=True)
+              .str.replace(r"[^a-z0-9]+", " ", regex=True)
+              .str.replace(r"^\s*the\s+", "", regex=True)
+              .str.strip())
+    return titles.mask(titles.eq("").fillna(False))
+
+def _title_tokens(titles):
+    """Returns the distinct `position`/`token` pairs of the titles (tokens shorter than 3 characters dropped)."""
+    titles = titles.dropna()
+    if pc is not None:
+        tokens = pc.split_pattern(pyarrow.array(titles.to_numpy(dtype=object), type=pyarrow.string()), " ")
+        positions = titles.index.to_numpy()[pc.list_parent_indices(tokens).to_numpy()]
+        tokens = pc.list_flatten(tokens)
+        keep = pc.greater_equal(pc.utf8_length(tokens), 3).to_numpy(zero_copy_only=False)
+        frame = pd.DataFrame({"position": positions[keep],
+                              "token": tokens.to_numpy(zero_copy_only=False)[keep]})
+    else:  # pragma: no cover - pyarrow not installed
+        exploded = titles.str.split().explode()
+        exploded = exploded[exploded.str.len() >= 3]
+        frame = pd.DataFrame({"position": exploded.index, "token": exploded.to_numpy()})
+    return frame.drop_duplicates()
+
+def _title_similarity(title, reference_title, min_score):
+    """difflib ratio of the two titles, or 0 when its cheap upper bounds are already below `min_score`."""
+    matcher = difflib.SequenceMatcher(None, title, reference_title)
+    if matcher.real_quick_ratio() < min_score or matcher.quick_ratio() < min_score:
+        return 0.0
+    return matcher.ratio()
+
+def match_titles(titles, reference_titles, min_score=DEFAULT_MIN_TITLE_SCORE, max_block_size=DEFAULT_MAX_BLOCK_SIZE,
+                 block_tokens=DEFAULT_BLOCK_TOKENS, candidates=3):
+    """
+    Fuzzy-matches titles against the reference titles through a blocked token index.
+
+    Each title is only compared with the reference titles sharing one of its
+    `block_tokens` rarest tokens, so the work grows with the block sizes
+    rather than with the product of the two lengths. The candidates are
+    ranked by shared tokens (Dice coefficient) and the best `candidates` are
+    scored with difflib.
+
+    Parameters:
+        - titles (pd.Series): Normalized titles to match, from `normalize_titles`.
+        - reference_titles (pd.Series): Normalized reference titles; the index identifies the reference
+          record (a record may appear several times, e.g. with its aliases).
+        - min_score (float): Lowest accepted difflib ratio.
+        - max_block_size (int): Largest block (reference titles per token) that is searched.
+        - block_tokens (int): Number of tokens each title is blocked on.
+        - candidates (int): Number of candidates scored per title.
+
+    Returns:
+        - pd.DataFrame: `reference` (index label in `reference_titles`), `score` and `ties` (number
+          of reference records sharing the best score), indexed like `titles`, for the matched titles only.
+    """
+    empty = pd.DataFrame({"reference": pd.Series(dtype=object), "score": pd.Series(dtype=float),
+                          "ties": pd.Series(dtype=np.int64)})
+    titles = titles.dropna()
+    reference_titles = reference_titles.dropna()
+    reference_labels = reference_titles.index.to_numpy()
+    reference_titles = reference_titles.reset_index(drop=True)
+    if titles.empty or reference_titles.empty:
+        return empty
+
+    right = _title_tokens(reference_titles)
+    block_sizes = right["token"].value_counts()
+    left = _title_tokens(titles)
+    left["block_size"] = left["token"].map(block_sizes)
+    left = left[left["block_size"] <= max_block_size]
+    left = left.sort_values("block_size", kind="stable").groupby("position", sort=False).head(block_tokens)
+    right = right[right["token"].isin(left["token"])]
+
+    pairs = left[["position", "token"]].merge(right, on="token", suffixes=("", "_reference"))
+    if pairs.empty:
+        return empty
+    pairs = pairs.groupby(["position", "position_reference"], sort=False).size().rename("shared").reset_index()
+    token_counts = titles.str.count(" ") + 1
+    reference_token_counts = reference_titles.str.count(" ").to_numpy() + 1
+    pairs["dice"] = 2 * pairs["shared"] / (pairs["position"].map(token_counts).to_numpy()
+                                           + reference_token_counts[pairs["position_reference"].to_numpy()])
+    pairs = pairs.sort_values(["position", "dice"], ascending=[True, False]).groupby("position").head(candidates)
+
+    title_values = titles.to_dict()
+    reference_values = reference_titles.to_numpy(dtype=object)
+    pairs["score"] = [
+        _title_similarity(title_values[position], reference_values[reference], min_score)
+        for position, reference in zip(pairs["position"], pairs["position_reference"])
+    ]
+    accepted = pairs[pairs["score"] >= min_score].assign(
+        reference=lambda pairs: reference_labels[pairs["position_reference"].to_numpy()])
+    top = accepted[accepted["score"] == accepted.groupby("position")["score"].transform("max")]
+    ties = top.groupby("position")["reference"].nunique()
+    best = top.drop_duplicates("position")
+    return pd.DataFrame({
+        "reference": best["reference"].to_numpy(),
+        "score": best["score"].to_numpy(),
+        "ties": best["position"].map(ties).to_numpy(),
+    }, index=pd.Index(best["position"].to_numpy()))
+
+def _lookup_positions(keys, reference_keys):
+    """Hash-joins keys with the reference keys: the position of the first equal reference key, or -1."""
+    unique_keys = reference_keys.dropna().drop_duplicates()
+    found = pd.Index(unique_keys.to_numpy(dtype=object)).get_indexer(keys.to_numpy(dtype=object))
+    positions = np.where(found >= 0, unique_keys.index.to_numpy()[found], -1)
+    positions[keys.isna().to_numpy()] = -1
+    return pd.Series(positions, index=keys.index)
+
+def reconcile_with_reference(df, reference, key_columns=None, compare_columns=None, title_column="Title",
+                             reference_title_column="title", reference_alias_column="aliases",
+                             reference_id_column="_id", min_title_score=DEFAULT_MIN_TITLE_SCORE,
+                             max_block_size=DEFAULT_MAX_BLOCK_SIZE):
+    """
+    Reconciles an import sheet with a reference extract before documents are emitted.
+
+    Rows are hash-joined with the reference on each key of `key_columns`
+    (`Id`/`_id`, `LPNumber`/`lpNumber`, `BBL`/`bbl`, whichever both sides
+    have), in order. Rows no key matched are then fuzzy-matched on the
+    normalized title against the reference titles and aliases.
+
+    Statuses:
+        - new: no reference record matched.
+        - unchanged / updated: matched, with equal / different `compare_columns`.
+        - conflicting: two keys of the row match different reference records.
+        - duplicate: a key of the row repeats an earlier row, or the row matches several reference
+          records (by key, or by title equally well).
+
+    Parameters:
+        - df (pd.DataFrame): The import sheet.
+        - reference (pd.DataFrame): The reference extract, e.g. from `load_reference_extract`.
+        - key_columns (dict): Sheet column -> reference column joined on. Defaults to `DEFAULT_KEY_COLUMNS`.
+        - compare_columns (dict): Sheet column -> reference column compared on matched records.
+          Defaults to `DEFAULT_COMPARE_COLUMNS`.
+        - title_column (str): Sheet column with the title.
+        - reference_title_column (str): Reference column with the title.
+        - reference_alias_column (str): Reference column with the " | "-separated aliases.
+        - reference_id_column (str): Reference column reported as `reference_id`.
+        - min_title_score (float): Lowest accepted title similarity (0-1).
+        - max_block_size (int): See `match_titles`.
+
+    Returns:
+        - pd.DataFrame: One row per sheet row with the `RECONCILIATION_COLUMNS`.
+    """
+    key_columns = DEFAULT_KEY_COLUMNS if key_columns is None else key_columns
+    compare_columns = DEFAULT_COMPARE_COLUMNS if compare_columns is None else compare_columns
+    reference = reference.reset_index(drop=True)
+
+    matched = pd.Series(-1, index=df.index, dtype=np.int64)
+    match_key = pd.Series(None, index=df.index, dtype=object)
+    score = pd.Series(np.nan, index=df.index)
+    conflicting = pd.Series(False, index=df.index)
+    duplicate = pd.Series(False, index=df.index)
+    details = pd.Series("", index=df.index, dtype=object)
+
+    def add_detail(mask, message):
+        # Messages are only built for the flagged rows
+        rows = mask[mask].index
+        if len(rows):
+            text = message(rows).astype(object)
+            details[rows] = np.where(details[rows].eq(""), text, details[rows] + "; " + text)
+
+    for column, reference_column in key_columns.items():
+        if column not in df.columns or reference_column not in reference.columns:
+            continue
+        keys = normalize_keys(df[column])
+        reference_keys = normalize_keys(reference[reference_column])
+        positions = _lookup_positions(keys, reference_keys)
+        found = positions.ne(-1)
+
+        repeated = keys.notna() & keys.duplicated()
+        ambiguous_keys = reference_keys[reference_keys.duplicated()].dropna()
+        ambiguous = found & keys.isin(ambiguous_keys).fillna(False)
+        disagrees = found & matched.ne(-1) & positions.ne(matched)
+        add_detail(repeated, lambda rows: f"{column} " + keys[rows].astype(str) + " repeats an earlier row")
+        add_detail(ambiguous, lambda rows: f"{column} " + keys[rows].astype(str) + " matches "
+                   + keys[rows].map(reference_keys.value_counts()).astype(str) + " reference records")
+        add_detail(disagrees, lambda rows: f"{column} matches reference row " + positions[rows].astype(str)
+                   + ", not " + matched[rows].astype(str))
+        duplicate |= repeated | ambiguous
+        conflicting |= disagrees
+
+        newly = found & matched.eq(-1)
+        matched[newly] = positions[newly]
+        match_key[newly] = column
+        score[newly] = 1.0
+
+    aliases = None
+    if title_column in df.columns and reference_title_column in reference.columns:
+        reference_titles = normalize_titles(reference[reference_title_column])
+        if reference_alias_column in reference.columns:
+            aliases = normalize_titles(reference[reference_alias_column].dropna()
+                                       .str.split(ALIAS_SEPARATOR, regex=False).explode()).dropna()
+        unmatched = matched.eq(-1)
+        titles = normalize_titles(df.loc[unmatched, title_column])
+        candidates = reference_titles if aliases is None else pd.concat([reference_titles, aliases])
+        title_matches = match_titles(titles, candidates, min_title_score, max_block_size)
+        matched[title_matches.index] = title_matches["reference"].astype(np.int64)
+        match_key[title_matches.index] = title_column
+        score[title_matches.index] = title_matches["score"]
+        tied = pd.Series(False, index=df.index)
+        tied[title_matches.index] = title_matches["ties"] > 1
+        add_detail(tied, lambda rows: f"{title_column} matches " + title_matches.loc[rows, "ties"].astype(str)
+                   + " reference records equally well")
+        duplicate |= tied
+
+    found = matched.ne(-1)
+    positions = matched.where(found, 0).to_numpy()
+    updated = pd.Series(False, index=df.index)
+    for column, reference_column in compare_columns.items():
+        if column not in df.columns or reference_column not in reference.columns:
+            continue
+        normalize = normalize_titles if column == title_column else normalize_keys
+        values = normalize(df[column])
+        reference_values = normalize(reference[reference_column]).to_numpy(dtype=object)[positions]
+        differs = found & values.notna() & ~values.eq(pd.Series(reference_values, index=df.index)).fillna(False)
+        if column == title_column and aliases is not None and differs.any():
+            # A title equal to one of the reference record's aliases is unchanged
+            known = pd.MultiIndex.from_arrays([aliases.index, aliases.to_numpy(dtype=object)])
+            rows = differs[differs].index
+            differs[rows] = ~pd.MultiIndex.from_arrays(
+                [matched[rows].to_numpy(), values[rows].to_numpy(dtype=object)]).isin(known)
+        add_detail(differs, lambda rows: f"{column} differs from {reference_column} "
+                   + pd.Series(reference[reference_column].to_numpy(dtype=object)[positions], index=df.index)[rows]
+                   .astype(str))
+        updated |= differs
+
+    status = np.select([duplicate, conflicting, ~found, updated], ["duplicate", "conflicting", "new", "updated"],
+                       default="unchanged")
+    reference_ids = (reference[reference_id_column].to_numpy(dtype=object)[positions]
+                     if reference_id_column in reference.columns else np.full(len(df), None))
+    return pd.DataFrame({
+        "row": df.index,
+        "Id": df["Id"].to_numpy() if "Id" in df.columns else None,
+        "status": status,
+        "match_key": match_key.where(found, None).to_numpy(),
+        "reference_row": matched.where(found).astype("Int64").array,
+        "reference_id": np.where(found, reference_ids, None),
+        "score": score.to_numpy(),
+        "detail": details.to_numpy(),
+    }, columns=RECONCILIATION_COLUMNS)
+
+def summarize_reconciliation(reconciliation):
+    """Counts the reconciled rows per status, e.g. `{"new": 3, "unchanged": 10, ...}`."""
+    counts = reconciliation["status"].value_counts()
+    return {status: int(counts.get(status, 0)) for status in RECONCILIATION_STATUSES}
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Reconcile an Excel import with a reference extract.")
+    parser.add_argument("excel_file", help="The import sheet.")
+    parser.add_argument("reference_csv", help="The reference extract, e.g. landmarks_api_*.csv.")
+    parser.add_argument("--output", help="Write the reconciliation to this CSV file.")
+    parser.add_argument("--min-title-score", type=float, default=DEFAULT_MIN_TITLE_SCORE,
+                        help="Lowest accepted title similarity (0-1).")
+    args = parser.parse_args()
+
+    result = reconcile_with_reference(load_excel_data(args.excel_file), load_reference_extract(args.reference_csv),
+                                      min_title_score=args.min_title_score)
+    logger.info(f"Reconciliation: {summarize_reconciliation(result)}")
+    if args.output:
+        result.to_csv(args.output, index=False)
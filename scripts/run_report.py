@@ -0,0 +1,238 @@
+import cProfile
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+PROFILERS = ("cprofile", "pyinstrument")
+
+def generate_build_id(started_at=None):
+    """Returns a Build ID of the form `mm-dd-yyyy.hh.mm.ss-<8 hex digits>`."""
+    return f"{(started_at or datetime.now()).strftime('%m-%d-%Y.%H.%M.%S')}-{uuid.uuid4().hex[:8]}"
+
+def get_peak_rss_bytes():
+    """Returns the peak resident set size of the process in bytes, or None where it is not available."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def count_errors_by_rule(error_table, rule_column="rule"):
+    """
+    Counts the failed checks of an error table per column and rule, e.g. `{"BoroughCode.allowedValues": 3}`.
+
+    Parameters:
+        - error_table (pd.DataFrame): Result of `validate_excel_data_values_table` or `coerce_dataframe_types`.
+        - rule_column (str): The column holding the rule (`rule`, or `type` for coercion errors).
+    """
+    if error_table is None or not len(error_table):
+        return {}
+    counts = error_table.groupby(["column", rule_column], sort=False).size()
+    return {f"{column}.{rule}": int(count) for (column, rule), count in counts.items()}
+
+class RunReport:
+    """
+    Instrumentation of one import run.
+
+    Stages are timed with `stage()`. A stage entered several times (e.g. once
+    per chunk in streaming mode) accumulates into a single entry. Stages may
+    run on several threads at once (see `pipeline_dag` and `pipelined_io`);
+    such a stage is marked `concurrent`, its CPU time is that of its own
+    thread and its memory is only part of the run's tracemalloc peak.
+
+    Attributes:
+        - build_id (str): The generated Build ID.
+        - started_at (datetime): Start timestamp of the run.
+        - stages (dict): Stage name -> measurements.
+        - errors (dict): Error category -> "column.rule" -> count.
+        - pipeline (dict): Work and wait times per stage of a pipelined run (see `pipelined_io`).
+        - memory (dict): Size of the frame before and after the conversion to compact dtypes.
+    """
+
+    def __init__(self, build_id=None, profile_stage=None, profiler="cprofile", profile_path=None, trace_memory=False):
+        """
+        Parameters:
+            - build_id (str): Build ID to use instead of a generated one.
+            - profile_stage (str): Name of the stage to profile.
+            - profiler (str): "cprofile" or "pyinstrument".
+            - profile_path (str): Where to write the profile. Defaults to `profile.<build id>.<stage>.prof`
+              (or `.html` for pyinstrument).
+            - trace_memory (bool): Measure Python allocations per stage with tracemalloc (slows the run down).
+        """
+        if profiler not in PROFILERS:
+            raise ValueError(f"Unsupported profiler '{profiler}'. Expected one of {list(PROFILERS)}.")
+
+        self.started_at = datetime.now()
+        self.build_id = build_id or generate_build_id(self.started_at)
+        self.stages = {}
+        self.errors = {}
+        self.pipeline = {}
+        self.memory = {}
+        self.profile_stage = profile_stage
+        self.profiler = profiler
+        self.profile_path = profile_path or (
+            f"profile.{self.build_id}.{profile_stage}.{'html' if profiler == 'pyinstrument' else 'prof'}")
+        self._profile = None
+        self._started = time.perf_counter()
+        self._started_cpu = time.process_time()
+        self.trace_memory = trace_memory
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self._lock = threading.Lock()
+        self._active = []
+        self._tracemalloc_peak = 0
+
+    def _start_profile(self):
+        if self._profile is None:
+            if self.profiler == "pyinstrument":
+                from pyinstrument import Profiler
+                self._profile = Profiler()
+            else:
+                self._profile = cProfile.Profile()
+        if self.profiler == "pyinstrument":
+            self._profile.start()
+        else:
+            self._profile.enable()
+
+    def _stop_profile(self):
+        if self.profiler == "pyinstrument":
+            self._profile.stop()
+        else:
+            self._profile.disable()
+
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        """
+        Measures one stage: wall and CPU time, rows in/out, peak RSS and, with
+        `trace_memory`, the tracemalloc allocation delta and peak.
+
+        CPU time is that of the process, or of the calling thread when the stage
+        overlaps another one. The tracemalloc peak is global to the process, so
+        overlapping stages get no tracemalloc figures of their own and only
+        count towards the run's peak (see `finish`).
+
+        Yields a dictionary in which the caller may set `rows_out`; any other
+        key it sets (e.g. `checkpoint`) is copied into the stage entry.
+        """
+        measurement = {"rows_out": None}
+        state = {"concurrent": False}
+        with self._lock:
+            self._active.append(state)
+            if len(self._active) > 1:
+                for active in self._active:
+                    active["concurrent"] = True
+            elif self.trace_memory:
+                self._tracemalloc_peak = max(self._tracemalloc_peak, tracemalloc.get_traced_memory()[1])
+                tracemalloc.reset_peak()
+        memory_before = tracemalloc.get_traced_memory()[0] if self.trace_memory else 0
+        profiling = name == self.profile_stage
+        if profiling:
+            self._start_profile()
+
+        started, started_cpu, started_thread = time.perf_counter(), time.process_time(), time.thread_time()
+        try:
+            yield measurement
+        finally:
+            wall = time.perf_counter() - started
+            cpu_process, cpu_thread = time.process_time() - started_cpu, time.thread_time() - started_thread
+            if profiling:
+                self._stop_profile()
+
+            with self._lock:
+                self._active.remove(state)
+                concurrent = state["concurrent"]
+                entry = self.stages.setdefault(name, {
+                    "calls": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0, "rows_in": None, "rows_out": None,
+                })
+                entry["calls"] += 1
+                entry["wall_seconds"] += wall
+                entry["cpu_seconds"] += cpu_thread if concurrent else cpu_process
+                for key, value in (("rows_in", rows_in), ("rows_out", measurement["rows_out"])):
+                    if value is not None:
+                        entry[key] = (entry[key] or 0) + value
+                entry.update({key: value for key, value in measurement.items() if key != "rows_out"})
+                entry["peak_rss_bytes"] = get_peak_rss_bytes()
+                if concurrent:
+                    entry["concurrent"] = True
+                elif self.trace_memory:
+                    current, peak = tracemalloc.get_traced_memory()
+                    entry["tracemalloc_delta_bytes"] = (entry.get("tracemalloc_delta_bytes", 0)
+                                                        + current - memory_before)
+                    entry["tracemalloc_peak_bytes"] = max(entry.get("tracemalloc_peak_bytes", 0),
+                                                          peak - memory_before)
+
+    def add_errors(self, category, counts):
+        """Adds error counts (`"column.rule"` -> count) under a category such as `values` or `coercion`."""
+        with self._lock:
+            totals = self.errors.setdefault(category, {})
+            for key, count in counts.items():
+                totals[key] = totals.get(key, 0) + count
+
+    def _save_profile(self):
+        if self.profiler == "pyinstrument":
+            with open(self.profile_path, 'w') as file:
+                file.write(self._profile.output_html())
+        else:
+            self._profile.dump_stats(self.profile_path)
+
+    def finish(self, status="ok", error=None):
+        """
+        Ends the run, writes the profile if one was captured, and returns the report.
+
+        Returns:
+            - dict: `build_id`, `status`, `error`, `started_at`, `ended_at`, `wall_seconds`,
+              `cpu_seconds`, `peak_rss_bytes`, `stages`, `errors`, `pipeline`, `memory` and `profile`,
+              plus `tracemalloc_peak_bytes` with `trace_memory`.
+        """
+        ended_at = datetime.now()
+        profile = None
+        if self._profile is not None:
+            self._save_profile()
+            profile = {"stage": self.profile_stage, "profiler": self.profiler, "path": self.profile_path}
+
+        report = {
+            "build_id": self.build_id,
+            "status": status,
+            "error": error,
+            "started_at": self.started_at.isoformat(),
+            "ended_at": ended_at.isoformat(),
+            "wall_seconds": time.perf_counter() - self._started,
+            "cpu_seconds": time.process_time() - self._started_cpu,
+            "peak_rss_bytes": get_peak_rss_bytes(),
+            "pid": os.getpid(),
+            "stages": self.stages,
+            "errors": self.errors,
+            "pipeline": self.pipeline,
+            "memory": self.memory,
+            "profile": profile,
+        }
+        if self.trace_memory:
+            report["tracemalloc_peak_bytes"] = max(self._tracemalloc_peak, tracemalloc.get_traced_memory()[1])
+        return report
+
+def save_run_report(report, output_file_path):
+    """Writes the report returned by `RunReport.finish` as JSON."""
+    with open(output_file_path, 'w') as file:
+        json.dump(report, file, indent=4)
+
+def log_run_report(report):
+    """Logs the stage timings of a finished run."""
+    for name, stage in report["stages"].items():
+        rows = f", {stage['rows_in']} -> {stage['rows_out']} rows" if stage["rows_in"] is not None else ""
+        logger.info(f"  {name}: {stage['wall_seconds']:.3f}s wall, {stage['cpu_seconds']:.3f}s CPU{rows}")
+    logger.info(f"Build {report['build_id']} {report['status']} at {report['ended_at']} "
+                f"({report['wall_seconds']:.2f}s)")
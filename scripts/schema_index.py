@@ -0,0 +1,107 @@
+import hashlib
+
+from graphql import (
+    build_schema,
+    get_named_type,
+    is_list_type,
+    is_non_null_type,
+    is_object_type,
+)
+
+# Parsed schema indexes, keyed by the SHA-256 of the schema text.
+_INDEX_CACHE = {}
+
+def _describe_field(field):
+    field_type = field.type
+    nullable = not is_non_null_type(field_type)
+    if not nullable:
+        field_type = field_type.of_type
+    is_list = is_list_type(field_type)
+    return {
+        "type": get_named_type(field_type).name,
+        "nullable": nullable,
+        "list": is_list,
+    }
+
+def build_schema_index(schema_contents):
+    """
+    Parses a GraphQL schema with graphql-core and indexes its fields.
+
+    Parameters:
+        - schema_contents (str): Content of the GraphQL schema.
+
+    Returns:
+        - dict: The index with the keys
+          `types` (type -> field -> {"type", "nullable", "list"}),
+          `root` (the type returned by the first Query field, e.g. Attraction),
+          `paths` (dotted path from the root type, e.g. `loc.lat` -> field info),
+          `paths_lower` (lower-cased dotted path -> dotted path) and
+          `fields_lower` (lower-cased field name -> list of dotted paths).
+    """
+    schema = build_schema(schema_contents)
+
+    types = {}
+    for name, graphql_type in schema.type_map.items():
+        if name.startswith("__") or not is_object_type(graphql_type):
+            continue
+        types[name] = {field_name: _describe_field(field) for field_name, field in graphql_type.fields.items()}
+
+    root = None
+    if schema.query_type and schema.query_type.fields:
+        root = get_named_type(next(iter(schema.query_type.fields.values())).type).name
+
+    paths = {}
+
+    def add_paths(type_name, prefix, visiting):
+        for field_name, info in types.get(type_name, {}).items():
+            path = f"{prefix}{field_name}"
+            paths[path] = info
+            if info["type"] in types and info["type"] not in visiting:
+                add_paths(info["type"], f"{path}.", visiting | {info["type"]})
+
+    if root:
+        add_paths(root, "", {root})
+
+    fields_lower = {}
+    for path in paths:
+        fields_lower.setdefault(path.rsplit(".", 1)[-1].lower(), []).append(path)
+
+    return {
+        "types": types,
+        "root": root,
+        "paths": paths,
+        "paths_lower": {path.lower(): path for path in paths},
+        "fields_lower": fields_lower,
+    }
+
+def get_schema_index(schema_contents):
+    """Returns the index of the schema text, building it only once per distinct schema (by SHA-256)."""
+    schema_hash = hashlib.sha256(schema_contents.encode()).hexdigest()
+    index = _INDEX_CACHE.get(schema_hash)
+    if index is None:
+        index = build_schema_index(schema_contents)
+        _INDEX_CACHE[schema_hash] = index
+    return index
+
+def resolve_schema_path(schema_index, name):
+    """
+    Resolves an Excel column or a `documentField` to paths in the schema.
+
+    A dotted name (`loc.postalCode`) is looked up as a path from the root type;
+    a plain name (`PostalCode`) matches a field of that name at any depth.
+    Both lookups are case-insensitive.
+
+    Parameters:
+        - schema_index (dict): Result of `build_schema_index`.
+        - name (str): Column name or dotted document path.
+
+    Returns:
+        - list: Matching dotted paths (empty if the name is not in the schema).
+    """
+    name = str(name)
+    if name in schema_index["paths"]:
+        return [name]
+    if "." in name:
+        path = schema_index["paths_lower"].get(name.lower())
+        return [path] if path else []
+    return list(schema_index["fields_lower"].get(name.lower(), []))
@@ -0,0 +1,415 @@
+from decimal import Decimal, InvalidOperation
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import (
+    infer_dtype,
+    is_bool_dtype,
+    is_datetime64_any_dtype,
+    is_float_dtype,
+    is_numeric_dtype,
+)
+
+try:
+    import pyarrow
+    import pyarrow.compute as pc
+except ImportError:  # pragma: no cover - the coercions fall back to pandas' own string storage
+    pyarrow = None
+    pc = None
+
+from pipeline_context import get_pipeline_context
+from schema_index import get_schema_index, resolve_schema_path
+
+# Strings are stored in Arrow when pyarrow is installed (faster regex checks, compact storage)
+STRING_DTYPE = pd.StringDtype("pyarrow" if pyarrow is not None else "python")
+
+# Whole numbers pyarrow can cast without going through `pd.to_numeric`
+_INTEGER_PATTERN = r"^[+-]?\d{1,18}$"
+
+COERCION_ERROR_COLUMNS = ["row", "Id", "column", "type", "value"]
+
+# pandas dtype produced for each target type
+TARGET_DTYPES = {
+    "string": "string",
+    "objectId": "string",
+    "integer": "Int64",
+    "long": "Int64",
+    "float": "float64",
+    "boolean": "boolean",
+    "date": "datetime64[ns]",
+    "datetime": "datetime64[ns]",
+}
+
+# Target type of the GraphQL scalars
+GRAPHQL_SCALAR_TYPES = {
+    "String": "string",
+    "ID": "string",
+    "Int": "integer",
+    "Long": "long",
+    "Float": "float",
+    "Boolean": "boolean",
+    "Date": "date",
+    "DateTime": "datetime",
+}
+
+OBJECT_ID_PATTERN = r"[0-9a-fA-F]{24}"
+OBJECT_ID_VALIDATION_PATTERNS = {f"^{OBJECT_ID_PATTERN}$", "^[a-fA-F0-9]{24}$"}
+
+# Compact mode stores ObjectIds as 12 packed bytes instead of 24-character Python strings
+OBJECT_ID_DTYPE = pd.ArrowDtype(pyarrow.binary(12)) if pyarrow is not None else None
+# Only lower-case ids are packed, so unpacking gives back the same strings
+_PACKABLE_OBJECT_ID_PATTERN = r"^[0-9a-f]{24}$"
+_HEX_DIGITS = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+_HEX_VALUES = np.zeros(256, dtype=np.uint8)
+_HEX_VALUES[_HEX_DIGITS] = np.arange(16, dtype=np.uint8)
+
+# Compact mode stores string columns with at most this share of distinct values as `category`
+DEFAULT_MAX_CATEGORY_RATIO = 0.5
+
+_BOOLEAN_VALUES = {
+    "true": True, "1": True, "1.0": True, "yes": True, "y": True,
+    "false": False, "0": False, "0.0": False, "no": False, "n": False,
+}
+
+def resolve_target_types(mapping_data):
+    """
+    Derives the target type of every mapped column from the mapping and the GraphQL schema.
+
+    The mapping `type` wins; columns without one take the type of their
+    `documentField` in the schema (e.g. `loc.bbl: Long` -> `long`). String
+    columns mapped to the document `id`, or validated with the 24-digit hex
+    pattern, become `objectId`.
+
+    Parameters:
+        - mapping_data (dict, str or PipelineContext): The mapping data. The schema is
+          used when the context was loaded with one.
+
+    Returns:
+        - dict: Excel column -> target type (a key of `TARGET_DTYPES`).
+    """
+    context = get_pipeline_context(mapping_data)
+    schema_index = context.schema_index
+    targets = {}
+
+    for column in {**context.column_to_document_field, **context.column_to_dtype}:
+        document_field = context.column_to_document_field.get(column)
+        target = context.column_to_dtype.get(column)
+        if target not in TARGET_DTYPES and schema_index and document_field:
+            field = schema_index["paths"].get(document_field)
+            target = GRAPHQL_SCALAR_TYPES.get(field["type"]) if field else None
+        if target not in TARGET_DTYPES:
+            continue
+
+        pattern = context.compiled_patterns.get(column)
+        if target == "string" and (document_field == "id" or (pattern and pattern.pattern in OBJECT_ID_VALIDATION_PATTERNS)):
+            target = "objectId"
+        targets[column] = target
+
+    return targets
+
+def resolve_schema_target_types(columns, graphql_schema):
+    """
+    Derives target types from the GraphQL schema alone, matching each column to a schema field by name.
+
+    Columns matching no field, or fields of different types, are left out.
+
+    Parameters:
+        - columns (list): The DataFrame columns.
+        - graphql_schema (str): Content of the GraphQL schema.
+
+    Returns:
+        - dict: Column -> target type.
+    """
+    schema_index = get_schema_index(graphql_schema)
+    targets = {}
+    for column in columns:
+        scalar_types = {schema_index["paths"][path]["type"] for path in resolve_schema_path(schema_index, column)}
+        if len(scalar_types) == 1 and scalar_types.issubset(GRAPHQL_SCALAR_TYPES):
+            targets[column] = GRAPHQL_SCALAR_TYPES[scalar_types.pop()]
+    return targets
+
+def _arrow_strings(series):
+    """Returns the column as a pyarrow string array, or None if pyarrow is missing or the column mixes types."""
+    if pyarrow is None or not (series.dtype == object or isinstance(series.dtype, pd.StringDtype)):
+        return None
+    try:
+        return pyarrow.array(series, type=pyarrow.string(), from_pandas=True)
+    except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError):
+        return None
+
+def _coerce_string(series):
+    # Whole floats (integers read with missing cells) are written without the ".0"
+    if is_float_dtype(series) and (series.dropna() % 1 == 0).all():
+        if pyarrow is not None:
+            strings = pyarrow.array(series, from_pandas=True).cast(pyarrow.int64()).cast(pyarrow.string())
+            return pd.Series(pd.arrays.ArrowStringArray(strings), index=series.index, name=series.name)
+        series = series.astype("Int64")
+    return series.astype(STRING_DTYPE)
+
+def _to_integers(series):
+    numeric = pd.to_numeric(series, errors="coerce")
+    if is_bool_dtype(numeric):
+        numeric = numeric.astype("int64")
+    integral = numeric.notna() & (numeric % 1 == 0)
+    return numeric.where(integral).astype("Int64")
+
+def to_long(value):
+    """
+    Converts one `long` value (int, numpy integer, float or numeric string such
+    as "123" or "123.0") to a Python int. Strings are parsed as decimals, not
+    floats, so integers above 2**53 keep every digit; a fraction is truncated.
+
+    Raises:
+        - ValueError: If the value is not a number.
+    """
+    if isinstance(value, str):
+        try:
+            return int(Decimal(value.strip()))
+        except InvalidOperation:
+            raise ValueError(f"invalid literal for a long: {value!r}")
+    return int(value)
+
+def _coerce_integer(series):
+    strings = _arrow_strings(series)
+    if strings is None:
+        return _to_integers(series)
+
+    # Plain integer strings are cast by pyarrow; only the other cells go through `pd.to_numeric`
+    strings = pc.utf8_trim_whitespace(strings)
+    is_integer = pc.fill_null(pc.match_substring_regex(strings, _INTEGER_PATTERN), False)
+    values = pc.if_else(is_integer, strings, None).cast(pyarrow.int64())
+    integers = pd.Series(pd.arrays.IntegerArray(pc.fill_null(values, 0).to_numpy(zero_copy_only=False, writable=True),
+                                                values.is_null().to_numpy(zero_copy_only=False)),
+                         index=series.index)
+    rest = series.notna().to_numpy() & ~is_integer.to_numpy(zero_copy_only=False)
+    if rest.any():
+        integers[rest] = _to_integers(series[rest]).to_numpy()
+    return integers
+
+def _coerce_float(series):
+    return pd.to_numeric(series, errors="coerce").astype("float64")
+
+def _coerce_boolean(series):
+    if is_bool_dtype(series):
+        return series.astype("boolean")
+    return series.astype(STRING_DTYPE).str.strip().str.lower().map(_BOOLEAN_VALUES).astype("boolean")
+
+def _coerce_datetime(series):
+    if is_datetime64_any_dtype(series):
+        return series.astype("datetime64[ns]")
+    if is_numeric_dtype(series):
+        # Excel serial dates
+        return pd.to_datetime(series, unit="D", origin="1899-12-30", errors="coerce")
+    # ISO 8601 strings are parsed in one pass; only the other cells go through format inference
+    dates = pd.to_datetime(series, format="ISO8601", errors="coerce")
+    rest = series.notna() & dates.isna()
+    if rest.any():
+        dates[rest] = pd.to_datetime(series[rest], errors="coerce")
+    return dates
+
+def _coerce_date(series):
+    return _coerce_datetime(series).dt.normalize()
+
+_COERCERS = {
+    "string": _coerce_string,
+    "objectId": _coerce_string,
+    "integer": _coerce_integer,
+    "long": _coerce_integer,
+    "float": _coerce_float,
+    "boolean": _coerce_boolean,
+    "date": _coerce_date,
+    "datetime": _coerce_datetime,
+}
+
+def is_object_id_dtype(dtype):
+    """True for the packed ObjectId dtype of compact mode."""
+    return OBJECT_ID_DTYPE is not None and dtype == OBJECT_ID_DTYPE
+
+def _decode_hex_ids(strings):
+    """Decodes an Arrow array of 24-digit lower-case hex strings (without nulls) into an (n, 12) uint8 array."""
+    offsets = np.frombuffer(strings.buffers()[1], dtype=np.int32)[strings.offset:strings.offset + len(strings) + 1]
+    digits = _HEX_VALUES[np.frombuffer(strings.buffers()[2], dtype=np.uint8)[offsets[0]:offsets[-1]]]
+    digits = digits.reshape(-1, 24)
+    return (digits[:, 0::2] << 4) | digits[:, 1::2]
+
+def pack_object_ids(series):
+    """
+    Packs lower-case 24-digit hex strings into 12-byte binary values.
+
+    The hex digits are decoded with a lookup table on the Arrow string buffer,
+    so no Python object is created per value. Missing values stay missing.
+
+    Returns:
+        - pd.Series: The packed values (`OBJECT_ID_DTYPE`), or the column
+          unchanged if pyarrow is missing or a value is not a packable ObjectId.
+    """
+    strings = _arrow_strings(series)
+    if strings is None:
+        return series
+    if isinstance(strings, pyarrow.ChunkedArray):
+        strings = strings.combine_chunks()
+    if not pc.all(pc.match_substring_regex(strings, _PACKABLE_OBJECT_ID_PATTERN)).as_py():
+        return series
+
+    filled = pc.fill_null(strings, "0" * 24)
+    packed = _decode_hex_ids(filled)
+    values = pyarrow.FixedSizeBinaryArray.from_buffers(pyarrow.binary(12), len(filled),
+                                                       [None, pyarrow.py_buffer(packed.tobytes())])
+    values = pc.if_else(strings.is_valid(), values, pyarrow.scalar(None, pyarrow.binary(12)))
+    return pd.Series(pd.arrays.ArrowExtensionArray(values), index=series.index, name=series.name)
+
+def unpack_object_ids(series):
+    """Turns packed ObjectIds back into 24-digit hex strings (`STRING_DTYPE`); other columns are returned as is."""
+    if not is_object_id_dtype(series.dtype):
+        return series
+    values = pyarrow.array(series.array)
+    packed = np.frombuffer(values.buffers()[1], dtype=np.uint8)[values.offset * 12:(values.offset + len(values)) * 12]
+    digits = np.empty((len(values), 24), dtype=np.uint8)
+    packed = packed.reshape(-1, 12)
+    digits[:, 0::2] = _HEX_DIGITS[packed >> 4]
+    digits[:, 1::2] = _HEX_DIGITS[packed & 0x0F]
+    strings = pyarrow.StringArray.from_buffers(len(values), pyarrow.py_buffer(
+        np.arange(0, 24 * len(values) + 1, 24, dtype=np.int32).tobytes()), pyarrow.py_buffer(digits.tobytes()))
+    strings = pc.if_else(values.is_valid(), strings, pyarrow.scalar(None, pyarrow.string()))
+    return pd.Series(pd.arrays.ArrowStringArray(strings), index=series.index, name=series.name)
+
+def decode_object_ids(values):
+    """
+    Decodes ObjectIds into 12-byte binary values that numpy can sort and search.
+
+    Hex strings are trimmed and matched in either case; packed ids
+    (`OBJECT_ID_DTYPE`) are read from their Arrow buffer as they are.
+
+    Parameters:
+        - values (pd.Series or pyarrow.Array): The ids.
+
+    Returns:
+        - tuple: (`S12` numpy array, zero bytes where the id is missing or not an
+          ObjectId; boolean numpy array marking the valid ids)
+    """
+    if pyarrow is None:  # pragma: no cover - pyarrow not installed
+        strings = pd.Series(values).astype(str).str.strip().str.lower()
+        valid = (pd.Series(values).notna() & strings.str.fullmatch(_PACKABLE_OBJECT_ID_PATTERN)).to_numpy(dtype=bool)
+        ids = np.array([bytes.fromhex(value) if ok else b"" for value, ok in zip(strings, valid)], dtype="S12")
+        return ids, valid
+
+    if isinstance(values, pd.Series):
+        if is_object_id_dtype(values.dtype):
+            values = pyarrow.array(values.array)
+        else:
+            strings = _arrow_strings(values)
+            if strings is None:
+                strings = pyarrow.array(values.map(str, na_action="ignore").astype(object), type=pyarrow.string(),
+                                        from_pandas=True)
+            values = strings
+    if isinstance(values, pyarrow.ChunkedArray):
+        values = values.combine_chunks()
+
+    if pyarrow.types.is_fixed_size_binary(values.type):
+        packed = np.frombuffer(values.buffers()[1], dtype=np.uint8)[values.offset * 12:(values.offset + len(values)) * 12]
+        ids = np.where(np.asarray(values.is_valid())[:, None], packed.reshape(-1, 12), 0)
+        return np.ascontiguousarray(ids, dtype=np.uint8).view("S12").ravel(), np.asarray(values.is_valid())
+
+    strings = pc.utf8_lower(pc.utf8_trim_whitespace(values.cast(pyarrow.string())))
+    valid = pc.fill_null(pc.match_substring_regex(strings, _PACKABLE_OBJECT_ID_PATTERN), False)
+    packed = _decode_hex_ids(pc.if_else(valid, strings, "0" * 24))
+    ids = np.ascontiguousarray(packed, dtype=np.uint8).view("S12").ravel()
+    return ids, np.asarray(valid)
+
+def compact_dataframe(df, mapping_data, max_category_ratio=DEFAULT_MAX_CATEGORY_RATIO):
+    """
+    Converts the mapped text columns of a loaded frame to compact dtypes.
+
+    Columns with `allowedValues`, and text columns with few distinct values
+    (at most `max_category_ratio` of the present cells, e.g. City or
+    Neighborhood), become `category`; the other text columns become Arrow
+    strings (`STRING_DTYPE`). Columns holding anything else than strings
+    (e.g. postal codes read as numbers) are left to the cast stage. The
+    ObjectId columns are packed by `coerce_dataframe_types(..., compact=True)`,
+    once they have been validated.
+
+    Parameters:
+        - df (pd.DataFrame): The Excel data.
+        - mapping_data (dict, str or PipelineContext): The mapping data.
+        - max_category_ratio (float): Highest share of distinct values of a `category` column.
+
+    Returns:
+        - tuple: (the compact DataFrame, dict of column -> new dtype name)
+    """
+    context = get_pipeline_context(mapping_data)
+    target_types = resolve_target_types(context)
+    enumerated = {rule["column"] for rule in context.validation_rules if rule["rule"] == "allowedValues"}
+    converted = {}
+    for column in df.columns:
+        series = df[column]
+        if column not in context.column_to_document_field or series.dtype != object:
+            continue
+        if infer_dtype(series, skipna=True) != "string":
+            continue
+        present = int(series.notna().sum())
+        if column in enumerated or (present and series.nunique() <= max_category_ratio * present):
+            converted[column] = series.astype("category")
+        elif target_types.get(column, "string") in ("string", "objectId"):
+            converted[column] = series.astype(STRING_DTYPE)
+    return df.assign(**converted), {column: str(series.dtype) for column, series in converted.items()}
+
+def coerce_dataframe_types(df, target_types, compact=False):
+    """
+    Converts the columns of the DataFrame to their target types with vectorized pandas conversions.
+
+    Missing cells become `<NA>`/`NaT` (never the string "nan"). Cells that
+    cannot be represented in the target type (e.g. "N/A" in a `long` column)
+    also become missing and are reported; `objectId` cells that are not
+    24-digit hex strings are reported but kept.
+
+    With `compact`, `category` string columns stay categorical and `objectId`
+    columns are packed into 12-byte values (see `pack_object_ids`).
+
+    Parameters:
+        - df (pd.DataFrame): The Excel data.
+        - target_types (dict): Column -> target type, e.g. from `resolve_target_types`.
+        - compact (bool): Keep the compact dtypes of `compact_dataframe` and pack the ObjectIds.
+
+    Returns:
+        - tuple: (the converted DataFrame, DataFrame of failed cells with the
+          columns `row`, `Id`, `column`, `type` and `value`)
+    """
+    converted = {}
+    failures = []
+    for column, target in target_types.items():
+        if column not in df.columns:
+            continue
+        series = df[column]
+        if compact and target in ("string", "objectId") and isinstance(series.dtype, pd.CategoricalDtype) \
+                and infer_dtype(series.cat.categories, skipna=True) in ("string", "empty"):
+            converted[column] = series
+            continue
+        result = _COERCERS[target](unpack_object_ids(series))
+
+        failed = series.notna() & result.isna()
+        if target == "objectId":
+            failed = failed | (result.notna() & ~result.str.fullmatch(OBJECT_ID_PATTERN).fillna(False).astype(bool))
+        if failed.any():
+            failures.append(pd.DataFrame({
+                "row": df.index[failed],
+                "Id": df["Id"][failed].to_numpy() if "Id" in df.columns else None,
+                "column": column,
+                "type": target,
+                "value": series[failed].to_numpy(),
+            }))
+        if compact and target == "objectId":
+            result = pack_object_ids(result)
+        converted[column] = result
+
+    if failures:
+        errors = pd.concat(failures, ignore_index=True).sort_values("row", kind="stable", ignore_index=True)
+    else:
+        errors = pd.DataFrame(columns=COERCION_ERROR_COLUMNS)
+    return df.assign(**converted), errors
+
+def format_coercion_errors(error_table):
+    """Formats the failed cells from `coerce_dataframe_types` as messages."""
+    return [
+        f"Id {error.Id} has value {error.value} in column {error.column} that cannot be converted to {error.type}."
+        for error in error_table.itertuples(index=False)
+    ]
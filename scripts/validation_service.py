@@ -0,0 +1,389 @@
+import argparse
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+from file_manager import check_excel_file_path, get_rules_file_path, load_excel_data, probe_excel_header
+from pipeline_context import load_pipeline_context
+from type_coercion import coerce_dataframe_types, format_coercion_errors, resolve_target_types
+from mongodb_loader import get_document_field_types
+from output_writer import json_default, write_documents
+from data_validation import (
+    format_validation_errors,
+    process_excel_data_with_mapping,
+    validate_excel_data_types_with_df,
+    validate_excel_data_values_table,
+    validate_excel_file_header,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_MAX_CONTEXTS = 16
+DEFAULT_MAX_FRAMES = 8
+DEFAULT_MAX_RESULTS = 64
+
+# Files a request uses when it does not name them (relative to the service's working directory)
+REQUEST_DEFAULTS = {
+    "sheet": None,
+    "mapping_file": "mapping/attration.json",
+    "schema_file": "schemas/Attraction.ql",
+    "template_file": "templates/display-array.template",
+}
+
+# Request keys holding file paths; they must resolve inside the service's root directory
+PATH_KEYS = ("excel_file", "mapping_file", "schema_file", "template_file", "output_file")
+
+class LRUCache:
+    """
+    A thread-safe mapping that keeps the `max_entries` most recently used entries.
+
+    Attributes:
+        - hits (int): Lookups that found their key.
+        - misses (int): Lookups that did not.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Returns the value of `key` (marking it as recently used), or None."""
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key, value):
+        """Stores `value` and evicts the least recently used entries beyond `max_entries`."""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "max_entries": self.max_entries, "hits": self.hits,
+                    "misses": self.misses}
+
+class ValidationService:
+    """
+    Keeps the parsed mappings, schemas and workbooks of a long-running process resident.
+
+    Contexts, DataFrames and results are kept in LRU caches keyed by the
+    SHA-256 of the files they were built from, so a re-uploaded workbook with
+    the same content hits the cache under any name, and an edited one misses
+    it. The hash of a file is only recomputed when its size or modification
+    time changes. The schema indexes are shared through `schema_index`,
+    which builds each distinct schema once.
+
+    Each endpoint method takes the request dictionary (`excel_file`, and
+    optionally `sheet`, `mapping_file`, `schema_file` and `template_file`,
+    see `REQUEST_DEFAULTS`) and returns a JSON-serializable dictionary.
+    The file paths of a request are resolved against `root_dir` (the working
+    directory by default) and may not leave it, so a client can neither read
+    nor write files elsewhere.
+    """
+
+    def __init__(self, max_contexts=DEFAULT_MAX_CONTEXTS, max_frames=DEFAULT_MAX_FRAMES,
+                 max_results=DEFAULT_MAX_RESULTS, root_dir=None):
+        self.root_dir = os.path.realpath(root_dir or os.getcwd())
+        self.contexts = LRUCache(max_contexts)
+        self.frames = LRUCache(max_frames)
+        self.results = LRUCache(max_results)
+        self._hashes = {}
+        self._hash_lock = threading.Lock()
+
+    def file_hash(self, file_path):
+        """Returns the SHA-256 of a file, reusing the last one while its size and modification time are unchanged."""
+        if not file_path:
+            return None
+        path = os.path.abspath(file_path)
+        stat = os.stat(path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        with self._hash_lock:
+            cached = self._hashes.get(path)
+        if cached and cached[0] == stamp:
+            return cached[1]
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as file:
+            for block in iter(lambda: file.read(1024 * 1024), b""):
+                digest.update(block)
+        with self._hash_lock:
+            self._hashes[path] = (stamp, digest.hexdigest())
+        return digest.hexdigest()
+
+    def resolve_path(self, file_path):
+        """
+        Resolves a request path against `root_dir` (symbolic links included).
+
+        Raises:
+            - ValueError: If the path is outside `root_dir`.
+        """
+        path = os.path.realpath(os.path.join(self.root_dir, file_path))
+        if os.path.commonpath([path, self.root_dir]) != self.root_dir:
+            raise ValueError(f"'{file_path}' is outside the service directory.")
+        return path
+
+    def _request(self, request):
+        request = {**REQUEST_DEFAULTS, **request}
+        if not request.get("excel_file"):
+            raise ValueError("The request needs an `excel_file`.")
+        for key in PATH_KEYS:
+            if request.get(key):
+                request[key] = self.resolve_path(request[key])
+        return request
+
+    def _context_key(self, request):
+        rules_file = get_rules_file_path(request["mapping_file"])
+        return (*(self.file_hash(request[key]) for key in ("mapping_file", "schema_file", "template_file")),
+                self.file_hash(rules_file) if os.path.exists(rules_file) else None)
+
+    def load_context(self, request):
+        """Returns the `PipelineContext` of the request's mapping, schema and template."""
+        key = self._context_key(request)
+        context = self.contexts.get(key)
+        if context is None:
+            context = load_pipeline_context(request["mapping_file"], request["schema_file"], request["template_file"])
+            self.contexts.put(key, context)
+        return context
+
+    def load_frame(self, request):
+        """Returns the parsed sheet of the request's workbook. The frame is shared: do not modify it."""
+        check_excel_file_path(request["excel_file"])
+        key = (self.file_hash(request["excel_file"]), request["sheet"])
+        df = self.frames.get(key)
+        if df is None:
+            df = load_excel_data(request["excel_file"], request["sheet"])
+            self.frames.put(key, df)
+        return df
+
+    def _cached_result(self, name, request, compute, *options):
+        """Returns the result of `compute()`, cached under the file hashes of the request and `options`."""
+        key = (name, self.file_hash(request["excel_file"]), request["sheet"], self._context_key(request), *options)
+        result = self.results.get(key)
+        if result is None:
+            result = compute()
+            self.results.put(key, result)
+        return result
+
+    def header(self, request):
+        """
+        Reads the header row only: the columns, their document fields, the row
+        count and the header errors. The rows of a CSV file are counted only
+        when the request sets `count_rows` (see `probe_excel_header`).
+        """
+        request = self._request(request)
+        check_excel_file_path(request["excel_file"])
+        context = self.load_context(request)
+        count_rows = bool(request.get("count_rows"))
+
+        def compute():
+            header = probe_excel_header(request["excel_file"], request["sheet"], count_rows)
+            return {
+                **header,
+                "document_fields": {column: context.column_to_document_field.get(column)
+                                    for column in header["columns"]},
+                "errors": validate_excel_file_header(header["columns"], context),
+            }
+        return self._cached_result("header", request, compute, count_rows)
+
+    def validate(self, request):
+        """
+        Validates the values and types of the sheet.
+
+        Returns:
+            - dict: `rows`, the `errors` (one record per failed check with its
+              `message`, at most `max_errors` when the request sets it) and the `type_errors`.
+        """
+        request = self._request(request)
+        max_errors = request.get("max_errors")
+
+        def compute():
+            context = self.load_context(request)
+            df = self.load_frame(request)
+            rules = context.validation_rules
+            errors = validate_excel_data_values_table(df, rules, max_errors)
+            records = errors.astype(object).where(errors.notna(), None).to_dict("records")
+            for record, message in zip(records, format_validation_errors(errors, rules)):
+                record["message"] = message
+            return {"rows": len(df), "errors": records, "type_errors": validate_excel_data_types_with_df(df, context)}
+        return self._cached_result("validate", request, compute, max_errors)
+
+    def _documents(self, request):
+        """Drops the rows failing value validation, casts the others and builds their documents."""
+        def compute():
+            context = self.load_context(request)
+            df = self.load_frame(request)
+            errors = validate_excel_data_values_table(df, context.validation_rules)
+            df = df[~df.index.isin(errors["row"])]
+            df, coercion_errors = coerce_dataframe_types(df, resolve_target_types(context))
+            return {"rows": len(df) + errors["row"].nunique(), "rejected_rows": int(errors["row"].nunique()),
+                    "coercion_errors": format_coercion_errors(coercion_errors),
+                    "documents": process_excel_data_with_mapping(df, context)}
+        return self._cached_result("documents", request, compute)
+
+    def transform(self, request):
+        """
+        Builds the documents of the rows that pass value validation.
+
+        Returns:
+            - dict: `rows`, `rejected_rows`, `coercion_errors` and the `documents`
+              (the first `limit` of them when the request sets it).
+        """
+        request = self._request(request)
+        result = self._documents(request)
+        limit = request.get("limit")
+        return {**result, "documents": result["documents"][:limit] if limit is not None else result["documents"]}
+
+    def export(self, request):
+        """
+        Writes the documents of `transform` to the request's `output_file`
+        (`output_format`, "js" by default, with the template of the request).
+
+        Returns:
+            - dict: `path` of the written file, the number of `documents` and `rejected_rows`.
+        """
+        request = self._request(request)
+        if not request.get("output_file"):
+            raise ValueError("The export request needs an `output_file`.")
+        context = self.load_context(request)
+        result = self._documents(request)
+        output = write_documents(result["documents"], request["output_file"], request.get("output_format", "js"),
+                                 template_content=context.template_content,
+                                 field_types=get_document_field_types(context))
+        return {**output, "rejected_rows": result["rejected_rows"]}
+
+    def stats(self):
+        """Entries, hits and misses of each cache."""
+        return {"contexts": self.contexts.stats(), "frames": self.frames.stats(), "results": self.results.stats()}
+
+    def clear(self):
+        """Drops every cached context, frame and result."""
+        for cache in (self.contexts, self.frames, self.results):
+            cache.clear()
+        with self._hash_lock:
+            self._hashes.clear()
+        return self.stats()
+
+class ValidationRequestHandler(BaseHTTPRequestHandler):
+    """
+    Routes the HTTP requests to the `ValidationService` of the server.
+
+    `POST /header|/validate|/transform|/export` take a JSON request body;
+    `GET /health` returns the cache statistics and `DELETE /cache` clears
+    them. Responses are JSON, with an `elapsed_ms` timing; invalid requests
+    get a 400 status and an `error` message.
+
+    POST bodies must be sent as `application/json`: browsers send other
+    content types cross-site without a CORS preflight, so a web page could
+    otherwise drive the service. Those requests get a 415 status.
+    """
+
+    endpoints = ("header", "validate", "transform", "export")
+
+    def _respond(self, status, body):
+        payload = json.dumps(body, default=json_default).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _handle(self, action):
+        started = time.perf_counter()
+        try:
+            # Cached results are shared between requests, so the timing goes into a copy
+            body = dict(action())
+            status = 200
+        except (ValueError, KeyError, FileNotFoundError, json.JSONDecodeError) as e:
+            body, status = {"error": f"{type(e).__name__}: {e}"}, 400
+        except Exception as e:
+            logger.exception("Request failed")
+            body, status = {"error": f"{type(e).__name__}: {e}"}, 500
+        body["elapsed_ms"] = (time.perf_counter() - started) * 1000
+        self._respond(status, body)
+
+    def do_GET(self):
+        if urlparse(self.path).path == "/health":
+            self._handle(lambda: {"status": "ok", "cache": self.server.service.stats()})
+        else:
+            self._respond(404, {"error": f"Unknown endpoint {self.path}"})
+
+    def do_DELETE(self):
+        if urlparse(self.path).path == "/cache":
+            self._handle(lambda: {"cache": self.server.service.clear()})
+        else:
+            self._respond(404, {"error": f"Unknown endpoint {self.path}"})
+
+    def do_POST(self):
+        endpoint = urlparse(self.path).path.strip("/")
+        if endpoint not in self.endpoints:
+            self._respond(404, {"error": f"Unknown endpoint {self.path}"})
+            return
+        if self.headers.get_content_type() != "application/json":
+            self._respond(415, {"error": "The request body must be sent as application/json."})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        raw_body = self.rfile.read(length) if length else b"{}"
+        self._handle(lambda: getattr(self.server.service, endpoint)(json.loads(raw_body)))
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+def create_server(host=DEFAULT_HOST, port=DEFAULT_PORT, service=None):
+    """
+    Creates the HTTP server of a `ValidationService` (port 0 picks a free port).
+
+    Requests are handled in threads; call `serve_forever()` to start it and
+    `shutdown()` to stop it.
+
+    Returns:
+        - ThreadingHTTPServer: The server, with the service as its `service` attribute.
+    """
+    server = ThreadingHTTPServer((host, port), ValidationRequestHandler)
+    server.daemon_threads = True
+    server.service = service or ValidationService()
+    return server
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Serve the header probe, validation, transform and export "
+                                                 "with the mappings and workbooks kept in memory.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Interface to listen on (localhost by default).")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--max-frames", type=int, default=DEFAULT_MAX_FRAMES, help="Parsed workbooks kept in memory.")
+    parser.add_argument("--max-results", type=int, default=DEFAULT_MAX_RESULTS, help="Responses kept in memory.")
+    parser.add_argument("--root-dir", default=os.getcwd(),
+                        help="Directory the requested files are read from and written to (working directory by default).")
+    args = parser.parse_args()
+
+    server = create_server(args.host, args.port,
+                           ValidationService(max_frames=args.max_frames, max_results=args.max_results,
+                                             root_dir=args.root_dir))
+    logger.info(f"Validation service listening on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,10 @@
+import atexit
+import os
+import shutil
+import tempfile
+
+# Keep the on-disk caches of the tests (parsed workbooks, spatial indexes) out of ~/.cache
+_CACHE_DIR = tempfile.mkdtemp(prefix="navigatorgpt-tests-")
+atexit.register(shutil.rmtree, _CACHE_DIR, ignore_errors=True)
+os.environ["NAVIGATOR_EXCEL_CACHE_DIR"] = os.path.join(_CACHE_DIR, "excel")
+os.environ["NAVIGATOR_GEO_CACHE_DIR"] = os.path.join(_CACHE_DIR, "geo")
@@ -0,0 +1,64 @@
+import unittest
+import gzip
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(script_dir, '..', 'scripts'))
+
+from batch_runner import load_batch_manifest, run_batch
+
+# Load test configuration
+with open("test_config.json", "r") as config_file:
+    test_config_data = json.load(config_file)
+
+class TestBatchRunner(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        paths = test_config_data["paths"]
+        manifest = {
+            "defaults": {
+                "mapping_file": os.path.abspath(paths["mapping_file"]),
+                "schema_file": os.path.abspath(paths["schema_file"]),
+                "template_file": os.path.abspath(paths["template_file"]),
+            },
+            "jobs": [
+                {"name": "valid", "excel_file": os.path.abspath(paths["excel_data"]), "output_file": "valid.js"},
+                {"name": "invalid", "excel_file": os.path.abspath(paths["excel_validation_data"]),
+                 "output_file": "invalid.ndjson", "output_format": "ndjson", "compression": "gzip"},
+                {"name": "missing", "excel_file": "missing.xlsx", "output_file": "missing.js"},
+            ],
+        }
+        self.manifest_path = os.path.join(self.temp_dir, "manifest.json")
+        with open(self.manifest_path, "w") as file:
+            json.dump(manifest, file)
+
+    def test_load_batch_manifest_applies_defaults(self):
+        jobs = load_batch_manifest(self.manifest_path)
+
+        self.assertEqual([job["name"] for job in jobs], ["valid", "invalid", "missing"])
+        self.assertIsNone(jobs[0]["sheet"])
+        self.assertEqual(jobs[0]["output_file"], os.path.join(self.temp_dir, "valid.js"))
+
+    def test_run_batch_in_process_pool(self):
+        jobs = load_batch_manifest(self.manifest_path)
+
+        reports, summary = run_batch(jobs, max_workers=2)
+
+        self.assertEqual([report["status"] for report in reports], ["ok", "ok", "failed"])
+        self.assertEqual((reports[1]["rows_in"], reports[1]["value_errors"], reports[1]["rows_out"]), (29, 15, 14))
+        with open(os.path.join(self.temp_dir, "valid.js")) as file:
+            self.assertTrue(file.read().startswith("let data = ["))
+        self.assertEqual(reports[1]["output_file"], os.path.join(self.temp_dir, "invalid.ndjson.gz"))
+        with gzip.open(reports[1]["output_file"], "rt") as file:
+            self.assertEqual(len(file.readlines()), 14)
+        self.assertEqual((summary["jobs"], summary["succeeded"], summary["failed"]), (3, 2, 1))
+        self.assertEqual(summary["rows_out"], 191 + 14)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(script_dir, '..', 'scripts'))
+
+from cli import check_files, describe_columns, main
+
+# Load test configuration
+with open("test_config.json", "r") as config_file:
+    test_config_data = json.load(config_file)
+
+class TestCli(unittest.TestCase):
+
+    def setUp(self):
+        self.paths = test_config_data["paths"]
+
+    def test_metadata_commands_do_not_import_pandas(self):
+        code = ("import sys; sys.path.append('scripts'); import cli; "
+                "cli.main(['check']); cli.main(['columns', sys.argv[1]]); "
+                "print(sorted(m for m in ('pandas', 'numpy', 'openpyxl') if m in sys.modules), file=sys.stderr)")
+        result = subprocess.run([sys.executable, "-c", code, self.paths["reference_file"]],
+                                capture_output=True, text=True, check=True)
+        self.assertEqual(result.stderr.strip(), "[]")
+
+    def test_check_files(self):
+        self.assertEqual(check_files(self.paths["excel_data"]), {"errors": [], "missing_optional": []})
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            mapping_file = os.path.join(temp_dir, "mapping.json")
+            with open(mapping_file, "w") as file:
+                file.write("{")
+            hint_file = os.path.join(temp_dir, "hint.txt")
+            with open(hint_file, "w") as file:
+                file.write("REQUIRED_FILE = missing.ql\nOPTIONAL_FILE = missing.geojson\n")
+            result = check_files(mapping_file=mapping_file, hint_file=hint_file)
+        self.assertEqual(result["errors"], ["Missing required file: missing.ql",
+                                            f"{mapping_file}: The file '{mapping_file}' does not contain valid JSON."])
+        self.assertEqual(result["missing_optional"], ["missing.geojson"])
+
+    def test_describe_columns(self):
+        result = describe_columns(self.paths["excel_validation_data"])
+        self.assertEqual((result["row_count"], result["errors"]), (29, []))
+        self.assertEqual(result["document_fields"]["BoroughCode"], "loc.boroughCode")
+
+        # The rows of a CSV file are only counted on request
+        result = describe_columns(self.paths["reference_file"])
+        self.assertIsNone(result["row_count"])
+        self.assertEqual(describe_columns(self.paths["reference_file"], count_rows=True)["row_count"], 10)
+        self.assertTrue(result["errors"][0].startswith("The following columns from Excel are missing in the mapping file"))
+
+    def test_validate_exit_status(self):
+        with open(os.devnull, "w") as devnull:
+            stdout, sys.stdout = sys.stdout, devnull
+            try:
+                self.assertEqual(main(["validate", self.paths["excel_data"]]), 0)
+                self.assertEqual(main(["validate", self.paths["excel_validation_data"], "--max-errors", "1"]), 1)
+            finally:
+                sys.stdout = stdout
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+import unittest
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+import pandas as pd
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(script_dir, '..', 'scripts'))
+
+from file_manager import get_rules_file_path
+from pipeline_context import load_pipeline_context, clear_pipeline_context_cache
+from cross_validation import compile_cross_validation_rules
+from data_validation import format_validation_errors, validate_excel_data_values_table
+from type_coercion import compact_dataframe
+
+# Load test configuration
+with open("test_config.json", "r") as config_file:
+    test_config_data = json.load(config_file)
+
+class TestCrossValidation(unittest.TestCase):
+
+    def setUp(self):
+        clear_pipeline_context_cache()
+        self.context = load_pipeline_context(test_config_data["paths"]["mapping_file"])
+        self.df = pd.DataFrame({
+            "Id": ["6444d14ee7abb0665474a208", "6455b7e44673c82a34f4ecca", "6455b7e44673c82a34f4eccb",
+                   "6455b7e44673c82a34f4eccc"],
+            "BoroughCode": ["MN", "BK", "QN", None],
+            "Borough": ["Manhattan", "Queens", "Queens", None],
+            "PostalCode": ["10001", "10451", "11375", "10001"],
+            "DesignationDate": [pd.Timestamp("1965-10-14"), None, pd.Timestamp("1967-03-15"), None],
+            "LPNumber": ["LP-00001", None, None, None],
+        })
+
+    def evaluate(self, specs):
+        rules = compile_cross_validation_rules(specs, self.context.mapping_data)
+        return [rule["check"](self.df, {}).tolist() for rule in rules]
+
+    def test_expressions(self):
+        results = self.evaluate([
+            {"name": "a", "require": "BoroughCode in ['MN', 'BK']"},
+            {"name": "b", "when": "notnull(PostalCode)", "require": "number(PostalCode) < 11000 or BoroughCode == 'QN'"},
+            {"name": "c", "require": "startswith(PostalCode, ['100', '113'])"},
+            {"name": "d", "require": "not matches(PostalCode, '1000[0-9]') and len(BoroughCode) == 2"},
+            {"name": "e", "when": "notnull(DesignationDate)", "require": "date(DesignationDate) < date('1966-01-01')"},
+        ])
+
+        # A missing value in `require` fails the rule; `in` is a plain membership test
+        self.assertEqual(results[0], [False, False, True, True])
+        self.assertEqual(results[1], [False, False, False, False])
+        self.assertEqual(results[2], [False, True, False, False])
+        self.assertEqual(results[3], [True, False, False, True])
+        self.assertEqual(results[4], [False, False, True, False])
+
+    def test_mapping_rules(self):
+        rules = [rule for rule in self.context.validation_rules if "check" in rule]
+        self.assertEqual([rule["rule"] for rule in rules],
+                         ["boroughMatchesCode", "postalCodeInBorough", "coordinatesInNyc", "designationRequiresLpNumber"])
+        self.assertNotIn("crossValidation", self.context.mapping_data)
+
+        errors = validate_excel_data_values_table(self.df, rules)
+        self.assertEqual(sorted(zip(errors["row"], errors["rule"])), [
+            (1, "boroughMatchesCode"), (1, "postalCodeInBorough"), (2, "designationRequiresLpNumber"),
+        ])
+
+        messages = format_validation_errors(errors, rules)
+        self.assertIn("Id 6455b7e44673c82a34f4ecca has invalid value Queens in column Borough. "
+                      "Borough does not match BoroughCode.", messages)
+
+    def test_results_do_not_depend_on_the_dtypes(self):
+        specs = [
+            {"name": "a", "require": "Borough == 'Manhattan'"},
+            {"name": "b", "require": "BoroughCode != 'QN' and len(LPNumber) == 8"},
+            {"name": "c", "when": "notnull(Borough)", "require": "Borough == dependency(Borough)"},
+        ]
+        expected = self.evaluate(specs)
+        self.assertEqual(expected[0], [False, True, True, True])
+
+        compact, dtypes = compact_dataframe(self.df, self.context)
+        self.assertTrue(dtypes)
+        arrow_strings = self.df.astype({column: "string[pyarrow]"
+                                        for column in ("BoroughCode", "Borough", "PostalCode", "LPNumber")})
+        for frame in (compact, arrow_strings):
+            rules = compile_cross_validation_rules(specs, self.context.mapping_data)
+            self.assertEqual([rule["check"](frame, {}).tolist() for rule in rules], expected)
+
+    def test_rules_are_read_from_the_rules_file(self):
+        self.assertEqual(len(self.context.cross_validation), 4)
+
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        mapping_file = os.path.join(temp_dir, "attration.json")
+        shutil.copy(test_config_data["paths"]["mapping_file"], mapping_file)
+        self.assertEqual(load_pipeline_context(mapping_file).cross_validation, [])
+
+        # A new or edited rules file is picked up by the context cache
+        with open(get_rules_file_path(mapping_file), "w") as file:
+            json.dump({"crossValidation": [{"name": "idLength", "require": "len(Id) == 24"}]}, file)
+        context = load_pipeline_context(mapping_file)
+        self.assertEqual([rule["rule"] for rule in context.validation_rules if "check" in rule], ["idLength"])
+
+    def test_rules_on_missing_columns_are_skipped(self):
+        rules = compile_cross_validation_rules(
+            [{"name": "coordinates", "column": "Latitude", "require": "between(Latitude, 40, 41)"}],
+            self.context.mapping_data)
+        self.assertEqual(rules[0]["columns"], ["Latitude"])
+        self.assertTrue(validate_excel_data_values_table(self.df, rules).empty)
+
+    def test_invalid_rules(self):
+        for spec in [
+            {"name": "a"},
+            {"name": "pattern", "require": "notnull(Id)"},
+            {"name": "b", "require": "eval(Id)"},
+            {"name": "c", "require": "Id.upper() == 'X'"},
+            {"name": "d", "require": "dependency(Id) == 'X'"},
+            {"name": "e", "require": "1 == 1"},
+            {"name": "f", "require": "Id =="},
+        ]:
+            with self.assertRaises(ValueError, msg=spec):
+                compile_cross_validation_rules([spec], self.context.mapping_data)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -14,7 +14,11 @@ from data_validation import (
     validate_excel_data_values_with_df,
     extract_expected_data_types_from_mapping,
     validate_excel_data_values_with_df,
-    cast_dataframe_to_expected_types
+    cast_dataframe_to_expected_types,
+    compile_validation_rules,
+    validate_excel_data_values_table,
+    process_excel_data_with_mapping,
+    validate_excel_file_header
 )
 
 # Set up the logger
@@ -131,6 +135,65 @@ class TestDataValidation(unittest.TestCase):
         except TypeError as e:
            logger.info(f"Error: {e}")
 
+    def test_validate_values_error_table(self):
+        df_invalid_values = load_excel_data(self.invalid_excel_path)
+        rules = compile_validation_rules(self.mapping_data)
+
+        errors = validate_excel_data_values_table(df_invalid_values, rules)
+
+        self.assertEqual(list(errors.columns), ["row", "Id", "column", "rule", "value"])
+        self.assertEqual(errors["rule"].value_counts().to_dict(), {"pattern": 10, "allowedValues": 5})
+        first = errors.iloc[0]
+        self.assertEqual((first["row"], first["Id"], first["column"], first["value"]),
+                         (9, "550cd6d3610bf1c45d848950", "BoroughCode", "XX"))
+
+    def test_validate_values_nested_length_and_nulls(self):
+        df = pd.DataFrame({
+            'Id': ['533cddaf5c9596ef08143d56', None],
+            'Park': ['Park', None],
+            'PostalCode': [None, '1002'],
+        })
+        rules = compile_validation_rules(self.mapping_data)
+
+        errors = validate_excel_data_values_table(df, rules)
+
+        self.assertEqual(
+            list(zip(errors["row"], errors["column"], errors["rule"])),
+            [(0, 'Park', 'minLength'), (1, 'Id', 'isRequired'),
+             (1, 'PostalCode', 'minLength'), (1, 'PostalCode', 'pattern')])
+
+    def test_process_excel_data_with_mapping(self):
+        df = pd.DataFrame({
+            'Id': ['533cddaf5c9596ef08143d56', '533cddaf5c9596ef08143d5a'],
+            'BoroughCode': ['BK', 'XX'],
+            'Title': ['Site A', 'Site B'],
+            'Materials': ['Bronze', None],
+            'Founder': ['  ', 'Gorham Co.'],
+        })
+
+        documents = process_excel_data_with_mapping(df, self.mapping_data)
+
+        self.assertEqual(documents, [
+            {'id': '533cddaf5c9596ef08143d56',
+             'loc': {'boroughCode': 'BK', 'borough': 'Brooklyn'},
+             'inventory': {'materials': 'Bronze'}},
+            {'id': '533cddaf5c9596ef08143d5a',
+             'loc': {'boroughCode': 'XX', 'borough': None},
+             'inventory': {'founder': 'Gorham Co.'}},
+        ])
+
+    def test_process_excel_data_with_mapping_missing_required_column(self):
+        with self.assertRaises(ValueError):
+            process_excel_data_with_mapping(self.df, self.mapping_data)
+
+    def test_validate_excel_file_header(self):
+        self.assertEqual(validate_excel_file_header(self.df_valid.columns.tolist(), self.mapping_data), [])
+
+        errors = validate_excel_file_header(['BoroughCode', 'Tags'], self.mapping_data)
+        self.assertEqual(errors, [
+            "The following columns from Excel are missing in the mapping file: Tags",
+            "The following required columns are missing in the Excel file: Id",
+        ])
 
 if __name__ == "__main__":
     unittest.main()
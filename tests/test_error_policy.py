@@ -0,0 +1,80 @@
+import unittest
+import json
+import os
+import shutil
+import sys
+import tempfile
+from unittest.mock import patch
+
+import pandas as pd
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(script_dir, '..', 'scripts'))
+
+from error_policy import REJECT_REASONS_COLUMN, apply_error_policy
+from data_validation import (
+    compile_validation_rules,
+    format_validation_errors,
+    get_mapping_data,
+    handle_validation_errors,
+    validate_excel_data_values_table,
+)
+from file_manager import load_excel_data
+
+# Load test configuration
+with open("test_config.json", "r") as config_file:
+    test_config_data = json.load(config_file)
+
+class TestErrorPolicy(unittest.TestCase):
+
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+        self.df = load_excel_data(test_config_data["paths"]["excel_validation_data"])
+        self.rules = compile_validation_rules(get_mapping_data(test_config_data["paths"]["mapping_file"]))
+        self.errors = validate_excel_data_values_table(self.df, self.rules)
+        self.messages = format_validation_errors(self.errors, self.rules)
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir)
+
+    def test_fail_fast(self):
+        with self.assertRaises(ValueError):
+            apply_error_policy(self.df, self.errors, "fail-fast", messages=self.messages)
+
+        # Without errors the data passes through
+        df, summary = apply_error_policy(self.df, self.errors.iloc[0:0], "fail-fast")
+        self.assertIs(df, self.df)
+        self.assertEqual(summary["rejected_rows"], 0)
+
+    def test_fail_fast_stops_after_max_errors(self):
+        errors = validate_excel_data_values_table(self.df, self.rules, max_errors=2)
+        self.assertEqual(len(errors), 2)
+
+    def test_quarantine_writes_rejects(self):
+        rejects_path = os.path.join(self.output_dir, "rejects.csv")
+        df, summary = apply_error_policy(self.df, self.errors, "quarantine", rejects_path=rejects_path,
+                                         messages=self.messages)
+
+        rejected_rows = self.errors["row"].nunique()
+        self.assertEqual(len(df), len(self.df) - rejected_rows)
+        self.assertEqual(summary["rejected_rows"], rejected_rows)
+
+        rejects = pd.read_csv(rejects_path)
+        self.assertEqual(len(rejects), rejected_rows)
+        self.assertTrue(rejects[REJECT_REASONS_COLUMN].str.startswith("Id ").all())
+
+    def test_threshold(self):
+        error_rate = 100.0 * self.errors["row"].nunique() / len(self.df)
+        with self.assertRaises(ValueError):
+            apply_error_policy(self.df, self.errors, "threshold", max_error_rate=error_rate - 1)
+
+        df, summary = apply_error_policy(self.df, self.errors, "threshold", max_error_rate=error_rate + 1)
+        self.assertEqual(len(df), len(self.df) - summary["rejected_rows"])
+
+    def test_handle_validation_errors_drops_hex_ids(self):
+        with patch("builtins.input", return_value="1"), patch("builtins.print"):
+            df = handle_validation_errors(self.df, self.messages)
+        self.assertEqual(len(df), len(self.df) - self.errors["Id"].nunique())
+
+if __name__ == '__main__':
+    unittest.main()
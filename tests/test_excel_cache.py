@@ -0,0 +1,86 @@
+import unittest
+import json
+import os
+import shutil
+import sys
+import tempfile
+from unittest import mock
+
+import pandas as pd
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(script_dir, '..', 'scripts'))
+
+from excel_cache import load_excel_with_cache, list_cache_entries, evict_cache, clear_cache
+from file_manager import load_excel_data
+
+# Load test configuration
+with open("test_config.json", "r") as config_file:
+    test_config_data = json.load(config_file)
+
+class TestExcelCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+        environ = mock.patch.dict(os.environ, {"NAVIGATOR_EXCEL_CACHE_DIR": self.cache_dir})
+        environ.start()
+        self.addCleanup(environ.stop)
+
+        self.excel_path = os.path.join(self.cache_dir, "Location-Import_Test.xlsx")
+        shutil.copy(test_config_data["paths"]["excel_data"], self.excel_path)
+        self.reads = 0
+
+    def reader(self, df):
+        def read():
+            self.reads += 1
+            return df.copy()
+        return read
+
+    def test_second_load_is_served_from_cache(self):
+        first = load_excel_data(self.excel_path)
+        second = load_excel_data(self.excel_path)
+
+        pd.testing.assert_frame_equal(first, second)
+        entries = list_cache_entries()
+        self.assertEqual(len(entries), 1)
+        self.assertEqual((entries[0]["format"], entries[0]["rows"]), ("feather", len(first)))
+
+    def test_reader_only_called_on_miss(self):
+        df = pd.read_excel(self.excel_path)
+
+        load_excel_with_cache(self.excel_path, self.reader(df))
+        load_excel_with_cache(self.excel_path, self.reader(df))
+        self.assertEqual(self.reads, 1)
+
+        load_excel_with_cache(self.excel_path, self.reader(df), dtype={"PostalCode": str})
+        self.assertEqual(self.reads, 2)
+
+        os.utime(self.excel_path, ns=(0, 0))
+        load_excel_with_cache(self.excel_path, self.reader(df))
+        self.assertEqual(self.reads, 3)
+
+    def test_mixed_columns_fall_back_to_pickle(self):
+        df = pd.DataFrame({"cast": [1998, "ca. 1917", pd.Timestamp("1987-02-01")]})
+
+        cached = load_excel_with_cache(self.excel_path, self.reader(df))
+        cached_again = load_excel_with_cache(self.excel_path, self.reader(df))
+
+        pd.testing.assert_frame_equal(cached_again, cached)
+        self.assertEqual(list_cache_entries()[0]["format"], "pkl")
+
+    def test_eviction_and_clear(self):
+        df = pd.read_excel(self.excel_path)
+        load_excel_with_cache(self.excel_path, self.reader(df), sheet_name="Sheet1")
+        load_excel_with_cache(self.excel_path, self.reader(df))
+        newest = list_cache_entries()[0]
+
+        removed = evict_cache(newest["bytes"])
+
+        self.assertEqual(len(removed), 1)
+        self.assertEqual([entry["key"] for entry in list_cache_entries()], [newest["key"]])
+        self.assertEqual(clear_cache(), 1)
+        self.assertEqual(list_cache_entries(), [])
+
+if __name__ == "__main__":
+    unittest.main()
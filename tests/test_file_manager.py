@@ -8,6 +8,8 @@ from file_manager import validate_excel_file_path
 from file_manager import validate_mapping_file
 from file_manager import validate_schema_file
 from file_manager import load_excel_data
+from file_manager import load_excel_data_in_chunks
+from file_manager import probe_excel_header
 
 # Set up the logger
 logging.basicConfig(filename='logs/test_log.log', level=logging.INFO)
@@ -51,6 +53,42 @@ class TestFileManager(unittest.TestCase):
         df = load_excel_data(self.valid_excel_path)
         self.assertIsInstance(df, pd.DataFrame, "Expected pandas DataFrame for valid Excel file")
 
+    def test_load_excel_data_in_chunks_matches_full_load(self):
+        chunks = list(load_excel_data_in_chunks(self.valid_excel_path, chunk_size=50))
+
+        self.assertEqual([len(chunk) for chunk in chunks], [50, 50, 50, 41])
+        pd.testing.assert_frame_equal(pd.concat(chunks), load_excel_data(self.valid_excel_path))
+
+    def test_probe_excel_header(self):
+        header = probe_excel_header(self.valid_excel_path)
+        df = load_excel_data(self.valid_excel_path)
+
+        self.assertEqual(header["columns"], df.columns.tolist())
+        self.assertEqual(header["row_count"], len(df))
+        self.assertEqual(header["sheets"], ["Sheet1"])
+
+    def test_probe_excel_header_sheet(self):
+        header = probe_excel_header("data/raw/Location-Import.xlsx", sheet_name="BBL")
+
+        self.assertEqual(header["columns"], ["BBL", "Id"])
+        self.assertEqual(header["row_count"], 67)
+        self.assertEqual(header["sheets"], ["Landmark", "BBL", "Location"])
+
+    def test_probe_excel_header_csv(self):
+        csv_path = "data/test/landmarks_api_Test.csv"
+        header = probe_excel_header(csv_path)
+
+        self.assertEqual(header["columns"], pd.read_csv(csv_path, nrows=0).columns.tolist())
+        self.assertIsNone(header["row_count"])
+        self.assertEqual(probe_excel_header(csv_path, count_rows=True)["row_count"], 10)
+
+    def test_load_excel_data_in_chunks_csv(self):
+        csv_path = "data/raw/landmarks_api_2023_10_01_08_04_09.csv"
+        chunks = list(load_excel_data_in_chunks(csv_path, chunk_size=500))
+
+        self.assertEqual(len(chunks), 3)
+        pd.testing.assert_frame_equal(pd.concat(chunks), load_excel_data(csv_path))
+
 
 
 
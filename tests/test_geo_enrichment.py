@@ -0,0 +1,105 @@
+import unittest
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(script_dir, '..', 'scripts'))
+
+import geo_enrichment
+from geo_enrichment import enrich_locations, load_neighborhood_index, lookup_features
+
+# Load test configuration
+with open("test_config.json", "r") as config_file:
+    test_config_data = json.load(config_file)
+
+class TestGeoEnrichment(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        geo_enrichment._INDEX_CACHE.clear()
+        self.geojson_path = test_config_data["paths"]["geojson_file"]
+        self.mapping_file_path = test_config_data["paths"]["mapping_file"]
+        self.index = load_neighborhood_index(self.geojson_path, self.cache_dir)
+
+    def tearDown(self):
+        geo_enrichment._INDEX_CACHE.clear()
+        shutil.rmtree(self.cache_dir)
+
+    def test_index_is_cached_on_disk(self):
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+        geo_enrichment._INDEX_CACHE.clear()
+        index = load_neighborhood_index(self.geojson_path, self.cache_dir)
+        self.assertEqual(index["properties"]["neighborhood"].tolist(), ["Central Park", "Prospect Park"])
+
+    def test_lookup_features(self):
+        latitudes = [40.7812, 40.6602, 40.7812, 40.0, None]
+        longitudes = [-73.9665, -73.9690, -73.9665, -74.0, -73.9665]
+
+        positions = lookup_features(self.index, latitudes, longitudes)
+
+        self.assertEqual(positions.tolist(), [0, 1, 0, -1, -1])
+        # Duplicate coordinates are queried once
+        self.assertEqual(len(self.index["memo"]), 3)
+
+    def test_enrich_locations(self):
+        df = pd.DataFrame({
+            "Id": ["a", "b", "c"],
+            "Latitude": [40.7812, 40.6602, np.nan],
+            "Longitude": [-73.9665, -73.9690, np.nan],
+            "Neighborhood": [None, "Park Slope", None],
+        })
+
+        enriched, matched = enrich_locations(df, self.index, self.mapping_file_path)
+
+        self.assertEqual(matched, 2)
+        self.assertEqual(enriched["Neighborhood"].tolist(), ["Central Park", "Park Slope", None])
+        self.assertEqual(enriched["BoroughCode"].tolist()[:2], ["MN", "BK"])
+        self.assertTrue(pd.isna(enriched["BoroughCode"][2]))
+
+    def test_enrich_locations_uses_the_mapped_columns(self):
+        with open(self.mapping_file_path) as file:
+            mapping_data = json.load(file)
+        mapping_data["Neighborhood"]["column"] = "Area"
+        mapping_data["BoroughCode"]["column"] = "BoroCd"
+        mapping_data["Borough"]["dependency"]["fieldName"] = "BoroCd"
+        df = pd.DataFrame({"Id": ["a"], "Latitude": [40.7812], "Longitude": [-73.9665]})
+
+        enriched, _ = enrich_locations(df, self.index, mapping_data)
+
+        self.assertEqual(enriched[["Area", "BoroCd"]].values.tolist(), [["Central Park", "MN"]])
+        self.assertNotIn("Neighborhood", enriched.columns)
+
+    def test_enrich_locations_without_features(self):
+        geojson_path = os.path.join(self.cache_dir, "empty.geojson")
+        with open(geojson_path, "w") as file:
+            json.dump({"type": "FeatureCollection", "features": []}, file)
+        df = pd.DataFrame({"Id": ["a"], "Latitude": [40.7812], "Longitude": [-73.9665], "Neighborhood": ["Harlem"]})
+
+        enriched, matched = enrich_locations(df, load_neighborhood_index(geojson_path, self.cache_dir),
+                                             self.mapping_file_path)
+
+        self.assertEqual(matched, 0)
+        self.assertEqual(enriched["Neighborhood"].tolist(), ["Harlem"])
+        self.assertTrue(enriched["BoroughCode"].isna().all())
+
+    def test_border_points_match_the_first_feature(self):
+        square = lambda x0: {"type": "Polygon", "coordinates": [[[x0, 0], [x0 + 2, 0], [x0 + 2, 2], [x0, 2], [x0, 0]]]}
+        geojson_path = os.path.join(self.cache_dir, "squares.geojson")
+        with open(geojson_path, "w") as file:
+            json.dump({"type": "FeatureCollection", "features": [
+                {"type": "Feature", "geometry": square(x0), "properties": {"neighborhood": str(x0)}}
+                for x0 in range(-40, 1)]}, file)
+
+        # x = 0 is in the squares 38 to 40 (on the border of 38 and 40), x = -1.5 in 37 and 38
+        index = load_neighborhood_index(geojson_path, self.cache_dir)
+        self.assertEqual(lookup_features(index, [1, 1], [0, -1.5]).tolist(), [38, 37])
+
+if __name__ == '__main__':
+    unittest.main()
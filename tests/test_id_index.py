@@ -0,0 +1,90 @@
+import unittest
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(script_dir, '..', 'scripts'))
+
+from id_index import (
+    bloom_filter_contains,
+    build_bloom_filter,
+    check_object_ids,
+    find_duplicate_ids,
+    format_id_errors,
+    get_reference_id_index,
+)
+from type_coercion import decode_object_ids, pack_object_ids
+
+# Load test configuration
+with open("test_config.json", "r") as config_file:
+    test_config_data = json.load(config_file)
+
+class TestIdIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.index_dir)
+        self.df = pd.DataFrame({"Id": [
+            "6444d14ee7abb0665474a208", "6455B7E44673C82A34F4ECCA", "6444d14ee7abb0665474a208",
+            "ffffffffffffffffffffffff", None, "not-an-id",
+        ]})
+
+    def test_decode_object_ids(self):
+        ids, valid = decode_object_ids(self.df["Id"])
+        self.assertEqual(valid.tolist(), [True, True, True, True, False, False])
+        self.assertEqual(ids[0], bytes.fromhex("6444d14ee7abb0665474a208"))
+        self.assertEqual(ids[1], bytes.fromhex("6455b7e44673c82a34f4ecca"))
+
+        # Packed ids decode to the same bytes
+        packed_ids, packed_valid = decode_object_ids(pack_object_ids(pd.Series(["6444d14ee7abb0665474a208", None])))
+        self.assertEqual((packed_ids[0], packed_valid.tolist()), (ids[0], [True, False]))
+
+    def test_find_duplicate_ids_across_chunks(self):
+        ids, valid = decode_object_ids(self.df["Id"])
+        duplicates, seen = find_duplicate_ids(ids[:3], valid[:3])
+        self.assertEqual(duplicates.tolist(), [False, False, True])
+        self.assertEqual(len(seen), 2)
+
+        duplicates, seen = find_duplicate_ids(ids[3:], valid[3:], seen)
+        self.assertEqual(duplicates.tolist(), [False, False, False])
+        duplicates, seen = find_duplicate_ids(ids[1:2], valid[1:2], seen)
+        self.assertEqual(duplicates.tolist(), [True])
+        self.assertEqual(len(seen), 3)
+
+    def test_bloom_filter_has_no_false_negatives(self):
+        rng = np.random.default_rng(0)
+        ids = np.unique(rng.integers(0, 256, size=(10000, 12), dtype=np.uint8).view("S12").ravel())
+        bloom = build_bloom_filter(ids)
+        self.assertTrue(bloom_filter_contains(bloom, ids).all())
+        others = rng.integers(0, 256, size=(10000, 12), dtype=np.uint8).view("S12").ravel()
+        self.assertLess(bloom_filter_contains(bloom, others).mean(), 0.03)
+
+    def test_reference_index_from_csv_and_dump(self):
+        index = get_reference_id_index(test_config_data["paths"]["reference_file"], self.index_dir)
+        self.assertEqual(len(index), 10)
+        self.assertTrue(os.path.exists(os.path.join(self.index_dir, "ids.npy")))
+        # The second call opens the stored index
+        self.assertEqual(get_reference_id_index(test_config_data["paths"]["reference_file"],
+                                                self.index_dir).metadata, index.metadata)
+
+        errors, _ = check_object_ids(self.df, index)
+        self.assertEqual(list(zip(errors["row"], errors["rule"])), [(2, "uniqueId"), (3, "referencedId")])
+        self.assertEqual(format_id_errors(errors)[1],
+                         "Id ffffffffffffffffffffffff has invalid value ffffffffffffffffffffffff in column Id. "
+                         "Id is not in the reference id set.")
+
+        dump_path = os.path.join(self.index_dir, "ids.json")
+        with open(dump_path, "w") as file:
+            file.write('{"_id": {"$oid": "6444d14ee7abb0665474a208"}}\n{"_id": {"$oid": "ffffffffffffffffffffffff"}}\n')
+        errors, _ = check_object_ids(self.df, get_reference_id_index(dump_path))
+        self.assertEqual(list(zip(errors["row"], errors["rule"])), [(1, "referencedId"), (2, "uniqueId")])
+
+
+if __name__ == '__main__':
+    unittest.main()
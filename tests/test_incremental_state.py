@@ -0,0 +1,73 @@
+import unittest
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(script_dir, '..', 'scripts'))
+
+from file_manager import load_excel_data
+from incremental_state import (
+    compute_row_fingerprints,
+    select_changed_rows,
+    save_fingerprints,
+)
+
+# Load test configuration
+with open("test_config.json", "r") as config_file:
+    test_config_data = json.load(config_file)
+
+class TestIncrementalState(unittest.TestCase):
+
+    def setUp(self):
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        self.state_path = os.path.join(temp_dir, "state.db")
+        self.mapping_file_path = test_config_data["paths"]["mapping_file"]
+        self.df = load_excel_data(test_config_data["paths"]["excel_data"])
+
+    def test_fingerprints_ignore_inferred_dtype(self):
+        as_text = self.df.astype({"PostalCode": str})
+        as_float = self.df.astype({"PostalCode": float})
+        fingerprints = compute_row_fingerprints(self.df, self.mapping_file_path)["fingerprint"]
+
+        for frame in (as_text, as_float):
+            self.assertTrue(fingerprints.equals(compute_row_fingerprints(frame, self.mapping_file_path)["fingerprint"]))
+
+    def test_missing_values_differ_from_text(self):
+        df = self.df.iloc[[0, 0, 0]].assign(City=[None, "None", ""])
+
+        fingerprints = compute_row_fingerprints(df, self.mapping_file_path)["fingerprint"]
+        self.assertEqual(fingerprints.nunique(), 3)
+
+    def test_fingerprints_depend_on_the_mapping(self):
+        with open(self.mapping_file_path) as file:
+            mapping_data = json.load(file)
+        fingerprints = compute_row_fingerprints(self.df, mapping_data)["fingerprint"]
+
+        mapping_data["Neighborhood"]["documentField"] = "loc.area"
+        changed = compute_row_fingerprints(self.df, mapping_data)["fingerprint"]
+        self.assertFalse((fingerprints == changed).any())
+
+    def test_only_changed_rows_are_selected(self):
+        changed, diff, fingerprints = select_changed_rows(self.df, self.state_path, "test", self.mapping_file_path)
+        self.assertEqual(len(changed), len(self.df))
+        save_fingerprints(self.state_path, "test", fingerprints, diff["deleted"])
+
+        refreshed = self.df.drop(index=[0, 1]).copy()
+        refreshed.loc[5, "Neighborhood"] = "Harlem"
+        changed, diff, fingerprints = select_changed_rows(refreshed, self.state_path, "test", self.mapping_file_path)
+
+        self.assertEqual(changed.index.tolist(), [5])
+        self.assertEqual(diff["unchanged_count"], len(self.df) - 3)
+        self.assertEqual(sorted(diff["deleted"]), sorted(self.df.loc[[0, 1], "Id"]))
+
+        save_fingerprints(self.state_path, "test", fingerprints.loc[changed.index], diff["deleted"])
+        changed, diff, _ = select_changed_rows(refreshed, self.state_path, "test", self.mapping_file_path)
+        self.assertTrue(changed.empty)
+        self.assertEqual(diff["deleted"], [])
+
+if __name__ == "__main__":
+    unittest.main()
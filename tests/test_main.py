@@ -0,0 +1,122 @@
+import unittest
+import json
+import os
+import shutil
+import sys
+import tempfile
+from unittest import mock
+
+import mongomock
+import pandas as pd
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(script_dir, '..', 'scripts'))
+
+import main
+from file_manager import get_rules_file_path, load_excel_data
+
+# Load test configuration
+with open("test_config.json", "r") as config_file:
+    test_config_data = json.load(config_file)
+
+class TestMain(unittest.TestCase):
+    """Runs `main.main` in a temporary working directory holding the workflow files."""
+
+    def setUp(self):
+        paths = test_config_data["paths"]
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        for source, target in ((paths["mapping_file"], main.MAPPING_FILE_PATH),
+                               (get_rules_file_path(paths["mapping_file"]), get_rules_file_path(main.MAPPING_FILE_PATH)),
+                               (paths["schema_file"], main.SCHEMA_FILE_PATH),
+                               (paths["template_file"], main.TEMPLATE_PATH),
+                               (paths["geojson_file"], "neighborhoods.geojson")):
+            shutil.copy(source, os.path.join(self.temp_dir, target))
+        self.use_workbook(paths["excel_data"])
+
+        cwd = os.getcwd()
+        os.chdir(self.temp_dir)
+        self.addCleanup(os.chdir, cwd)
+
+    def use_workbook(self, excel_path):
+        # The paths of test_config.json are relative to the repository
+        shutil.copy(os.path.join(script_dir, '..', excel_path), os.path.join(self.temp_dir, main.EXCEL_FILE_PATH))
+
+    def read_output(self):
+        with open(main.OUTPUT_JS_PATH, "rb") as file:
+            return file.read()
+
+    def test_geojson_enrichment_with_coordinate_columns(self):
+        df = load_excel_data(main.EXCEL_FILE_PATH).head(3).assign(
+            Neighborhood=None, Latitude=[40.7812, 40.6602, None], Longitude=[-73.9665, -73.9690, None])
+        df.to_excel(os.path.join(self.temp_dir, main.EXCEL_FILE_PATH), index=False)
+
+        for stream in (False, True):
+            report = main.main(stream=stream, geojson_path="neighborhoods.geojson")
+            self.assertEqual(report["stages"]["enrich_locations"]["rows_out"], 3)
+            output = self.read_output().decode()
+            self.assertEqual((output.count('"neighborhood": "Central Park"'),
+                              output.count('"neighborhood": "Prospect Park"'), output.count('"neighborhood": null')),
+                             (1, 1, 1))
+
+        # Without a GeoJSON file the coordinates are columns missing in the mapping
+        with self.assertRaises(ValueError):
+            main.main()
+
+    def test_streamed_output_matches_in_memory_output(self):
+        main.main()
+        expected = self.read_output()
+
+        for chunk_size in (1, 7, 50, 1000):
+            for pipelined in (False, True):
+                report = main.main(stream=True, chunk_size=chunk_size, pipelined=pipelined)
+                self.assertEqual(self.read_output(), expected, (chunk_size, pipelined))
+                self.assertEqual(report["stages"]["save_output"]["rows_out"], 191)
+
+    def test_failed_stage_resumes_from_its_checkpoint(self):
+        main.main()
+        expected = self.read_output()
+        os.remove(main.OUTPUT_JS_PATH)
+
+        with mock.patch.object(main, "process_excel_data_with_mapping", side_effect=RuntimeError("transform failed")):
+            with self.assertRaises(RuntimeError):
+                main.main(checkpoint_dir="checkpoints")
+        self.assertFalse(os.path.exists(main.OUTPUT_JS_PATH))
+
+        report = main.main(checkpoint_dir="checkpoints")
+        self.assertEqual(report["stages"]["coerce_types"]["checkpoint"], "resumed")
+        self.assertNotIn("load_excel_data", report["stages"])
+        self.assertEqual(self.read_output(), expected)
+        self.assertEqual(os.listdir("checkpoints"), [])
+
+    def test_threshold_is_checked_over_the_whole_stream(self):
+        self.use_workbook(test_config_data["paths"]["excel_validation_data"])
+
+        # 15 of the 29 rows are rejected; some chunks of 5 rows fail entirely
+        main.main(error_policy="threshold", max_error_rate=55)
+        expected = self.read_output()
+        for pipelined in (False, True):
+            main.main(stream=True, chunk_size=5, pipelined=pipelined, error_policy="threshold", max_error_rate=55)
+            self.assertEqual(self.read_output(), expected)
+
+    def test_threshold_abort_keeps_the_output_and_mongodb(self):
+        main.main()
+        previous = self.read_output()
+        self.use_workbook(test_config_data["paths"]["excel_validation_data"])
+        client = mongomock.MongoClient()
+
+        with mock.patch.object(main, "get_mongo_client", lambda uri: client):
+            for stream, pipelined in ((False, False), (True, False), (True, True)):
+                with self.assertRaisesRegex(ValueError, "above the 40% threshold"):
+                    main.main(stream=stream, chunk_size=5, pipelined=pipelined, error_policy="threshold",
+                              max_error_rate=40, mongodb_uri="mongodb://localhost", database_name="test")
+                self.assertEqual(self.read_output(), previous)
+                self.assertEqual(client["test"]["attractions"].count_documents({}), 0)
+
+            # Within the threshold the spooled documents are loaded once the output is written
+            main.main(stream=True, chunk_size=5, error_policy="threshold", max_error_rate=55,
+                      mongodb_uri="mongodb://localhost", database_name="test")
+        self.assertEqual(client["test"]["attractions"].count_documents({}), 14)
+
+if __name__ == '__main__':
+    unittest.main()
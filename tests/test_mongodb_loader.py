@@ -0,0 +1,112 @@
+import unittest
+import json
+import os
+import sys
+from datetime import datetime
+
+import mongomock
+from bson.int64 import Int64
+from bson.objectid import ObjectId
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(script_dir, '..', 'scripts'))
+
+from mongodb_loader import (
+    build_upsert_operation,
+    get_document_field_types,
+    get_document_paths,
+    load_documents_to_mongodb,
+)
+
+# Load test configuration
+with open("test_config.json", "r") as config_file:
+    test_config_data = json.load(config_file)
+
+class TestMongoDBLoader(unittest.TestCase):
+
+    def setUp(self):
+        self.mapping_file_path = test_config_data["paths"]["mapping_file"]
+        self.collection = mongomock.MongoClient().navigator.attractions
+        self.documents = [
+            {
+                "id": f"533cddaf5c9596ef08143d{index:02x}",
+                "loc": {"boroughCode": "MN", "bbl": "1000477501"},
+                "landmark": {"lpNumber": f"LP-{index:05d}", "designationDate": "1969-08-26"},
+            }
+            for index in range(25)
+        ]
+
+    def test_build_upsert_operation_converts_types(self):
+        field_types = get_document_field_types(self.mapping_file_path)
+
+        operation = build_upsert_operation(self.documents[0], field_types)
+
+        self.assertEqual(operation._filter, {"_id": ObjectId("533cddaf5c9596ef08143d00")})
+        fields = operation._doc["$set"]
+        self.assertEqual(fields["loc.boroughCode"], "MN")
+        self.assertIsInstance(fields["loc.bbl"], Int64)
+        self.assertEqual(fields["landmark.designationDate"], datetime(1969, 8, 26))
+
+        document = {**self.documents[0], "loc": {"bbl": "9007199254740993.0"}}
+        self.assertEqual(build_upsert_operation(document, field_types)._doc["$set"]["loc.bbl"],
+                         Int64(9007199254740993))
+
+    def test_load_documents_in_batches(self):
+        stats = load_documents_to_mongodb(iter(self.documents), self.collection, self.mapping_file_path,
+                                          batch_size=10, queue_size=1)
+
+        self.assertEqual((stats["documents"], stats["batches"], stats["upserted"]), (25, 3, 25))
+        self.assertEqual(self.collection.count_documents({}), 25)
+        stored = self.collection.find_one({"_id": ObjectId("533cddaf5c9596ef08143d01")})
+        self.assertEqual(stored["landmark"]["lpNumber"], "LP-00001")
+
+        self.collection.update_one({"_id": ObjectId("533cddaf5c9596ef08143d01")}, {"$set": {"title": "Kept"}})
+        stats = load_documents_to_mongodb(self.documents, self.collection, self.mapping_file_path, batch_size=10)
+
+        self.assertEqual((stats["matched"], stats["upserted"]), (25, 0))
+        self.assertEqual(self.collection.find_one({"_id": ObjectId("533cddaf5c9596ef08143d01")})["title"], "Kept")
+
+    def test_delta_load_writes_only_changed_fields(self):
+        paths = get_document_paths(self.mapping_file_path, ["Id", "BoroughCode", "BBL", "LPNumber", "DesignationDate"])
+        self.assertEqual(paths, ["id", "loc.boroughCode", "loc.borough", "landmark.lpNumber",
+                                 "landmark.designationDate", "loc.bbl"])
+        stats = load_documents_to_mongodb(self.documents, self.collection, self.mapping_file_path, batch_size=10,
+                                          delta=True, paths=paths)
+        self.assertEqual((stats["upserted"], stats["unchanged"]), (25, 0))
+
+        # A repeated import writes nothing
+        stats = load_documents_to_mongodb(self.documents, self.collection, self.mapping_file_path, batch_size=10,
+                                          delta=True, paths=paths)
+        self.assertEqual((stats["batches"], stats["unchanged"], stats["changed_fields"]), (0, 25, {}))
+
+        self.collection.update_one({"_id": ObjectId("533cddaf5c9596ef08143d01")},
+                                   {"$set": {"landmark.lpNumber": "LP-99999", "title": "Kept"}})
+        self.documents[2]["loc"]["bbl"] = "1000477502"
+        del self.documents[3]["landmark"]["designationDate"]
+        stats = load_documents_to_mongodb(self.documents, self.collection, self.mapping_file_path, batch_size=10,
+                                          delta=True, paths=paths)
+
+        self.assertEqual((stats["modified"], stats["unchanged"]), (3, 22))
+        self.assertEqual(stats["changed_fields"],
+                         {"landmark.lpNumber": 1, "loc.bbl": 1, "landmark.designationDate": 1})
+        stored = self.collection.find_one({"_id": ObjectId("533cddaf5c9596ef08143d01")})
+        self.assertEqual((stored["landmark"]["lpNumber"], stored["title"]), ("LP-00001", "Kept"))
+        self.assertEqual(self.collection.find_one({"_id": ObjectId("533cddaf5c9596ef08143d02")})["loc"]["bbl"],
+                         Int64(1000477502))
+        self.assertNotIn("designationDate",
+                         self.collection.find_one({"_id": ObjectId("533cddaf5c9596ef08143d03")})["landmark"])
+
+    def test_delta_load_of_a_repeated_id(self):
+        load_documents_to_mongodb(self.documents, self.collection, self.mapping_file_path)
+        original = self.documents[1]
+        edited = {**original, "loc": {**original["loc"], "bbl": "1000477502"}}
+
+        # The last document of the Id wins, across batches and within a batch
+        for batch_size in (1, 10):
+            load_documents_to_mongodb([edited, *self.documents[2:5], original], self.collection,
+                                      self.mapping_file_path, batch_size=batch_size, queue_size=8, delta=True)
+            self.assertEqual(self.collection.find_one({"_id": ObjectId(original["id"])})["loc"]["bbl"],
+                             Int64(int(original["loc"]["bbl"])))
+
+if __name__ == "__main__":
+    unittest.main()
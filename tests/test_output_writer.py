@@ -0,0 +1,104 @@
+import unittest
+import gzip
+import json
+import os
+import shutil
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(script_dir, '..', 'scripts'))
+
+from output_writer import to_extended_json, timestamped_output_path, write_documents
+from file_manager import load_template_file, save_processed_data_to_template
+
+# Load test configuration
+with open("test_config.json", "r") as config_file:
+    test_config_data = json.load(config_file)
+
+class TestOutputWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+        self.template_content = load_template_file(test_config_data["paths"]["template_file"])
+        self.documents = [
+            {"id": "533cddaf5c9596ef08143d56", "loc": {"boroughCode": "MN", "bbl": "1011110001"}},
+            {"id": "533cddaf5c9596ef08143d5a", "loc": {"boroughCode": "BK", "bbl": None}},
+        ]
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir)
+
+    def test_js_output_matches_template(self):
+        legacy_path = os.path.join(self.output_dir, "legacy.js")
+        save_processed_data_to_template(self.documents, self.template_content, legacy_path)
+
+        output = write_documents(iter(self.documents), os.path.join(self.output_dir, "output.js"),
+                                 template_content=self.template_content)
+
+        self.assertEqual(output["documents"], 2)
+        with open(legacy_path, 'r') as legacy, open(output["path"], 'r') as written:
+            self.assertEqual(written.read(), legacy.read())
+
+    def test_failed_write_keeps_previous_output(self):
+        output_path = os.path.join(self.output_dir, "output.js")
+        write_documents(self.documents, output_path, template_content=self.template_content)
+        with open(output_path, 'r') as file:
+            previous = file.read()
+
+        def failing_documents():
+            yield self.documents[0]
+            raise ValueError("chunk 2 failed validation")
+
+        with self.assertRaises(ValueError):
+            write_documents(failing_documents(), output_path, template_content=self.template_content)
+        with open(output_path, 'r') as file:
+            self.assertEqual(file.read(), previous)
+        self.assertEqual(os.listdir(self.output_dir), ["output.js"])
+
+    def test_ndjson_gzip_output(self):
+        output = write_documents(self.documents, os.path.join(self.output_dir, "output.ndjson"),
+                                 output_format="ndjson", compression="gzip")
+
+        self.assertTrue(output["path"].endswith(".ndjson.gz"))
+        with gzip.open(output["path"], 'rt') as file:
+            self.assertEqual([json.loads(line) for line in file], self.documents)
+
+    def test_json_output_serializes_timestamps(self):
+        output = write_documents([{"id": "1", "date": pd.Timestamp("2023-05-01")}],
+                                 os.path.join(self.output_dir, "output.json"), output_format="json")
+
+        with open(output["path"], 'r') as file:
+            self.assertEqual(json.load(file), [{"id": "1", "date": "2023-05-01T00:00:00"}])
+
+    def test_to_extended_json(self):
+        document = {"id": "533cddaf5c9596ef08143d56", "loc": {"bbl": "1011110001"},
+                    "landmark": {"designationDate": pd.Timestamp("1974-04-16")}}
+        field_types = {"loc.bbl": "long", "landmark.designationDate": "date"}
+
+        self.assertEqual(to_extended_json(document, field_types), {
+            "_id": {"$oid": "533cddaf5c9596ef08143d56"},
+            "loc": {"bbl": {"$numberLong": "1011110001"}},
+            "landmark": {"designationDate": {"$date": "1974-04-16T00:00:00.000Z"}},
+        })
+
+        # Dates with an offset are written in UTC
+        for value in ("1974-04-16T02:30:00+02:00", pd.Timestamp("1974-04-16T02:30:00+02:00"),
+                      datetime(1974, 4, 16, 2, 30, tzinfo=timezone(timedelta(hours=2)))):
+            self.assertEqual(to_extended_json({"landmark": {"designationDate": value}}, field_types),
+                             {"landmark": {"designationDate": {"$date": "1974-04-16T00:30:00.000Z"}}})
+
+        # Longs above 2**53 keep every digit
+        for value in ("9007199254740993", " 9007199254740993.0", 9007199254740993):
+            self.assertEqual(to_extended_json({"loc": {"bbl": value}}, field_types)["loc"]["bbl"],
+                             {"$numberLong": "9007199254740993"})
+
+    def test_timestamped_output_path(self):
+        self.assertEqual(timestamped_output_path("out/output_array.js", datetime(2023, 10, 5, 14, 3, 22)),
+                         "out/output_array.10-05-2023.14.03.22.js")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(script_dir, '..', 'scripts'))
+
+from pipeline_context import (
+    PipelineContext,
+    load_pipeline_context,
+    clear_pipeline_context_cache,
+)
+from data_validation import (
+    extract_expected_data_types_from_mapping,
+    validate_excel_data_values_with_df,
+)
+from file_manager import load_excel_data
+
+# Load test configuration
+with open("test_config.json", "r") as config_file:
+    test_config_data = json.load(config_file)
+
+class TestPipelineContext(unittest.TestCase):
+
+    def setUp(self):
+        clear_pipeline_context_cache()
+        self.mapping_file_path = test_config_data["paths"]["mapping_file"]
+        self.schema_file_path = test_config_data["paths"]["schema_file"]
+        self.template_path = test_config_data["paths"]["template_file"]
+
+    def test_derived_indexes(self):
+        context = load_pipeline_context(self.mapping_file_path, self.schema_file_path, self.template_path)
+
+        self.assertEqual(context.column_to_document_field["BoroughCode"], "loc.boroughCode")
+        self.assertEqual(context.column_to_dtype["BBL"], "long")
+        self.assertEqual(context.required_columns, {"Id"})
+        self.assertEqual(context.dependency_tables["Borough"][0], "BoroughCode")
+        self.assertTrue(context.compiled_patterns["PostalCode"].fullmatch("10021"))
+        self.assertIn("type Attraction", context.schema_contents)
+        self.assertIn("{{data}}", context.template_content)
+
+    def test_context_is_cached_until_file_changes(self):
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        mapping_copy = os.path.join(temp_dir, "attration.json")
+        shutil.copy(self.mapping_file_path, mapping_copy)
+
+        first = load_pipeline_context(mapping_copy)
+        self.assertIs(load_pipeline_context(mapping_copy), first)
+
+        with open(mapping_copy, "w") as file:
+            json.dump({"Id": first.mapping_data["Id"]}, file)
+        os.utime(mapping_copy, ns=(0, 0))
+
+        reloaded = load_pipeline_context(mapping_copy)
+        self.assertIsNot(reloaded, first)
+        self.assertEqual(reloaded.mapping_columns, ["Id"])
+
+    def test_helpers_accept_context(self):
+        context = load_pipeline_context(self.mapping_file_path)
+        df = load_excel_data(test_config_data["paths"]["excel_validation_data"])
+
+        self.assertIsInstance(context, PipelineContext)
+        self.assertEqual(extract_expected_data_types_from_mapping(context),
+                         extract_expected_data_types_from_mapping(self.mapping_file_path))
+        self.assertEqual(validate_excel_data_values_with_df(df, context),
+                         validate_excel_data_values_with_df(df, self.mapping_file_path))
+
+if __name__ == "__main__":
+    unittest.main()
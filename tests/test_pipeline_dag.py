@@ -0,0 +1,100 @@
+import unittest
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(script_dir, '..', 'scripts'))
+
+from pipeline_dag import PipelineGraph, compute_run_key
+from file_manager import load_excel_data
+from run_report import RunReport
+
+# Load test configuration
+with open("test_config.json", "r") as config_file:
+    test_config_data = json.load(config_file)
+
+class TestPipelineGraph(unittest.TestCase):
+
+    def setUp(self):
+        self.checkpoint_dir = tempfile.mkdtemp()
+        self.excel_file_path = test_config_data["paths"]["excel_data"]
+        self.calls = []
+
+    def tearDown(self):
+        shutil.rmtree(self.checkpoint_dir)
+
+    def build_graph(self, run_key="run", fail=False):
+        graph = PipelineGraph(RunReport(), self.checkpoint_dir, run_key)
+
+        def stage(name, func):
+            def run(*arguments):
+                self.calls.append(name)
+                return func(*arguments)
+            return run
+
+        def transform(df):
+            if fail:
+                raise RuntimeError("transform failed")
+            return df.head(3)
+
+        graph.add_stage("load", stage("load", lambda: load_excel_data(self.excel_file_path)), checkpoint=True)
+        graph.add_stage("filter", stage("filter", lambda df: df.head(5)), ["load"], checkpoint=True)
+        graph.add_stage("unused", stage("unused", lambda df: len(df)), ["load"])
+        graph.add_stage("transform", stage("transform", transform), ["filter"])
+        return graph
+
+    def test_lazy_evaluation(self):
+        graph = self.build_graph()
+        results = graph.run("transform")
+
+        self.assertEqual(len(results["transform"]), 3)
+        self.assertEqual(self.calls, ["load", "filter", "transform"])
+        self.assertEqual(graph.report.stages["filter"]["rows_in"], len(results["load"]))
+
+        # Evaluated stages are not evaluated again
+        graph.run("transform", "unused")
+        self.assertEqual(self.calls, ["load", "filter", "transform", "unused"])
+
+    def test_independent_stages_run_concurrently(self):
+        barrier = threading.Barrier(2, timeout=5)
+        graph = PipelineGraph(max_workers=2)
+        graph.add_stage("source", lambda: 1)
+        graph.add_stage("left", lambda value: barrier.wait() is not None and value, ["source"])
+        graph.add_stage("right", lambda value: barrier.wait() is not None and value, ["source"])
+
+        # Each stage waits for the other one, so they only finish if they overlap
+        results = graph.run("left", "right")
+        self.assertEqual((results["left"], results["right"]), (1, 1))
+
+    def test_resume_from_checkpoint(self):
+        with self.assertRaises(RuntimeError):
+            self.build_graph(fail=True).run("transform")
+
+        self.calls.clear()
+        graph = self.build_graph()
+        results = graph.run("transform")
+
+        self.assertEqual(graph.resumed, ["filter"])
+        self.assertEqual(self.calls, ["transform"])
+        self.assertEqual(len(results["transform"]), 3)
+        self.assertEqual(graph.report.stages["filter"]["checkpoint"], "resumed")
+
+        graph.clear_checkpoints()
+        self.assertEqual(os.listdir(self.checkpoint_dir), [])
+
+    def test_changed_inputs_discard_checkpoints(self):
+        run_key = compute_run_key([self.excel_file_path], {"policy": "quarantine"})
+        self.build_graph(run_key).run("filter")
+
+        self.calls.clear()
+        other_key = compute_run_key([self.excel_file_path], {"policy": "fail-fast"})
+        self.assertNotEqual(run_key, other_key)
+        self.build_graph(other_key).run("filter")
+        self.assertEqual(self.calls, ["load", "filter"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+import json
+import os
+import sys
+import threading
+import time
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(script_dir, '..', 'scripts'))
+
+from pipelined_io import run_pipelined
+from file_manager import load_excel_data_in_chunks
+
+# Load test configuration
+with open("test_config.json", "r") as config_file:
+    test_config_data = json.load(config_file)
+
+class TestPipelinedIO(unittest.TestCase):
+
+    def test_results_keep_source_order(self):
+        timings = {}
+        chunks = load_excel_data_in_chunks(test_config_data["paths"]["excel_data"], 50)
+        results = list(run_pipelined(chunks, [("count", len), ("double", lambda rows: rows * 2)], timings=timings))
+
+        expected = [len(chunk) * 2 for chunk in load_excel_data_in_chunks(test_config_data["paths"]["excel_data"], 50)]
+        self.assertEqual(results, expected)
+        self.assertEqual(list(timings), ["source", "count", "double", "sink"])
+        self.assertTrue(all(timing["items"] == len(expected) for timing in timings.values()))
+
+    def test_stages_overlap(self):
+        def slow(item):
+            time.sleep(0.05)
+            return item
+
+        timings = {}
+        started = time.perf_counter()
+        list(run_pipelined(range(10), [("first", slow), ("second", slow)], timings=timings))
+
+        # Sequentially 20 calls of 50 ms; pipelined the two stages run side by side
+        self.assertLess(time.perf_counter() - started, 0.9)
+        self.assertGreater(timings["second"]["wait_input_seconds"], 0.0)
+
+    def test_bounded_queues(self):
+        produced = []
+
+        def source():
+            for item in range(100):
+                produced.append(item)
+                yield item
+
+        results = run_pipelined(source(), [("identity", lambda item: item)], queue_size=2)
+        next(results)
+        time.sleep(0.2)
+        # The source is at most two queues and the item in the stage ahead of the consumer
+        self.assertLessEqual(len(produced), 7)
+        results.close()
+
+    def test_errors_reach_the_consumer(self):
+        def fail(item):
+            if item == 3:
+                raise ValueError("bad chunk")
+            return item
+
+        with self.assertRaises(ValueError):
+            list(run_pipelined(range(100), [("fail", fail)]))
+        self.assertFalse([thread for thread in threading.enumerate() if thread.name.startswith("pipeline-")])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+import json
+import os
+import sys
+
+import pandas as pd
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(script_dir, '..', 'scripts'))
+
+from reconciliation import (
+    load_reference_extract,
+    match_titles,
+    normalize_titles,
+    reconcile_with_reference,
+    summarize_reconciliation,
+)
+
+# Load test configuration
+with open("test_config.json", "r") as config_file:
+    test_config_data = json.load(config_file)
+
+class TestReconciliation(unittest.TestCase):
+
+    def setUp(self):
+        self.reference = load_reference_extract(test_config_data["paths"]["reference_file"])
+        self.df = pd.DataFrame({
+            "Id": ["6444d14ee7abb0665474a208", "6455b7e44673c82a34f4ecca", "6455b7e44673c82a34f4ecca",
+                   "ffffffffffffffffffffffff", None, None, None],
+            "LPNumber": ["LP-00001", "LP-00003", None, None, "lp-00005", None, None],
+            "Title": ["Pieter Claesen Wyckoff House", None, None, "Brand New Landmark", "Kingsland Homestead",
+                      "The Seabury Tredwell House", "Jamaica Savings Bank"],
+        })
+
+    def test_normalize_titles(self):
+        titles = normalize_titles(pd.Series(["The Commandant's  House", "Café & Bar", "", None]))
+        self.assertEqual(titles.tolist()[:2], ["commandants house", "cafe and bar"])
+        self.assertTrue(titles[2:].isna().all())
+
+    def test_match_titles_uses_blocks(self):
+        reference_titles = normalize_titles(self.reference["title"])
+        matches = match_titles(normalize_titles(pd.Series(["Kingsland Homestaed", "Unrelated"])), reference_titles)
+
+        self.assertEqual(matches.index.tolist(), [0])
+        self.assertEqual(matches["reference"].tolist(), [4])
+        self.assertGreater(matches["score"].iloc[0], 0.9)
+
+        # Titles sharing only common tokens are not compared
+        self.assertTrue(match_titles(normalize_titles(pd.Series(["Kingsland Homestaed"])), reference_titles,
+                                     max_block_size=0).empty)
+
+    def test_reconcile_with_reference(self):
+        reconciliation = reconcile_with_reference(self.df, self.reference)
+
+        self.assertEqual(reconciliation["status"].tolist(), [
+            "unchanged", "conflicting", "duplicate", "new", "unchanged", "unchanged", "duplicate",
+        ])
+        self.assertEqual(reconciliation["match_key"].tolist()[:6], ["Id", "Id", "Id", None, "LPNumber", "Title"])
+        self.assertEqual(reconciliation["reference_id"][5], "643ec6364ac6203737fd6e74")
+        self.assertIn("LPNumber matches reference row 2", reconciliation["detail"][1])
+        self.assertEqual(summarize_reconciliation(reconciliation), {
+            "new": 1, "unchanged": 3, "updated": 0, "conflicting": 1, "duplicate": 2,
+        })
+
+    def test_updated_records(self):
+        df = pd.DataFrame({"Id": ["560f2c12f89701aedbaebc2c"], "LPNumber": ["LP-00005"], "Title": ["Kingsland House"]})
+        reconciliation = reconcile_with_reference(df, self.reference)
+
+        self.assertEqual(reconciliation["status"].tolist(), ["updated"])
+        self.assertEqual(reconciliation["detail"][0], "Title differs from title Kingsland Homestead")
+
+if __name__ == '__main__':
+    unittest.main()
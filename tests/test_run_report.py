@@ -0,0 +1,97 @@
+import unittest
+import json
+import os
+import pstats
+import shutil
+import sys
+import tempfile
+import threading
+
+import pandas as pd
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(script_dir, '..', 'scripts'))
+
+from run_report import RunReport, count_errors_by_rule, save_run_report
+from data_validation import compile_validation_rules, get_mapping_data, validate_excel_data_values_table
+from file_manager import load_excel_data
+
+# Load test configuration
+with open("test_config.json", "r") as config_file:
+    test_config_data = json.load(config_file)
+
+class TestRunReport(unittest.TestCase):
+
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir)
+
+    def test_stages_accumulate(self):
+        report = RunReport(trace_memory=True)
+        for rows in (10, 5):
+            with report.stage("process_documents", rows_in=rows) as stage:
+                stage["rows_out"] = rows - 1
+
+        run_report = report.finish()
+        stage = run_report["stages"]["process_documents"]
+        self.assertEqual(run_report["status"], "ok")
+        self.assertEqual(stage["calls"], 2)
+        self.assertEqual((stage["rows_in"], stage["rows_out"]), (15, 13))
+        self.assertGreaterEqual(stage["wall_seconds"], 0)
+        self.assertIn("tracemalloc_peak_bytes", stage)
+
+        report_path = os.path.join(self.output_dir, "run_report.json")
+        save_run_report(run_report, report_path)
+        with open(report_path, 'r') as file:
+            self.assertEqual(json.load(file)["build_id"], report.build_id)
+
+    def test_overlapping_stages(self):
+        report = RunReport(trace_memory=True)
+        barrier = threading.Barrier(2)
+
+        def run_stage(name):
+            with report.stage(name, rows_in=1):
+                barrier.wait()
+                sum(range(200000))
+                barrier.wait()
+
+        threads = [threading.Thread(target=run_stage, args=(name,)) for name in ("enrich_locations", "compact_frame")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        with report.stage("save_output"):
+            [0] * 100000
+
+        run_report = report.finish()
+        for name in ("enrich_locations", "compact_frame"):
+            stage = run_report["stages"][name]
+            self.assertTrue(stage["concurrent"])
+            self.assertNotIn("tracemalloc_peak_bytes", stage)
+            self.assertLessEqual(stage["cpu_seconds"], run_report["cpu_seconds"])
+        self.assertNotIn("concurrent", run_report["stages"]["save_output"])
+        self.assertGreaterEqual(run_report["tracemalloc_peak_bytes"],
+                                run_report["stages"]["save_output"]["tracemalloc_peak_bytes"])
+
+    def test_profile_stage(self):
+        profile_path = os.path.join(self.output_dir, "stage.prof")
+        report = RunReport(profile_stage="coerce_types", profile_path=profile_path)
+        with report.stage("coerce_types"):
+            sorted(range(1000), reverse=True)
+
+        self.assertEqual(report.finish()["profile"]["path"], profile_path)
+        self.assertGreater(pstats.Stats(profile_path).total_calls, 0)
+
+    def test_count_errors_by_rule(self):
+        df = load_excel_data(test_config_data["paths"]["excel_validation_data"])
+        rules = compile_validation_rules(get_mapping_data(test_config_data["paths"]["mapping_file"]))
+        counts = count_errors_by_rule(validate_excel_data_values_table(df, rules))
+
+        self.assertEqual(sum(counts.values()), 15)
+        self.assertTrue(all("." in key for key in counts))
+        self.assertEqual(count_errors_by_rule(pd.DataFrame(columns=["column", "rule"])), {})
+
+if __name__ == '__main__':
+    unittest.main()
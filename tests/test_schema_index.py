@@ -0,0 +1,56 @@
+import unittest
+import json
+import os
+import sys
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(script_dir, '..', 'scripts'))
+
+from schema_index import build_schema_index, get_schema_index, resolve_schema_path
+from file_manager import load_schema_file
+from data_validation import (
+    broad_validate_against_graphql_schema,
+    validate_document_fields_against_graphql_schema,
+)
+
+# Load test configuration
+with open("test_config.json", "r") as config_file:
+    test_config_data = json.load(config_file)
+
+class TestSchemaIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.schema_contents = load_schema_file(test_config_data["paths"]["schema_file"])
+        self.mapping_file_path = test_config_data["paths"]["mapping_file"]
+        self.index = build_schema_index(self.schema_contents)
+
+    def test_build_schema_index(self):
+        self.assertEqual(self.index["root"], "Attraction")
+        self.assertEqual(self.index["paths"]["id"], {"type": "String", "nullable": False, "list": False})
+        self.assertIn("loc.lat", self.index["paths"])
+        self.assertIn("inventory.founder", self.index["paths"])
+        self.assertTrue(self.index["paths"]["aliases"]["list"])
+
+    def test_resolve_schema_path(self):
+        self.assertEqual(resolve_schema_path(self.index, "Id"), ["id", "photo.id"])
+        self.assertEqual(resolve_schema_path(self.index, "BoroughCode"), ["loc.boroughCode"])
+        self.assertEqual(resolve_schema_path(self.index, "LOC.LAT"), ["loc.lat"])
+        self.assertEqual(resolve_schema_path(self.index, "loc.missing"), [])
+
+    def test_get_schema_index_is_cached(self):
+        self.assertIs(get_schema_index(self.schema_contents), get_schema_index(self.schema_contents))
+
+    def test_broad_validate_against_graphql_schema(self):
+        # "Cast" appears in the schema text but is not a field
+        results = broad_validate_against_graphql_schema(["Id", "BoroughCode", "Cast"], self.schema_contents)
+        self.assertEqual(results["Id"], "Valid")
+        self.assertEqual(results["BoroughCode"], "Valid")
+        self.assertTrue(results["Cast"].startswith("Invalid"))
+
+    def test_validate_document_fields_against_graphql_schema(self):
+        results = validate_document_fields_against_graphql_schema(self.mapping_file_path, self.schema_contents)
+        self.assertEqual(results["id"], "Valid")
+        self.assertEqual(results["loc.boroughCode"], "Valid")
+
+if __name__ == '__main__':
+    unittest.main()
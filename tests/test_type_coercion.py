@@ -0,0 +1,121 @@
+import unittest
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(script_dir, '..', 'scripts'))
+
+from pipeline_context import load_pipeline_context, clear_pipeline_context_cache
+from type_coercion import (
+    OBJECT_ID_DTYPE,
+    coerce_dataframe_types,
+    compact_dataframe,
+    pack_object_ids,
+    resolve_schema_target_types,
+    resolve_target_types,
+    unpack_object_ids,
+)
+from data_validation import (
+    cast_dataframe_to_expected_types,
+    enforce_data_types_based_on_graphql,
+    process_excel_data_with_mapping,
+    validate_excel_data_values_table,
+)
+from file_manager import load_schema_file
+
+# Load test configuration
+with open("test_config.json", "r") as config_file:
+    test_config_data = json.load(config_file)
+
+class TestTypeCoercion(unittest.TestCase):
+
+    def setUp(self):
+        clear_pipeline_context_cache()
+        self.context = load_pipeline_context(test_config_data["paths"]["mapping_file"],
+                                             test_config_data["paths"]["schema_file"])
+        self.df = pd.DataFrame({
+            "Id": ["533cddaf5c9596ef08143d56", "not-an-object-id", "54ffae6a93a2b1e1e52db631"],
+            "PostalCode": [10021.0, np.nan, 10458.0],
+            "DesignationDate": ["1969-08-26", "08/26/1969", "unknown"],
+            "BBL": ["1008710010", " 3070710130 ", "N/A"],
+        })
+
+    def test_resolve_target_types(self):
+        targets = resolve_target_types(self.context)
+        self.assertEqual(targets["Id"], "objectId")
+        self.assertEqual(targets["PostalCode"], "string")
+        self.assertEqual(targets["DesignationDate"], "date")
+        self.assertEqual(targets["BBL"], "long")
+
+    def test_coerce_dataframe_types(self):
+        df, errors = coerce_dataframe_types(self.df, resolve_target_types(self.context))
+
+        self.assertEqual(df["PostalCode"].tolist()[::2], ["10021", "10458"])
+        self.assertTrue(pd.isna(df["PostalCode"][1]))
+        self.assertEqual(df["DesignationDate"].tolist()[:2], [pd.Timestamp("1969-08-26")] * 2)
+        self.assertEqual(df["BBL"].dtype.name, "Int64")
+        self.assertEqual(df["BBL"].tolist()[:2], [1008710010, 3070710130])
+
+        self.assertEqual(errors[["row", "column", "type"]].values.tolist(), [
+            [1, "Id", "objectId"],
+            [2, "DesignationDate", "date"],
+            [2, "BBL", "long"],
+        ])
+
+    def test_cast_does_not_write_nan_strings(self):
+        df = cast_dataframe_to_expected_types(self.df, self.context)
+        self.assertFalse(df["PostalCode"].eq("nan").any())
+
+    def test_enforce_data_types_based_on_graphql(self):
+        schema_contents = load_schema_file(test_config_data["paths"]["schema_file"])
+        self.assertEqual(resolve_schema_target_types(["BBL", "Block", "Title"], schema_contents),
+                         {"BBL": "long", "Block": "integer", "Title": "string"})
+
+        df = enforce_data_types_based_on_graphql(pd.DataFrame({"BBL": ["1008710010"], "Block": [871.0]}),
+                                                 schema_contents)
+        self.assertEqual(df["BBL"].tolist(), [1008710010])
+        self.assertEqual(df["Block"].dtype.name, "Int64")
+
+    def test_pack_object_ids(self):
+        ids = pd.Series(["533cddaf5c9596ef08143d56", None, "54ffae6a93a2b1e1e52db631"], index=[4, 5, 6])
+        packed = pack_object_ids(ids)
+
+        self.assertEqual(packed.dtype, OBJECT_ID_DTYPE)
+        self.assertEqual(packed[4], bytes.fromhex("533cddaf5c9596ef08143d56"))
+        self.assertEqual(unpack_object_ids(packed).tolist(), ["533cddaf5c9596ef08143d56", pd.NA,
+                                                              "54ffae6a93a2b1e1e52db631"])
+        self.assertEqual(unpack_object_ids(packed[1:]).index.tolist(), [5, 6])
+
+        # Upper-case or invalid ids would not unpack to the same strings
+        self.assertIs(pack_object_ids(self.df["Id"]), self.df["Id"])
+        self.assertEqual(pack_object_ids(pd.Series(["533CDDAF5C9596EF08143D56"])).dtype, object)
+
+    def test_compact_dataframe(self):
+        df = pd.DataFrame({
+            "Id": ["533cddaf5c9596ef08143d56", "54ffae6a93a2b1e1e52db631", "5a0b9b5e93a2b1e1e52db632",
+                   "5a0b9b5e93a2b1e1e52db633"],
+            "BoroughCode": ["MN", "BX", "XX", None],
+            "City": ["New York"] * 4,
+            "PostalCode": [10021, 10458, 10001, 10002],
+        })
+        compact, dtypes = compact_dataframe(df, self.context)
+
+        self.assertEqual(dtypes, {"Id": "string", "BoroughCode": "category", "City": "category"})
+        self.assertEqual(compact["PostalCode"].dtype, df["PostalCode"].dtype)
+        pd.testing.assert_frame_equal(validate_excel_data_values_table(compact, self.context.validation_rules),
+                                      validate_excel_data_values_table(df, self.context.validation_rules))
+
+        coerced, errors = coerce_dataframe_types(compact, resolve_target_types(self.context), compact=True)
+        self.assertTrue(errors.empty)
+        self.assertEqual(coerced["Id"].dtype, OBJECT_ID_DTYPE)
+        self.assertEqual(coerced["BoroughCode"].dtype.name, "category")
+        self.assertEqual(process_excel_data_with_mapping(coerced, self.context),
+                         process_excel_data_with_mapping(coerce_dataframe_types(
+                             df, resolve_target_types(self.context))[0], self.context))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+import unittest
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import urllib.error
+import urllib.request
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(script_dir, '..', 'scripts'))
+
+from file_manager import get_rules_file_path
+from validation_service import LRUCache, ValidationService, create_server
+
+# Load test configuration
+with open("test_config.json", "r") as config_file:
+    test_config_data = json.load(config_file)
+
+class TestValidationService(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+
+        # The service only serves the files under its root directory
+        paths = test_config_data["paths"]
+        self.request = {}
+        for key, name in (("excel_file", "excel_validation_data"), ("mapping_file", "mapping_file"),
+                          ("schema_file", "schema_file"), ("template_file", "template_file")):
+            os.makedirs(os.path.join(self.temp_dir, os.path.dirname(paths[name])), exist_ok=True)
+            shutil.copy(paths[name], os.path.join(self.temp_dir, paths[name]))
+            self.request[key] = paths[name]
+        rules_file = get_rules_file_path(paths["mapping_file"])
+        shutil.copy(rules_file, os.path.join(self.temp_dir, rules_file))
+
+        self.server = create_server(port=0, service=ValidationService(max_frames=2, root_dir=self.temp_dir))
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def call(self, endpoint, body=None, method="POST", content_type="application/json"):
+        data = json.dumps(body).encode() if body is not None else None
+        request = urllib.request.Request(self.url + endpoint, data=data, method=method,
+                                         headers={"Content-Type": content_type})
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status, json.load(response)
+        except urllib.error.HTTPError as e:
+            return e.code, json.load(e)
+
+    def test_repeat_validation_is_served_from_memory(self):
+        status, first = self.call("/validate", self.request)
+        self.assertEqual(status, 200)
+        self.assertEqual(first["rows"], 29)
+        self.assertTrue(first["errors"])
+        self.assertIn("invalid value XX in column BoroughCode", first["errors"][0]["message"])
+
+        status, second = self.call("/validate", self.request)
+        self.assertEqual(status, 200)
+        self.assertEqual(second["errors"], first["errors"])
+        stats = self.server.service.stats()
+        self.assertEqual((stats["results"]["hits"], stats["frames"]["misses"]), (1, 1))
+
+        # A copy of the workbook under another name has the same hash
+        copy_path = os.path.join(self.temp_dir, "Location-Import_copy.xlsx")
+        shutil.copy(os.path.join(self.temp_dir, self.request["excel_file"]), copy_path)
+        self.call("/validate", {**self.request, "excel_file": copy_path})
+        self.assertEqual(self.server.service.stats()["results"]["hits"], 2)
+
+        # An edited workbook is parsed again
+        shutil.copy(test_config_data["paths"]["excel_data"], copy_path)
+        status, edited = self.call("/validate", {**self.request, "excel_file": copy_path})
+        self.assertEqual((status, edited["errors"]), (200, []))
+        self.assertEqual(self.server.service.stats()["frames"]["misses"], 2)
+
+    def test_header_transform_and_export(self):
+        status, header = self.call("/header", self.request)
+        self.assertEqual((status, header["errors"], header["row_count"]), (200, [], 29))
+        self.assertEqual(header["document_fields"]["BoroughCode"], "loc.boroughCode")
+
+        status, transformed = self.call("/transform", {**self.request, "limit": 2})
+        self.assertEqual(status, 200)
+        self.assertEqual(len(transformed["documents"]), 2)
+        self.assertEqual(transformed["rows"] - transformed["rejected_rows"], 14)
+
+        status, exported = self.call("/export", {**self.request, "output_file": "output_array.js"})
+        self.assertEqual((status, exported["documents"]), (200, 14))
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir, "output_array.js")))
+
+    def test_rejects_cross_site_requests_and_paths_outside_the_root(self):
+        output_file = os.path.join(self.temp_dir, "probe.js")
+        status, _ = self.call("/export", {**self.request, "output_file": output_file}, content_type="text/plain")
+        self.assertEqual(status, 415)
+        self.assertFalse(os.path.exists(output_file))
+
+        outside_file = os.path.abspath(test_config_data["paths"]["excel_data"])
+        self.assertEqual(self.call("/validate", {**self.request, "excel_file": outside_file})[0], 400)
+        status, error = self.call("/export", {**self.request, "output_file": "../probe.js"})
+        self.assertEqual(status, 400)
+        self.assertIn("outside the service directory", error["error"])
+        self.assertFalse(os.path.exists(os.path.join(os.path.dirname(self.temp_dir), "probe.js")))
+
+    def test_errors_and_cache_endpoints(self):
+        self.assertEqual(self.call("/validate", {**self.request, "excel_file": "missing.xlsx"})[0], 400)
+        self.assertEqual(self.call("/validate", {})[0], 400)
+        self.assertEqual(self.call("/unknown", {})[0], 404)
+
+        self.call("/validate", self.request)
+        status, health = self.call("/health", method="GET")
+        self.assertEqual((status, health["cache"]["frames"]["entries"]), (200, 1))
+        status, cleared = self.call("/cache", method="DELETE")
+        self.assertEqual((status, cleared["cache"]["frames"]["entries"]), (200, 0))
+
+    def test_lru_cache_evicts_least_recently_used(self):
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        self.assertEqual((cache.get("a"), cache.get("b"), cache.get("c")), (1, None, 3))
+
+
+if __name__ == '__main__':
+    unittest.main()